@@ -6,7 +6,7 @@ from importlib.util import find_spec
 from typing import Dict, List
 
 # Resolve external dependencies
-EXTERNAL_PACKAGES = {"pygltflib": "pygltflib", "PyYAML": "yaml"}
+EXTERNAL_PACKAGES = {"pygltflib": "pygltflib", "PyYAML": "yaml", "Pillow": "PIL"}
 WHL_PACKAGES = ["gltf_formatter", "blender_validator"]
 
 current = os.path.dirname(os.path.realpath(__file__))
@@ -15,6 +15,14 @@ for p in [p for p in sys.path if "/external_lib" in p]:
     sys.path.remove(p)
 sys.path.insert(0, EXTERNAL_LIB_DIR)
 
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.dependency import (
+    INSTALLED_WHL_MANIFEST,
+    read_external_lib_manifest,
+    read_json,
+    write_json,
+)
+
 
 def is_new_version_is_newer(current_version: str, new_version: str) -> bool:
     ret = False
@@ -46,36 +54,45 @@ def prepare_external_dependencies(packages: Dict[str, str]):
             subprocess.call([py_exec, "-m", "pip", "install", "--user", pkg])
 
 
-# blender_validator-1.0.2.1-py3-none-any.whl
 def upgrade_whl_packages(packages: List[str], force=False):
-    missing_pkgs = set()
-    installed_pkgs_with_version = {}
+    manifest = read_external_lib_manifest()
+    bundled = {
+        pkg: manifest["packages"][pkg]
+        for pkg in packages
+        if pkg in manifest["wheels"] and pkg in manifest["packages"]
+    }
+    installed: Dict[str, str] = read_json(INSTALLED_WHL_MANIFEST) or {}
+
+    if not force and all(
+        pkg in installed and not is_new_version_is_newer(installed[pkg], version)
+        for pkg, version in bundled.items()
+    ):
+        return
 
-    for pkg in packages:
-        try:
-            m = importlib.import_module(pkg)
-        except ModuleNotFoundError:
+    missing_pkgs = set()
+    for pkg, version in bundled.items():
+        if force or pkg not in installed:
+            # Not recorded yet (e.g. the first run); fall back to the installed module.
+            try:
+                installed[pkg] = importlib.import_module(pkg).__version__
+            except ModuleNotFoundError:
+                missing_pkgs.add(pkg)
+                continue
+        if force or is_new_version_is_newer(installed[pkg], version):
             missing_pkgs.add(pkg)
-        else:
-            installed_pkgs_with_version[pkg] = m.__version__
-
-    for filename in os.listdir(EXTERNAL_LIB_DIR):
-        (p_pkg, p_version, _) = filename.split("-", 2)
-        should_install = is_new_version_is_newer(
-            installed_pkgs_with_version.get(p_pkg, "0.0.0.0"), p_version
-        )
-
-        if should_install:
-            missing_pkgs.add(p_pkg)
 
     if len(missing_pkgs) > 0:
         py_exec = sys.executable
-        for filename in os.listdir(EXTERNAL_LIB_DIR):
-            f = os.path.join(EXTERNAL_LIB_DIR, filename)
-            if os.path.isfile(f) and f.endswith(".whl"):
-                subprocess.call(
+        for pkg in sorted(missing_pkgs):
+            f = os.path.join(EXTERNAL_LIB_DIR, manifest["wheels"][pkg])
+            if os.path.isfile(f):
+                ret = subprocess.call(
                     [py_exec, "-m", "pip", "install", "--upgrade", "--user", f]
                 )
+                if ret == 0:
+                    installed[pkg] = bundled[pkg]
+
+    write_json(INSTALLED_WHL_MANIFEST, installed)
 
 
 if "pytest" not in sys.modules:
@@ -0,0 +1,4 @@
+from gglabs_art_manager.batch.model import BatchJob, BatchResult, JobStatus
+from gglabs_art_manager.batch.runner import run_batch
+
+__all__ = ["BatchJob", "BatchResult", "JobStatus", "run_batch"]
@@ -0,0 +1,5 @@
+import sys
+
+from gglabs_art_manager.batch.cli import main
+
+sys.exit(main())
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from gglabs_art_manager.batch.model import BatchJob, BatchResult
+from gglabs_art_manager.version import __version__
+
+# Incremental project builds.
+# Every output records the inputs it was built from: the blend file, the libraries it
+# links (reported by the worker, as for a compiler's depfile), the validation config,
+# the export profile of the task type and the add-on version. A build compares them
+# with the state database and exports only the stale outputs, so that a change in a
+# shared library rebuilds exactly the blend files linking it.
+# bpy-free; runs in the python of the batch command.
+
+# `manager.model.Project` names; the model package needs `blender_validator`.
+PROJECTS = ["BEERGANG", "KIKITOWN"]
+STATE_FILENAME = ".gam_build.sqlite"
+
+_CHUNK_SIZE = 1 << 20
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS outputs (
+        output TEXT PRIMARY KEY,
+        project TEXT NOT NULL,
+        blend TEXT NOT NULL,
+        record TEXT NOT NULL,
+        built_at REAL NOT NULL
+    )
+    """,
+]
+
+__all__ = [
+    "PROJECTS",
+    "STATE_FILENAME",
+    "BuildRecord",
+    "BuildState",
+    "BuildTarget",
+    "expected_output",
+    "export_profile",
+    "plan_build",
+    "record_result",
+]
+
+
+def expected_output(job: BatchJob) -> str:
+    # Same path as `export_glb` writes (`{blend name}.{glb type}`)
+    output_dirpath = job.output_dirpath or os.path.dirname(job.blend_filepath)
+    name = os.path.basename(job.blend_filepath).rsplit(".", 1)[0]
+    return os.path.abspath(os.path.join(output_dirpath, f"{name}.{job.glb_type}"))
+
+
+def export_profile(job: BatchJob) -> Optional[str]:
+    # Digest of the glTF export and post-pass options of the job, or None when the
+    # profiles can't be imported here (`blender_validator` is only in blender's python).
+    # The profiles ship with the add-on, so the version still covers them.
+    # pylint: disable=import-outside-toplevel
+    try:
+        from gglabs_art_manager.manager.engine import cache_key
+        from gglabs_art_manager.manager.model import (
+            AnimationSplitGltfOptions,
+            TaskTypeDedupOptions,
+            TaskTypeGltfOptions,
+            TaskTypeKeyframeReductionOptions,
+            TaskTypeQuantizationOptions,
+            TaskTypeSparseMorphOptions,
+            TaskTypeTextureOptions,
+        )
+    except ImportError:
+        return None
+
+    task_type = job.task_type
+    postprocess = [
+        TaskTypeQuantizationOptions.get(task_type) if job.quantize else None,
+        TaskTypeTextureOptions.get(task_type) if job.encode_textures else None,
+        TaskTypeKeyframeReductionOptions.get(task_type),
+        TaskTypeSparseMorphOptions.get(task_type),
+        TaskTypeDedupOptions.get(task_type),
+    ]
+    clips = job.clip_mode if task_type == "ANIMATING" else None
+    return cache_key(
+        AnimationSplitGltfOptions[clips] if clips else TaskTypeGltfOptions[task_type],
+        [asdict(options) if options else None for options in postprocess],
+    )
+
+
+def _job_options(job: BatchJob) -> Dict:
+    # Options changing the output; `use_cache` doesn't.
+    options = job.to_dict()
+    options.pop("use_cache")
+    return options
+
+
+@dataclass
+class BuildRecord:
+    inputs: Dict[str, str]  # filepath -> digest; the blend, its libraries, the config
+    libraries: List[str] = field(default_factory=list)
+    profile: Optional[str] = None
+    version: str = __version__
+    options: Dict = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, s: str) -> "BuildRecord":
+        return cls(**json.loads(s))
+
+
+@dataclass
+class BuildTarget:
+    job: BatchJob
+    output: str
+    reason: Optional[str]  # why the output is stale, None if up to date
+    inputs: Dict[str, str] = field(default_factory=dict)  # digests before the build
+    profile: Optional[str] = None
+
+    @property
+    def stale(self) -> bool:
+        return self.reason is not None
+
+
+class BuildState:
+    # sqlite database of the built outputs and of the file digests.
+    # Digests are reused while the size and the mtime of a file stay the same.
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+        self.conn = sqlite3.connect(filepath)
+        with self.conn:
+            for statement in _SCHEMA:
+                self.conn.execute(statement)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "BuildState":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cached_digest(self, path: str, stat: os.stat_result) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        return row[0] if row else None
+
+    def digests(self, paths: Iterable[str], workers: int = 4) -> Dict[str, str]:
+        # {path: sha256}; missing files have an empty digest.
+        digests: Dict[str, str] = {}
+        stats: Dict[str, os.stat_result] = {}
+        for path in dict.fromkeys(paths):
+            try:
+                stats[path] = os.stat(path)
+            except FileNotFoundError:
+                digests[path] = ""
+                continue
+            cached = self._cached_digest(path, stats[path])
+            if cached is not None:
+                digests[path] = cached
+
+        missing = [path for path in stats if path not in digests]
+        # hashlib releases the GIL, large blend files are hashed in parallel
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for path, digest in zip(missing, executor.map(_file_digest, missing)):
+                digests[path] = digest
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                [
+                    (path, stats[path].st_size, stats[path].st_mtime_ns, digests[path])
+                    for path in missing
+                ],
+            )
+        return digests
+
+    def record(self, output: str) -> Optional[BuildRecord]:
+        row = self.conn.execute(
+            "SELECT record FROM outputs WHERE output = ?", (output,)
+        ).fetchone()
+        return BuildRecord.from_json(row[0]) if row else None
+
+    def put(self, output: str, project: str, blend: str, record: BuildRecord):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?)",
+                (output, project, blend, record.to_json(), time.time()),
+            )
+
+    def forget(self, output: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM outputs WHERE output = ?", (output,))
+
+
+def _file_digest(path: str) -> str:
+    sha = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                sha.update(chunk)
+    except FileNotFoundError:
+        return ""
+    return sha.hexdigest()
+
+
+def _stale_reason(  # pylint: disable=too-many-return-statements
+    job: BatchJob,
+    output: str,
+    record: Optional[BuildRecord],
+    digests: Dict[str, str],
+    profile: Optional[str],
+) -> Optional[str]:
+    if record is None:
+        return "new"
+    if not os.path.exists(output):
+        return "output missing"
+    if record.version != __version__:
+        return f"version {record.version} -> {__version__}"
+    if record.options != _job_options(job):
+        return "options changed"
+    # Unknown on either side: covered by the version
+    if profile and record.profile and profile != record.profile:
+        return "export profile changed"
+    for path, digest in record.inputs.items():
+        if digests.get(path) != digest:
+            if path in record.libraries:
+                kind = "library"
+            else:
+                kind = "blend" if path == job.blend_filepath else "config"
+            return f"{kind} changed :: {os.path.basename(path)}"
+    return None
+
+
+def plan_build(
+    state: BuildState, jobs: List[BatchJob], force: bool = False
+) -> List[BuildTarget]:
+    # Inputs of the previous builds (libraries included) are hashed once per file.
+    outputs = [expected_output(job) for job in jobs]
+    records = [state.record(output) for output in outputs]
+    paths = [job.blend_filepath for job in jobs] + [job.config_filepath for job in jobs]
+    for record in records:
+        if record is not None:
+            paths.extend(record.inputs)
+    digests = state.digests(paths)
+
+    targets = []
+    for job, output, record in zip(jobs, outputs, records):
+        profile = export_profile(job)
+        reason = "forced" if force else None
+        reason = reason or _stale_reason(job, output, record, digests, profile)
+        paths = [job.blend_filepath, job.config_filepath]
+        paths.extend(record.libraries if record else [])
+        inputs = {path: digests[path] for path in paths}
+        targets.append(BuildTarget(job, output, reason, inputs, profile))
+    return targets
+
+
+def record_result(
+    state: BuildState, project: str, target: BuildTarget, result: BatchResult
+):
+    # Digests are taken before the export; files saved during the build stay stale.
+    if not result.ok:
+        state.forget(target.output)
+        return
+
+    libraries = sorted(result.libraries)
+    inputs = dict(target.inputs)
+    inputs.update(state.digests(p for p in libraries if p not in inputs))
+    state.put(
+        target.output,
+        project,
+        target.job.blend_filepath,
+        BuildRecord(
+            inputs=inputs,
+            libraries=libraries,
+            profile=target.profile,
+            options=_job_options(target.job),
+        ),
+    )
@@ -0,0 +1,403 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Iterable, List, Optional
+
+from gglabs_art_manager.batch.build import (
+    PROJECTS,
+    STATE_FILENAME,
+    BuildState,
+    plan_build,
+    record_result,
+)
+from gglabs_art_manager.batch.daemon import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    WarmWorkers,
+    check_host,
+    serve,
+)
+from gglabs_art_manager.batch.model import JOB_ACTIONS, BatchJob, BatchResult, JobStatus
+from gglabs_art_manager.batch.runner import (
+    default_worker_count,
+    find_blender,
+    python_has_bpy,
+    run_batch,
+)
+from gglabs_art_manager.batch.watch import WATCH_DEBOUNCE, Watcher, WatchQueue
+
+MANIFEST_EXTENSIONS = (".txt", ".lst")
+
+
+def read_manifest(filepath: str) -> List[str]:
+    # One `.blend` path per line, relative to the manifest. `#` starts a comment.
+    basedir = os.path.dirname(os.path.abspath(filepath))
+    blend_filepaths = []
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                blend_filepaths.append(os.path.normpath(os.path.join(basedir, line)))
+    return blend_filepaths
+
+
+def collect_blend_filepaths(sources: Iterable[str], recursive: bool) -> List[str]:
+    blend_filepaths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                blend_filepaths.extend(
+                    os.path.join(root, f) for f in sorted(files) if f.endswith(".blend")
+                )
+                if not recursive:
+                    break
+        elif source.endswith(MANIFEST_EXTENSIONS):
+            blend_filepaths.extend(read_manifest(source))
+        elif source.endswith(".blend"):
+            blend_filepaths.append(source)
+        else:
+            raise ValueError(f"Unsupported batch source :: {source}")
+
+    # Keep the order, drop duplicates.
+    return list(dict.fromkeys(os.path.abspath(p) for p in blend_filepaths))
+
+
+def format_result_line(result: BatchResult) -> str:
+    name = os.path.basename(result.job.blend_filepath)
+    message = result.output_filepath if result.ok else result.message.split("\n", 1)[0]
+    return f"[{result.status.value:>9}] {result.elapsed:7.1f}s  {name}  {message or ''}"
+
+
+def print_summary(results: List[BatchResult], elapsed: float):
+    print("")
+    print("Batch Summary ::")
+    for result in results:
+        print(format_result_line(result))
+
+    counts = {status: 0 for status in JobStatus}
+    for result in results:
+        counts[result.status] += 1
+
+    print(
+        f"{len(results)} files in {elapsed:.1f}s :: "
+        + ", ".join(f"{status.value}={cnt}" for status, cnt in counts.items())
+    )
+
+
+def add_job_arguments(parser: argparse.ArgumentParser, required: bool = True):
+    if required:
+        parser.add_argument(
+            "sources",
+            nargs="+",
+            help="`.blend` files, directories of `.blend` files or manifest files (.txt)",
+        )
+    parser.add_argument(
+        "-c", "--config", required=required, help="validation config yaml"
+    )
+    parser.add_argument(
+        "-t", "--task-type", required=required, help="task type (e.g. FACE_RIGGING)"
+    )
+    parser.add_argument(
+        "-o", "--output-dir", help="output directory (default: next to each blend)"
+    )
+    parser.add_argument("--glb-type", choices=["glb", "gltf"], default="glb")
+    parser.add_argument(
+        "--no-validate", action="store_true", help="skip blender validation"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always export, ignore the export cache"
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="store vertex data as integers (KHR_mesh_quantization, required by"
+        " the loaders)",
+    )
+    parser.add_argument(
+        "--no-texture-encoding",
+        action="store_true",
+        help="keep the exported textures as they are",
+    )
+    parser.add_argument(
+        "--animation-clips",
+        choices=["ACTIONS", "NLA_TRACKS"],
+        help="split ANIMATING exports: the rig once, a clip GLB per action or NLA track",
+    )
+    parser.add_argument("-r", "--recursive", action="store_true")
+
+
+def add_worker_arguments(parser: argparse.ArgumentParser, client: bool = True):
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=default_worker_count(),
+        help="number of worker processes (default: number of cores)",
+    )
+    parser.add_argument(
+        "--blender",
+        help="run each job in `blender -b` (default: $BLENDER if `bpy` isn't importable)",
+    )
+    if client:
+        parser.add_argument(
+            "--daemon",
+            help="send the jobs to a running `daemon` (e.g. http://127.0.0.1:8765)",
+        )
+
+
+def resolve_blender(args: argparse.Namespace) -> Optional[str]:
+    if args.blender:
+        return args.blender
+    if getattr(args, "daemon", None):
+        return None  # the daemon has its own workers
+    if python_has_bpy():
+        return None
+
+    blender = find_blender()
+    if blender is None:
+        raise SystemExit(
+            "Neither the `bpy` module nor a blender executable ($BLENDER, --blender) is available."
+        )
+    return blender
+
+
+def job_from_args(args: argparse.Namespace, blend_filepath: str) -> BatchJob:
+    return BatchJob(
+        blend_filepath=blend_filepath,
+        config_filepath=os.path.abspath(args.config),
+        task_type=args.task_type.upper(),
+        output_dirpath=os.path.abspath(args.output_dir) if args.output_dir else None,
+        glb_type=args.glb_type,
+        validate=not args.no_validate,
+        use_cache=not args.no_cache,
+        quantize=args.quantize,
+        encode_textures=not args.no_texture_encoding,
+        clip_mode=args.animation_clips,
+        action=getattr(args, "action", "export"),
+        shapekey_prefix=getattr(args, "shapekey_prefix", None),
+    )
+
+
+def jobs_from_args(args: argparse.Namespace) -> List[BatchJob]:
+    blend_filepaths = collect_blend_filepaths(args.sources, args.recursive)
+    return [job_from_args(args, blend_filepath) for blend_filepath in blend_filepaths]
+
+
+def write_report(filepath: str, results: List[BatchResult]):
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump([r.to_dict() for r in results], f, indent=2, ensure_ascii=False)
+
+
+def run_export(args: argparse.Namespace) -> int:
+    jobs = jobs_from_args(args)
+    if not jobs:
+        print("No blend files to export.")
+        return 0
+
+    started = time.perf_counter()
+    results = run_batch(
+        jobs,
+        workers=args.workers,
+        blender=resolve_blender(args),
+        on_result=lambda r: print(format_result_line(r), flush=True),
+        daemon=args.daemon,
+    )
+    print_summary(results, time.perf_counter() - started)
+
+    if args.report:
+        write_report(args.report, results)
+
+    return 0 if all(r.ok for r in results) else 1
+
+
+def run_build(args: argparse.Namespace) -> int:
+    jobs = jobs_from_args(args)
+    state_filepath = args.state or os.path.join(
+        args.output_dir or os.getcwd(), STATE_FILENAME
+    )
+
+    with BuildState(state_filepath) as state:
+        targets = plan_build(state, jobs, force=args.force)
+        stale = [t for t in targets if t.stale]
+        print(
+            f"Build {args.project} :: {len(stale)} stale of {len(targets)} outputs"
+            f" ({state_filepath})"
+        )
+        for target in stale:
+            print(f"  {os.path.basename(target.output)}  {target.reason}")
+        if args.dry_run or not stale:
+            return 0
+
+        by_blend = {t.job.blend_filepath: t for t in stale}
+
+        def on_result(result: BatchResult):
+            # Recorded as soon as each job is done, so that an interrupted build resumes
+            record_result(
+                state, args.project, by_blend[result.job.blend_filepath], result
+            )
+            print(format_result_line(result), flush=True)
+
+        started = time.perf_counter()
+        results = run_batch(
+            [t.job for t in stale],
+            workers=args.workers,
+            blender=resolve_blender(args),
+            on_result=on_result,
+            daemon=args.daemon,
+        )
+        print_summary(results, time.perf_counter() - started)
+
+    if args.report:
+        write_report(args.report, results)
+
+    return 0 if all(r.ok for r in results) else 1
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    if args.dirs and not (args.config and args.task_type):
+        raise SystemExit("Watching directories needs --config and --task-type.")
+
+    queue = WatchQueue(args.queue)
+    dirpaths = [os.path.abspath(d) for d in args.dirs]
+    print(f"Watching {', '.join(dirpaths + [queue.dirpath])} (Ctrl+C to stop)")
+    with Watcher(
+        queue,
+        dirpaths,
+        job_of=lambda blend_filepath: job_from_args(args, blend_filepath),
+        recursive=args.recursive,
+        debounce=args.debounce,
+        workers=args.workers,
+        blender=resolve_blender(args),
+        on_result=lambda r: print(format_result_line(r), flush=True),
+        daemon=args.daemon,
+    ) as watcher:
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    try:
+        check_host(args.host, args.allow_remote)
+    except ValueError as e:
+        print(e)
+        return 2
+
+    config_filepaths = [os.path.abspath(c) for c in args.config]
+    started = time.perf_counter()
+    workers = WarmWorkers(args.workers, resolve_blender(args), config_filepaths)
+    print(
+        f"{args.workers} workers ready in {time.perf_counter() - started:.1f}s,"
+        f" listening on http://{args.host}:{args.port} (Ctrl+C to stop)",
+        flush=True,
+    )
+    try:
+        serve(
+            workers,
+            args.host,
+            args.port,
+            on_result=lambda r: print(format_result_line(r), flush=True),
+            allow_remote=args.allow_remote,
+        )
+    finally:
+        workers.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m gglabs_art_manager.batch",
+        description="Headless batch tools of GGLabs Art Manager",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser(
+        "export", help="validate and export GLBs from many blend files"
+    )
+    add_job_arguments(export_parser)
+    add_worker_arguments(export_parser)
+    export_parser.add_argument("--report", help="write per-file results as json")
+    export_parser.add_argument(
+        "--action",
+        choices=JOB_ACTIONS,
+        default="export",
+        help="`validate` only, or `rename` shapekeys (--shapekey-prefix) and save",
+    )
+    export_parser.add_argument(
+        "--shapekey-prefix", help="prefix removed from the shapekey names on rename"
+    )
+    export_parser.set_defaults(func=run_export)
+
+    project_parser = subparsers.add_parser(
+        "build", help="export only the GLBs whose inputs changed since the last build"
+    )
+    project_parser.add_argument("-p", "--project", choices=PROJECTS, required=True)
+    add_job_arguments(project_parser)
+    add_worker_arguments(project_parser)
+    project_parser.add_argument(
+        "--state", help=f"build state database (default: <output dir>/{STATE_FILENAME})"
+    )
+    project_parser.add_argument(
+        "--force", action="store_true", help="rebuild every output"
+    )
+    project_parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="only list the stale outputs"
+    )
+    project_parser.add_argument("--report", help="write per-file results as json")
+    project_parser.set_defaults(func=run_build)
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="validate and export blend files in the background when saved"
+    )
+    watch_parser.add_argument(
+        "dirs", nargs="*", help="directories of `.blend` files to watch"
+    )
+    add_job_arguments(watch_parser, required=False)
+    add_worker_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--queue",
+        help="directory the add-on queues saved files to (default: $GAM_WATCH_DIR)",
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE,
+        help="seconds without saves before a file is exported",
+    )
+    watch_parser.set_defaults(func=run_watch)
+
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="keep warm workers and run the jobs posted to a local endpoint"
+    )
+    add_worker_arguments(daemon_parser, client=False)
+    daemon_parser.add_argument("--host", default=DEFAULT_HOST)
+    daemon_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    daemon_parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="listen on a non-loopback --host; jobs save and write arbitrary paths",
+    )
+    daemon_parser.add_argument(
+        "-c",
+        "--config",
+        action="append",
+        default=[],
+        help="validation config yaml parsed ahead of the first job (repeatable)",
+    )
+    daemon_parser.set_defaults(func=run_daemon)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
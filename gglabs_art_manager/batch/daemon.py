@@ -0,0 +1,347 @@
+import hmac
+import ipaddress
+import json
+import multiprocessing
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from gglabs_art_manager.batch.model import JOB_ACTIONS, BatchJob, BatchResult, JobStatus
+from gglabs_art_manager.batch.runner import TOKEN_HEADER, blender_env, token_filepath
+from gglabs_art_manager.batch.worker import reset_blend_state, run_job
+from gglabs_art_manager.version import __version__
+
+# Warm export daemon.
+# Blender startup, the imports of `blender_validator`/`gltf_formatter` and the config
+# parsing are paid once per worker instead of once per job. Jobs (`BatchJob`, with an
+# `action` of export, validate or rename) are posted as json to a local HTTP endpoint;
+# a worker opens the blend file, runs the job and goes back to an empty file.
+# Workers are `bpy` module processes or `blender -b` processes reading jobs on stdin.
+# Jobs save blend files and write to any path, so the endpoint only listens on loopback
+# (unless `allow_remote`), checks the `Host` against DNS rebinding and only takes json
+# requests carrying the per-daemon token. The token is in a file only the user can read
+# (`runner.token_filepath`); web pages can neither read it nor send the header or the
+# content type without a CORS preflight, which the daemon doesn't answer.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Result lines of `blender -b` workers; anything else on stdout is blender's own output.
+RESULT_PREFIX = "GAM_RESULT "
+
+WORKER_EXPR = ";".join(
+    [
+        "import sys",
+        "from gglabs_art_manager.batch.daemon import worker_main",
+        "sys.exit(worker_main())",
+    ]
+)
+
+__all__ = [
+    "DEFAULT_HOST",
+    "DEFAULT_PORT",
+    "check_host",
+    "warm_up",
+    "run_warm_job",
+    "worker_main",
+    "WarmWorkers",
+    "serve",
+]
+
+
+def _write_token(port: int, token: str):
+    filepath = token_filepath(port)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def _is_loopback(host: str) -> bool:
+    host = host.strip("[]")
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_host(host: str, allow_remote: bool = False):
+    if not allow_remote and not _is_loopback(host):
+        raise ValueError(f"Not a loopback address :: {host} (see `allow_remote`)")
+
+
+def warm_up(config_filepaths: List[str]):
+    # Everything a job imports or parses, done before the first job.
+    # pylint: disable=import-outside-toplevel,unused-import
+    import bpy
+
+    import gglabs_art_manager.manager.blender.incremental
+    import gglabs_art_manager.manager.blender.pipeline
+    from gglabs_art_manager.manager.blender.config import load_config
+
+    try:
+        import gltf_formatter
+    except ImportError:
+        pass
+
+    for filepath in config_filepaths:
+        load_config(filepath)
+
+
+def run_warm_job(job: BatchJob) -> BatchResult:
+    try:
+        return run_job(job)
+    finally:
+        reset_blend_state()
+
+
+def worker_main() -> int:
+    # Entrypoint of `blender -b --python-expr ... -- <config yaml>...`: a job json per
+    # line on stdin, a `RESULT_PREFIX` line per result on stdout.
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    warm_up(argv)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        result = run_warm_job(BatchJob.from_dict(json.loads(line)))
+        print(RESULT_PREFIX + json.dumps(result.to_dict()), flush=True)
+    return 0
+
+
+class _BlenderWorker:
+    def __init__(self, blender: str, config_filepaths: List[str]):
+        cmd = [
+            blender,
+            "-b",
+            "--factory-startup",
+            "--python-use-system-env",
+            "--python-expr",
+            WORKER_EXPR,
+            "--",
+            *config_filepaths,
+        ]
+        self.proc = subprocess.Popen(  # pylint: disable=consider-using-with
+            cmd,
+            env=blender_env(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def run(self, job: BatchJob) -> BatchResult:
+        self.proc.stdin.write(json.dumps(job.to_dict()) + "\n")
+        self.proc.stdin.flush()
+        for line in self.proc.stdout:
+            if line.startswith(RESULT_PREFIX):
+                return BatchResult.from_dict(json.loads(line[len(RESULT_PREFIX) :]))
+        raise RuntimeError(f"blender exited with {self.proc.wait()}")
+
+    def close(self):
+        if self.alive:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+class WarmWorkers:
+    # Runs jobs on `workers` long-lived workers; a worker that died is replaced.
+
+    def __init__(
+        self, workers: int, blender: Optional[str], config_filepaths: List[str]
+    ):
+        self.workers = max(1, workers)
+        self.blender = blender
+        self.config_filepaths = config_filepaths
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._idle: "queue.Queue[_BlenderWorker]" = queue.Queue()
+        if blender:
+            for _ in range(self.workers):
+                self._idle.put(_BlenderWorker(blender, config_filepaths))
+        else:
+            self._executor = self._create_executor()
+            # Spawns and warms up every worker right away
+            for future in [
+                self._executor.submit(time.sleep, 0) for _ in range(self.workers)
+            ]:
+                future.result()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_up,
+            initargs=(self.config_filepaths,),
+        )
+
+    def run(self, job: BatchJob) -> BatchResult:
+        if job.action not in JOB_ACTIONS:
+            raise ValueError(f"Unknown job action :: {job.action}")
+        if self.blender:
+            return self._run_in_blender(job)
+
+        executor = self._executor
+        try:
+            return executor.submit(run_warm_job, job).result()
+        except BrokenExecutor:
+            with self._lock:
+                if self._executor is executor:
+                    executor.shutdown(wait=False)
+                    self._executor = self._create_executor()
+            raise
+
+    def _run_in_blender(self, job: BatchJob) -> BatchResult:
+        worker = self._idle.get()
+        try:
+            return worker.run(job)
+        finally:
+            if not worker.alive:
+                worker.close()
+                worker = _BlenderWorker(self.blender, self.config_filepaths)
+            self._idle.put(worker)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            self._idle.get().close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_DaemonServer"
+
+    def _reply(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _refused(self) -> bool:
+        # Replies and returns True unless the request may run jobs
+        if not self.server.allow_remote:
+            # A `Host` other than loopback: DNS rebinding from a web page
+            host = urllib.parse.urlsplit(f"//{self.headers.get('Host', '')}").hostname
+            if not _is_loopback(host or ""):
+                self._reply(403, {"error": "not a loopback host"})
+                return True
+        token = self.headers.get(TOKEN_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.server.token.encode()):
+            self._reply(403, {"error": f"missing or wrong {TOKEN_HEADER}"})
+            return True
+        return False
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self._refused():
+            return
+        if self.path != "/status":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        self._reply(
+            200,
+            {
+                "version": __version__,
+                "workers": self.server.workers.workers,
+                "jobs": self.server.job_count,
+            },
+        )
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        if self._refused():
+            return
+        if self.path != "/jobs":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type != "application/json":
+            self._reply(415, {"error": "expected application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = BatchJob.from_dict(json.loads(self.rfile.read(length)))
+        except (ValueError, TypeError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+
+        started = time.perf_counter()
+        try:
+            result = self.server.workers.run(job)
+        except Exception as e:  # pylint: disable=broad-except
+            result = BatchResult(
+                job=job,
+                status=JobStatus.FAILED,
+                message=f"{type(e).__name__}: {e}",
+                elapsed=time.perf_counter() - started,
+            )
+        self.server.finished(result)
+        self._reply(200, result.to_dict())
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class _DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        workers: WarmWorkers,
+        token: str,
+        allow_remote: bool,
+        on_result=None,
+    ):
+        super().__init__(address, _Handler)
+        self.workers = workers
+        self.token = token
+        self.allow_remote = allow_remote
+        self.on_result = on_result
+        self.job_count = 0
+        self._lock = threading.Lock()
+
+    def finished(self, result: BatchResult):
+        with self._lock:
+            self.job_count += 1
+            if self.on_result:
+                self.on_result(result)
+
+
+def serve(
+    workers: WarmWorkers,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    on_result=None,
+    allow_remote: bool = False,
+):
+    # Blocks until interrupted.
+    check_host(host, allow_remote)
+    token = secrets.token_urlsafe(32)
+    with _DaemonServer((host, port), workers, token, allow_remote, on_result) as server:
+        # Once bound, so that a daemon already on the port keeps its token
+        _write_token(port, token)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(token_filepath(port)):
+                os.remove(token_filepath(port))
@@ -0,0 +1,62 @@
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+# What a job does with the blend file; `rename` saves it.
+JOB_ACTIONS = ["export", "validate", "rename"]
+
+
+class JobStatus(Enum):
+    SUCCEEDED = "succeeded"
+    INVALID = "invalid"  # blender validation failed, nothing exported
+    FAILED = "failed"
+
+
+@dataclass
+class BatchJob:
+    blend_filepath: str
+    config_filepath: str
+    task_type: str
+    output_dirpath: Optional[str] = None  # defaults to the directory of the blend file
+    glb_type: str = "glb"
+    validate: bool = True
+    use_cache: bool = True
+    quantize: bool = False  # KHR_mesh_quantization, required by the loaders
+    encode_textures: bool = True
+    clip_mode: Optional[str] = None  # split ANIMATING exports, `ANIMATION_CLIP_MODES`
+    action: str = "export"  # one of `JOB_ACTIONS`
+    shapekey_prefix: Optional[str] = None  # removed from the shapekey names on `rename`
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "BatchJob":
+        return cls(**d)
+
+
+@dataclass
+class BatchResult:
+    job: BatchJob
+    status: JobStatus
+    output_filepath: Optional[str] = None
+    message: str = ""
+    elapsed: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    libraries: List[str] = field(default_factory=list)  # linked `.blend` files
+
+    @property
+    def ok(self) -> bool:
+        return self.status == JobStatus.SUCCEEDED
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["status"] = self.status.value
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "BatchResult":
+        d = dict(d)
+        d["job"] = BatchJob.from_dict(d["job"])
+        d["status"] = JobStatus(d["status"])
+        return cls(**d)
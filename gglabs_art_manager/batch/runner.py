@@ -0,0 +1,190 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from typing import Callable, Dict, List, Optional
+
+from gglabs_art_manager.batch.model import BatchJob, BatchResult, JobStatus
+from gglabs_art_manager.batch.worker import run_job
+from gglabs_art_manager.manager.engine.cache import cache_root
+
+PACKAGE_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+)
+
+WORKER_EXPR = ";".join(
+    [
+        "import sys",
+        "from gglabs_art_manager.batch.worker import main",
+        "sys.exit(main())",
+    ]
+)
+
+# Header carrying the token of the `daemon` (see `token_filepath`)
+TOKEN_HEADER = "X-GAM-Token"
+
+
+def default_worker_count() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def blender_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [PACKAGE_ROOT] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+    return env
+
+
+def run_job_in_blender(blender: str, job: BatchJob) -> BatchResult:
+    with tempfile.TemporaryDirectory(prefix="gam_batch_") as tmpdir:
+        result_filepath = os.path.join(tmpdir, "result.json")
+        cmd = [
+            blender,
+            "-b",
+            "--factory-startup",
+            "--python-use-system-env",
+            job.blend_filepath,
+            "--python-expr",
+            WORKER_EXPR,
+            "--",
+            "--job",
+            json.dumps(job.to_dict()),
+            "--result",
+            result_filepath,
+        ]
+
+        started = time.perf_counter()
+        proc = subprocess.run(
+            cmd, env=blender_env(), capture_output=True, text=True, check=False
+        )
+
+        if not os.path.exists(result_filepath):
+            return BatchResult(
+                job=job,
+                status=JobStatus.FAILED,
+                message=f"blender exited with {proc.returncode}\n{proc.stderr[-2000:]}",
+                elapsed=time.perf_counter() - started,
+            )
+
+        with open(result_filepath, "r", encoding="utf-8") as f:
+            return BatchResult.from_dict(json.load(f))
+
+
+def token_filepath(port: int) -> str:
+    # Written by the daemon on `port`, readable by its user only
+    return os.path.join(cache_root(), "daemon", f"{port}.token")
+
+
+def read_token(url: str) -> Optional[str]:
+    # Token of the daemon listening on `url`, if it runs as this user
+    port = urllib.parse.urlsplit(url).port or 80
+    try:
+        with open(token_filepath(port), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def run_job_on_daemon(url: str, job: BatchJob) -> BatchResult:
+    # Runs the job on a warm worker of `python -m gglabs_art_manager.batch daemon`.
+    started = time.perf_counter()
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/jobs",
+        data=json.dumps(job.to_dict()).encode("utf-8"),
+        headers={
+            "Content-Type": "application/json",
+            TOKEN_HEADER: read_token(url) or "",
+        },
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return BatchResult.from_dict(json.load(response))
+    except (urllib.error.URLError, ValueError) as e:
+        return BatchResult(
+            job=job,
+            status=JobStatus.FAILED,
+            message=f"daemon {url} :: {e}",
+            elapsed=time.perf_counter() - started,
+        )
+
+
+def create_executor(
+    workers: int, blender: Optional[str], daemon: Optional[str] = None
+) -> Executor:
+    if blender or daemon:
+        # Each thread only babysits its own `blender -b` subprocess or daemon request.
+        return ThreadPoolExecutor(max_workers=workers)
+
+    # `bpy` module workers; `spawn` so that no blender state is shared between them.
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    workers: Optional[int] = None,
+    blender: Optional[str] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    daemon: Optional[str] = None,
+) -> List[BatchResult]:
+    workers = min(workers or default_worker_count(), max(1, len(jobs)))
+    results: Dict[int, BatchResult] = {}
+
+    with create_executor(workers, blender, daemon) as executor:
+        futures: Dict[Future, int] = {}
+        for idx, job in enumerate(jobs):
+            if daemon:
+                futures[executor.submit(run_job_on_daemon, daemon, job)] = idx
+            elif blender:
+                futures[executor.submit(run_job_in_blender, blender, job)] = idx
+            else:
+                futures[executor.submit(run_job, job)] = idx
+
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                # e.g. a worker process died (BrokenProcessPool)
+                result = BatchResult(
+                    job=jobs[idx],
+                    status=JobStatus.FAILED,
+                    message=f"{type(e).__name__}: {e}",
+                )
+
+            results[idx] = result
+            if on_result:
+                on_result(result)
+
+    return [results[idx] for idx in range(len(jobs))]
+
+
+def find_blender() -> Optional[str]:
+    # Same environment variable as the Makefile.
+    blender = os.environ.get("BLENDER")
+    if blender and os.path.exists(blender):
+        return blender
+    return None
+
+
+def python_has_bpy() -> bool:
+    # pylint: disable=import-outside-toplevel
+    from importlib.util import find_spec
+
+    return find_spec("bpy") is not None or "bpy" in sys.modules
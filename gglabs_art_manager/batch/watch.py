@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import BrokenExecutor, Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gglabs_art_manager.batch.model import BatchJob, BatchResult, JobStatus
+from gglabs_art_manager.batch.runner import (
+    create_executor,
+    run_job_in_blender,
+    run_job_on_daemon,
+)
+from gglabs_art_manager.batch.worker import run_job
+from gglabs_art_manager.manager.engine.cache import cache_root
+
+# Watch mode.
+# Saved blend files are queued as spool files, one per blend file: by the `save_post`
+# handler of the add-on (`manager.blender.watch`) and by `Watcher` polling directories.
+# `Watcher` exports a file once it has been quiet for `debounce` seconds, in a
+# background worker (`bpy` module process or `blender -b`). Saves arriving while the
+# file is waiting or exporting are coalesced into a single export of the last save.
+# bpy-free; the interactive session only writes a small json file on save.
+
+WATCH_DIR_ENV = "GAM_WATCH_DIR"
+
+WATCH_POLL = 0.5
+WATCH_DEBOUNCE = 2.0
+
+__all__ = [
+    "WATCH_DIR_ENV",
+    "WATCH_POLL",
+    "WATCH_DEBOUNCE",
+    "watch_root",
+    "WatchQueue",
+    "Watcher",
+]
+
+
+def watch_root() -> str:
+    return os.environ.get(WATCH_DIR_ENV) or os.path.join(cache_root(), "watch")
+
+
+def _entry_name(blend_filepath: str) -> str:
+    # The same blend file always gets the same entry; a newer save replaces it.
+    digest = hashlib.sha1(os.path.abspath(blend_filepath).encode("utf-8"))
+    return f"{digest.hexdigest()[:16]}.json"
+
+
+class WatchQueue:
+    def __init__(self, dirpath: Optional[str] = None):
+        self.dirpath = dirpath or watch_root()
+
+    def enqueue(self, job: BatchJob):
+        os.makedirs(self.dirpath, exist_ok=True)
+        path = os.path.join(self.dirpath, _entry_name(job.blend_filepath))
+        part_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        with open(part_path, "w", encoding="utf-8") as f:
+            json.dump({"job": job.to_dict(), "queued_at": time.time()}, f)
+        os.replace(part_path, path)
+
+    def drain(self) -> List[Tuple[BatchJob, float]]:
+        # Takes every queued job with the time it was queued.
+        if not os.path.isdir(self.dirpath):
+            return []
+
+        entries = []
+        for filename in sorted(os.listdir(self.dirpath)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.dirpath, filename)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                os.remove(path)
+            except (FileNotFoundError, ValueError):
+                continue
+            entries.append((BatchJob.from_dict(entry["job"]), entry["queued_at"]))
+        return entries
+
+
+def _blend_stats(dirpaths: List[str], recursive: bool) -> Dict[str, Tuple[int, int]]:
+    # {blend filepath: (mtime, size)}; `.blend1` backups and `.blend@` saves in
+    # progress don't match.
+    stats = {}
+    for dirpath in dirpaths:
+        for root, dirs, files in os.walk(dirpath):
+            for filename in files:
+                if not filename.endswith(".blend"):
+                    continue
+                path = os.path.abspath(os.path.join(root, filename))
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                stats[path] = (stat.st_mtime_ns, stat.st_size)
+            if not recursive:
+                break
+            dirs.sort()
+    return stats
+
+
+class Watcher:
+    def __init__(
+        self,
+        queue: WatchQueue,
+        dirpaths: Optional[List[str]] = None,
+        job_of: Optional[Callable[[str], BatchJob]] = None,
+        recursive: bool = False,
+        debounce: float = WATCH_DEBOUNCE,
+        workers: int = 1,
+        blender: Optional[str] = None,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+        daemon: Optional[str] = None,
+    ):
+        # `job_of` makes the job of a blend file changed in one of `dirpaths`.
+        self.queue = queue
+        self.dirpaths = dirpaths or []
+        self.job_of = job_of
+        self.recursive = recursive
+        self.debounce = debounce
+        self.workers = max(1, workers)
+        self.blender = blender
+        self.on_result = on_result
+        self.daemon = daemon
+        self.executor = create_executor(self.workers, blender, daemon)
+
+        self.pending: Dict[str, Tuple[BatchJob, float]] = {}  # blend -> (job, changed)
+        self.running: Dict[str, Tuple[BatchJob, Future]] = {}
+        self._stats = _blend_stats(self.dirpaths, recursive)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def scan(self):
+        for job, queued_at in self.queue.drain():
+            path = os.path.abspath(job.blend_filepath)
+            self.pending[path] = (job, min(queued_at, time.time()))
+
+        if not self.dirpaths or self.job_of is None:
+            return
+        stats = _blend_stats(self.dirpaths, self.recursive)
+        for path, stat in stats.items():
+            if self._stats.get(path) != stat:
+                # A job queued by the add-on keeps the options of its panel
+                job, _ = self.pending.get(path) or (self.job_of(path), None)
+                self.pending[path] = (job, time.time())
+        self._stats = stats
+
+    def _collect(self):
+        for path, (job, future) in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[path]
+            try:
+                result = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                if isinstance(e, BrokenExecutor) and not self.running:
+                    # A worker process died; the next saves get a new pool.
+                    self.executor.shutdown(wait=False)
+                    self.executor = create_executor(
+                        self.workers, self.blender, self.daemon
+                    )
+                result = BatchResult(
+                    job=job,
+                    status=JobStatus.FAILED,
+                    message=f"{type(e).__name__}: {e}",
+                )
+            if self.on_result:
+                self.on_result(result)
+
+    def _submit(self, job: BatchJob) -> Future:
+        if self.daemon:
+            return self.executor.submit(run_job_on_daemon, self.daemon, job)
+        if self.blender:
+            return self.executor.submit(run_job_in_blender, self.blender, job)
+        return self.executor.submit(run_job, job)
+
+    def tick(self):
+        self._collect()
+        self.scan()
+
+        now = time.time()
+        for path, (job, changed_at) in list(self.pending.items()):
+            # One export per file at a time; the next save waits for it.
+            if path in self.running or now - changed_at < self.debounce:
+                continue
+            del self.pending[path]
+            self.running[path] = (job, self._submit(job))
+
+    def run(self, poll: float = WATCH_POLL):
+        while True:
+            self.tick()
+            time.sleep(poll)
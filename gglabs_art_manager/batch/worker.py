@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from typing import List, Optional, Tuple
+
+from gglabs_art_manager.batch.model import BatchJob, BatchResult, JobStatus
+
+# Runs a single `BatchJob` inside a blender process.
+# Either called from a process pool that imports the `bpy` module,
+# or through `main()` from `blender -b <file> --python-expr ...`.
+
+# pylint: disable=import-outside-toplevel
+
+
+# (filepath, mtime) of the opened blend file. Workers kept alive (watch mode) reopen a
+# file that has been saved again since.
+_opened: Optional[Tuple[str, int]] = None
+
+
+def open_blend_file(filepath: str):
+    global _opened  # pylint: disable=global-statement
+    import bpy
+
+    filepath = os.path.abspath(filepath)
+    mtime = os.stat(filepath).st_mtime_ns
+    current = os.path.abspath(bpy.data.filepath or "") == filepath
+    # A file opened from the command line (`blender -b <file>`) has no record yet.
+    if not current or (_opened is not None and _opened != (filepath, mtime)):
+        bpy.ops.wm.open_mainfile(filepath=filepath)
+    _opened = (filepath, mtime)
+
+
+def linked_libraries() -> List[str]:
+    # Absolute paths, also of the libraries linked through another library
+    import bpy
+
+    return sorted(
+        {
+            os.path.normpath(bpy.path.abspath(lib.filepath, library=lib.parent))
+            for lib in bpy.data.libraries
+        }
+    )
+
+
+def rename_shapekeys(job: BatchJob, config, result: BatchResult):
+    import bpy
+
+    from gglabs_art_manager.manager.blender.pipeline import remove_shapekey_prefix
+
+    if not job.shapekey_prefix:
+        raise ValueError("rename needs a shapekey prefix")
+    issues = remove_shapekey_prefix(config, job.shapekey_prefix)
+    if issues:
+        bpy.ops.wm.save_mainfile()
+    result.status = JobStatus.SUCCEEDED
+    result.output_filepath = job.blend_filepath
+    result.message = f"{len(issues)} shapekeys renamed"
+
+
+def reset_blend_state():
+    # Back to an empty file between the jobs of a long-lived worker; the imported
+    # modules and the parsed configs stay.
+    global _opened  # pylint: disable=global-statement
+    import bpy
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    _opened = None
+
+
+def run_job(job: BatchJob) -> BatchResult:
+    started = time.perf_counter()
+    result = BatchResult(job=job, status=JobStatus.FAILED)
+
+    def mark(stage: str, since: float) -> float:
+        now = time.perf_counter()
+        result.stages[stage] = now - since
+        return now
+
+    tracer = None
+    try:
+        from gglabs_art_manager.manager.blender.config import load_config
+        from gglabs_art_manager.manager.blender.incremental import validate_incremental
+        from gglabs_art_manager.manager.blender.pipeline import export_glb
+        from gglabs_art_manager.manager.logger import tracer
+
+        # Chrome trace files are written to `$GAM_TRACE_DIR`, if given.
+        if tracer.output_dirpath:
+            tracer.start_trace(f"batch_{job.task_type.lower()}")
+
+        t = time.perf_counter()
+        open_blend_file(job.blend_filepath)
+        result.libraries = linked_libraries()
+        t = mark("open", t)
+
+        config = load_config(job.config_filepath)
+        t = mark("config", t)
+
+        if job.action == "rename":
+            rename_shapekeys(job, config, result)
+            mark("rename", t)
+            return result
+
+        if job.validate or job.action == "validate":
+            # Reuses the result saved in the blend file if nothing has changed since.
+            validation = validate_incremental(job.task_type, config)
+            t = mark("validate", t)
+            if not validation.passed:
+                result.status = JobStatus.INVALID
+                result.message = validation.message
+                return result
+            if job.action == "validate":
+                result.status = JobStatus.SUCCEEDED
+                return result
+
+        output_dirpath = job.output_dirpath or os.path.dirname(
+            os.path.abspath(job.blend_filepath)
+        )
+        os.makedirs(output_dirpath, exist_ok=True)
+        result.output_filepath = export_glb(
+            job.task_type,
+            config,
+            output_dirpath,
+            job.glb_type,
+            use_cache=job.use_cache,
+            quantize=job.quantize,
+            encode_textures=job.encode_textures,
+            clip_mode=job.clip_mode,
+        )
+        mark("export", t)
+
+        result.status = JobStatus.SUCCEEDED
+    except Exception as e:  # pylint: disable=broad-except
+        result.status = JobStatus.FAILED
+        result.message = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+    finally:
+        result.elapsed = time.perf_counter() - started
+        if tracer is not None:
+            tracer.finish_trace()
+
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # Entrypoint for `blender -b <file> --python-expr ... -- --job <json> --result <path>`
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="gglabs_art_manager.batch.worker")
+    parser.add_argument("--job", required=True, help="BatchJob as a json string")
+    parser.add_argument("--result", required=True, help="filepath to write BatchResult")
+    args = parser.parse_args(argv)
+
+    result = run_job(BatchJob.from_dict(json.loads(args.job)))
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result.to_dict(), f)
+
+    return 0 if result.ok else 1
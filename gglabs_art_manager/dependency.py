@@ -0,0 +1,106 @@
+import json
+import os
+import re
+from typing import Dict, Optional
+
+# Only the standard library is used here; this runs before `external_lib` is usable.
+
+EXTERNAL_LIB_DIR = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "external_lib"
+)
+
+# Versions of the bundled packages, written by `make external-lib`, so that
+# checking them needs neither a pip subprocess nor importing the packages.
+EXTERNAL_LIB_MANIFEST = os.path.join(EXTERNAL_LIB_DIR, "manifest.json")
+# Versions of the wheels installed by `upgrade_whl_packages` so far
+INSTALLED_WHL_MANIFEST = os.path.join(EXTERNAL_LIB_DIR, ".installed_whl.json")
+
+_VERSION_PATTERN = re.compile(r"""^__version__\s*=\s*["']([^"']+)["']""", re.MULTILINE)
+
+
+def read_json(filepath: str) -> Optional[dict]:
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(filepath: str, data: dict):
+    try:
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+    except OSError:
+        pass
+
+
+def _source_version(path: str) -> Optional[str]:
+    # `__version__` of a module file or a package directory, read as text
+    candidates = (
+        [os.path.join(path, n) for n in ("__init__.py", "version.py", "_version.py")]
+        if os.path.isdir(path)
+        else [path]
+    )
+    for filepath in candidates:
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                m = _VERSION_PATTERN.search(f.read())
+        except OSError:
+            continue
+        if m:
+            return m.group(1)
+    return None
+
+
+def scan_external_lib() -> Dict[str, Dict[str, str]]:
+    # {"packages": {name: version}, "wheels": {name: wheel filename}}
+    packages: Dict[str, str] = {}
+    wheels: Dict[str, str] = {}
+    try:
+        filenames = sorted(os.listdir(EXTERNAL_LIB_DIR))
+    except OSError:  # not bundled (e.g. development installs)
+        filenames = []
+    for filename in filenames:
+        path = os.path.join(EXTERNAL_LIB_DIR, filename)
+        if filename.endswith(".whl"):
+            # blender_validator-1.0.2.1-py3-none-any.whl
+            (pkg, version, _) = filename.split("-", 2)
+            packages[pkg] = version
+            wheels[pkg] = filename
+        elif not filename.startswith((".", "_")) and (
+            os.path.isdir(path) or filename.endswith(".py")
+        ):
+            version = _source_version(path)
+            if version:
+                packages[filename.removesuffix(".py")] = version
+
+    return {"packages": packages, "wheels": wheels}
+
+
+def write_external_lib_manifest() -> Dict[str, Dict[str, str]]:
+    manifest = scan_external_lib()
+    write_json(EXTERNAL_LIB_MANIFEST, manifest)
+    return manifest
+
+
+def read_external_lib_manifest() -> Dict[str, Dict[str, str]]:
+    manifest = read_json(EXTERNAL_LIB_MANIFEST)
+    if not manifest or "wheels" not in manifest:
+        manifest = write_external_lib_manifest()
+    return manifest
+
+
+__all__ = [
+    "EXTERNAL_LIB_DIR",
+    "EXTERNAL_LIB_MANIFEST",
+    "INSTALLED_WHL_MANIFEST",
+    "read_json",
+    "write_json",
+    "scan_external_lib",
+    "write_external_lib_manifest",
+    "read_external_lib_manifest",
+]
+
+
+if __name__ == "__main__":
+    write_external_lib_manifest()
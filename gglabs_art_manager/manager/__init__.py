@@ -1,3 +1,51 @@
-from gglabs_art_manager.manager.blender import register, unregister
+import os
+import time
+
+# NOTE: `bpy` is imported lazily so that the bpy-free parts of the package
+# (e.g. `gglabs_art_manager.batch`) can be imported outside of blender.
+
+# Blender startup is blocked while add-ons register; `register()` logs a warning
+# when importing and registering the add-on takes longer than this.
+REGISTER_TIME_BUDGET_ENV = "GAM_REGISTER_TIME_BUDGET_MS"
+DEFAULT_REGISTER_TIME_BUDGET_MS = 300.0
+
+
+def register_time_budget() -> float:
+    try:
+        return float(os.environ[REGISTER_TIME_BUDGET_ENV]) / 1000
+    except (KeyError, ValueError):
+        return DEFAULT_REGISTER_TIME_BUDGET_MS / 1000
+
+
+def register():
+    # pylint: disable=import-outside-toplevel
+    started = time.perf_counter()
+    from gglabs_art_manager.manager.blender import register as _register
+
+    imported = time.perf_counter()
+    _register()
+    finished = time.perf_counter()
+
+    from gglabs_art_manager.manager.logger import logger
+
+    message = (
+        f"Register :: {(finished - started) * 1000:.1f}ms"
+        f" (import {(imported - started) * 1000:.1f}ms,"
+        f" register {(finished - imported) * 1000:.1f}ms)"
+    )
+    if finished - started > register_time_budget():
+        logger.warning(
+            f"{message} exceeds the budget of {register_time_budget() * 1000:.0f}ms"
+        )
+    else:
+        logger.debug(message)
+
+
+def unregister():
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.manager.blender import unregister as _unregister
+
+    _unregister()
+
 
 __all__ = ["register", "unregister"]
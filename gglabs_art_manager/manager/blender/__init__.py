@@ -1,13 +1,34 @@
 import bpy
 
+from gglabs_art_manager.manager.blender.incremental import (
+    register_live_validation,
+    unregister_live_validation,
+)
 from gglabs_art_manager.manager.blender.operator import (
+    GAM_OT_CancelExport,
+    GAM_OT_ClearExportQueue,
+    GAM_OT_ClearLog,
+    GAM_OT_EnqueueExport,
     GAM_OT_ExportGLB,
+    GAM_OT_ExportGLBVariants,
+    GAM_OT_RemoveExportJob,
     GAM_OT_Reset,
+    GAM_OT_RunExportQueue,
     GAM_OT_ValidateBlender,
 )
-from gglabs_art_manager.manager.blender.panel import GAM_PT_Main
-from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
+from gglabs_art_manager.manager.blender.panel import (
+    GAM_PT_Main,
+    GAM_UL_ExportQueue,
+    GAM_UL_Issues,
+)
+from gglabs_art_manager.manager.blender.property_group import (
+    GAM_PGT_ExportJob,
+    GAM_PGT_Issue,
+    GAM_PGT_Main,
+)
 from gglabs_art_manager.manager.blender.task_controller import TaskTypeToViewControllers
+from gglabs_art_manager.manager.blender.watch import register_watch, unregister_watch
+from gglabs_art_manager.manager.engine import shutdown_formatter_pool
 
 __all__ = [
     "register",
@@ -16,11 +37,23 @@ __all__ = [
 
 _GAM_CLASSES = (
     # Property Groups
+    GAM_PGT_ExportJob,
+    GAM_PGT_Issue,
     GAM_PGT_Main,
     # Operators
     GAM_OT_ExportGLB,
+    GAM_OT_ExportGLBVariants,
+    GAM_OT_EnqueueExport,
+    GAM_OT_RemoveExportJob,
+    GAM_OT_ClearExportQueue,
+    GAM_OT_CancelExport,
+    GAM_OT_RunExportQueue,
     GAM_OT_ValidateBlender,
+    GAM_OT_ClearLog,
     GAM_OT_Reset,
+    # UI Lists
+    GAM_UL_ExportQueue,
+    GAM_UL_Issues,
     # Panels
     GAM_PT_Main,
 )
@@ -41,8 +74,15 @@ def register():
     for cls in _TASK_CONTROLLER_CLASSES:
         cls.register()
 
+    register_live_validation()
+    register_watch()
+
 
 def unregister():
+    unregister_live_validation()
+    unregister_watch()
+    shutdown_formatter_pool()
+
     for cls in reversed(_GAM_CLASSES):
         try:
             bpy.utils.unregister_class(cls)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from blender_validator import ConfigLoader
+from blender_validator.utils import strkey
+
+__all__ = ["CompiledConfig", "load_config", "clear_config_cache"]
+
+
+@dataclass(frozen=True)
+class CompiledConfig:
+    filepath: str
+    digest: str  # sha1 of the yaml contents
+    constants: Any  # result of `ConfigLoader.load`
+
+    # Normalized (`strkey`) lookup tables
+    shapekey_category_keys: FrozenSet[str]
+    parts_category_keys: FrozenSet[str]
+    shapekey_keys: FrozenSet[str]
+
+    @classmethod
+    def compile(cls, filepath: str, digest: str, constants) -> "CompiledConfig":
+        def keys(names: Iterable[str]) -> FrozenSet[str]:
+            return frozenset(strkey(name) for name in names)
+
+        return cls(
+            filepath=filepath,
+            digest=digest,
+            constants=constants,
+            shapekey_category_keys=keys(
+                list(constants.shapekey_categories)
+                + list(constants.custom_shapekey_categories)
+            ),
+            parts_category_keys=keys(constants.parts_categories),
+            shapekey_keys=keys(getattr(constants, "shapekeys", None) or []),
+        )
+
+
+# abspath -> ((st_mtime_ns, st_size), CompiledConfig)
+_CONFIG_CACHE: Dict[str, Tuple[Tuple[int, int], CompiledConfig]] = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+
+def _file_digest(filepath: str) -> str:
+    with open(filepath, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_config(filepath: str) -> CompiledConfig:
+    # Process-wide cache of `ConfigLoader.load`.
+    # A `stat` is enough while the file is untouched; on mtime/size changes the contents
+    # are hashed and the yaml is parsed again only if they have actually changed.
+    # Raises the same errors as `ConfigLoader.load` (ValueError, FileNotFoundError).
+    filepath = os.path.abspath(filepath)
+    st = os.stat(filepath)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    with _CONFIG_CACHE_LOCK:
+        cached: Optional[Tuple[Tuple[int, int], CompiledConfig]] = _CONFIG_CACHE.get(
+            filepath
+        )
+
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        digest = _file_digest(filepath)
+        if cached is not None and cached[1].digest == digest:
+            _CONFIG_CACHE[filepath] = (stamp, cached[1])
+            return cached[1]
+
+        config = CompiledConfig.compile(filepath, digest, ConfigLoader.load(filepath))
+        _CONFIG_CACHE[filepath] = (stamp, config)
+
+        return config
+
+
+def clear_config_cache():
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE.clear()
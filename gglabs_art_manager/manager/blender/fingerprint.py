@@ -0,0 +1,322 @@
+import hashlib
+import os
+from array import array
+from typing import Iterable, List, Optional
+
+import bpy
+
+# Fingerprints of blender data-blocks.
+# - structural fingerprints (`object_fingerprint`, `collection_fingerprint`; collected by
+#   `SceneSnapshot`) are cheap and only cover what validation rules look at: names,
+#   types, hierarchy, modifiers, shapekey names, counts...
+# - content digests (`export_content_digest`) also hash geometry, shapekey deltas,
+#   weights, materials, images and animation curves, i.e. everything that ends up in a GLB.
+
+__all__ = [
+    "object_fingerprint",
+    "collection_fingerprint",
+    "export_content_digest",
+]
+
+
+def _digest(values: List) -> str:
+    return hashlib.sha1(repr(values).encode("utf-8")).hexdigest()[:16]
+
+
+def object_fingerprint(obj: bpy.types.Object) -> str:
+    values = [
+        obj.type,
+        obj.data.name if obj.data else None,
+        obj.parent.name if obj.parent else None,
+        obj.parent_bone,
+        sorted(c.name for c in obj.users_collection),
+        [(m.name, m.type, m.show_viewport, m.show_render) for m in obj.modifiers],
+        [s.material.name if s.material else None for s in obj.material_slots],
+        [g.name for g in obj.vertex_groups],
+        sorted(obj.keys()),
+        obj.hide_render,
+        obj.hide_viewport,
+        tuple(round(v, 5) for row in obj.matrix_basis for v in row),
+    ]
+
+    if obj.type == "MESH":
+        mesh: bpy.types.Mesh = obj.data
+        values += [len(mesh.vertices), len(mesh.edges), len(mesh.polygons)]
+        shape_keys = mesh.shape_keys
+        if shape_keys:
+            values.append(
+                [
+                    (kb.name, kb.relative_key.name, kb.mute)
+                    for kb in shape_keys.key_blocks
+                ]
+            )
+    elif obj.type == "ARMATURE":
+        armature: bpy.types.Armature = obj.data
+        values.append(
+            [(b.name, b.parent.name if b.parent else None) for b in armature.bones]
+        )
+
+    anim = obj.animation_data
+    if anim:
+        values += [
+            anim.action.name if anim.action else None,
+            [(t.name, [s.name for s in t.strips]) for t in anim.nla_tracks],
+        ]
+
+    return _digest(values)
+
+
+def collection_fingerprint(collection: bpy.types.Collection) -> str:
+    return _digest(
+        [
+            [c.name for c in collection.children],
+            sorted(o.name for o in collection.objects),
+            sorted(collection.keys()),
+            collection.hide_render,
+            collection.hide_viewport,
+        ]
+    )
+
+
+def _idprops(id_data) -> List:
+    values = []
+    for k in sorted(id_data.keys()):
+        v = id_data[k]
+        if hasattr(v, "to_dict"):
+            v = v.to_dict()
+        elif hasattr(v, "to_list"):
+            v = v.to_list()
+        values.append((k, repr(v)))
+    return values
+
+
+# Generic attributes: data type -> (property, values per element, is float)
+_ATTRIBUTE_LAYOUTS = {
+    "FLOAT": ("value", 1, True),
+    "INT": ("value", 1, False),
+    "INT8": ("value", 1, False),
+    "BOOLEAN": ("value", 1, False),
+    "FLOAT_VECTOR": ("vector", 3, True),
+    "FLOAT2": ("vector", 2, True),
+    "INT32_2D": ("value", 2, False),
+    "FLOAT_COLOR": ("color", 4, True),
+    "BYTE_COLOR": ("color", 4, True),
+    "QUATERNION": ("value", 4, True),
+    "FLOAT4X4": ("value", 16, True),
+}
+
+
+class _ContentHasher:
+    def __init__(self):
+        self._h = hashlib.sha256()
+        self._seen = set()
+
+    def value(self, *values):
+        self._h.update(repr(values).encode("utf-8"))
+
+    def floats(self, collection, attr: str, width: int):
+        buf = array("f", bytes(4 * len(collection) * width))
+        collection.foreach_get(attr, buf)
+        self._h.update(buf.tobytes())
+
+    def ints(self, collection, attr: str, width: int = 1):
+        buf = array("i", bytes(4 * len(collection) * width))
+        collection.foreach_get(attr, buf)
+        self._h.update(buf.tobytes())
+
+    def attribute(self, attr):
+        self.value(attr.name, attr.domain, attr.data_type)
+        layout = _ATTRIBUTE_LAYOUTS.get(attr.data_type)
+        if layout is None:  # STRING
+            self.value([v.value for v in attr.data])
+            return
+        prop, width, is_float = layout
+        if is_float:
+            self.floats(attr.data, prop, width)
+        else:
+            self.ints(attr.data, prop, width)
+
+    def once(self, id_data) -> bool:
+        # Shared data-blocks (meshes, materials, actions...) are hashed only once.
+        key = (type(id_data).__name__, id_data.name_full)
+        if key in self._seen:
+            self.value("ref", key)
+            return False
+        self._seen.add(key)
+        return True
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+    def image(self, image: bpy.types.Image):
+        if not self.once(image):
+            return
+        self.value(
+            image.name, image.source, tuple(image.size), image.colorspace_settings.name
+        )
+        if image.is_dirty:
+            # Painted but not saved yet; the exporter reads the pixels in memory.
+            buf = array("f", bytes(4 * len(image.pixels)))
+            image.pixels.foreach_get(buf)
+            self._h.update(buf.tobytes())
+        elif image.packed_file:
+            self._h.update(hashlib.sha256(image.packed_file.data).digest())
+        elif image.filepath:
+            path = bpy.path.abspath(image.filepath, library=image.library)
+            try:
+                st = os.stat(path)
+                self.value(path, st.st_mtime_ns, st.st_size)
+            except OSError:
+                self.value(path, None)
+
+    def node_tree(self, tree: Optional[bpy.types.NodeTree]):
+        if tree is None or not self.once(tree):
+            return
+        for node in tree.nodes:
+            self.value(node.name, node.bl_idname)
+            for socket in node.inputs:
+                if hasattr(socket, "default_value"):
+                    v = socket.default_value
+                    self.value(
+                        socket.identifier, tuple(v) if hasattr(v, "__len__") else v
+                    )
+            if getattr(node, "image", None):
+                self.image(node.image)
+            if getattr(node, "node_tree", None):
+                self.node_tree(node.node_tree)
+        for link in tree.links:
+            self.value(
+                link.from_node.name,
+                link.from_socket.identifier,
+                link.to_node.name,
+                link.to_socket.identifier,
+            )
+
+    def material(self, material: Optional[bpy.types.Material]):
+        if material is None:
+            self.value(None)
+            return
+        if not self.once(material):
+            return
+        self.value(material.name, material.blend_method, material.use_backface_culling)
+        self.value(_idprops(material))
+        self.node_tree(material.node_tree if material.use_nodes else None)
+
+    def action(self, action: Optional[bpy.types.Action]):
+        if action is None:
+            self.value(None)
+            return
+        if not self.once(action):
+            return
+        self.value(action.name, tuple(action.frame_range), _idprops(action))
+        for fcurve in action.fcurves:
+            self.value(fcurve.data_path, fcurve.array_index, fcurve.mute)
+            self.floats(fcurve.keyframe_points, "co", 2)
+            self.value([kp.interpolation for kp in fcurve.keyframe_points])
+
+    def mesh(self, mesh: bpy.types.Mesh):
+        if not self.once(mesh):
+            return
+        self.value(mesh.name, _idprops(mesh))
+        self.floats(mesh.vertices, "co", 3)
+        self.ints(mesh.loops, "vertex_index")
+        self.ints(mesh.polygons, "loop_start")
+        self.ints(mesh.polygons, "material_index")
+        self.ints(mesh.edges, "vertices", 2)
+        for uv in mesh.uv_layers:
+            self.value(uv.name, uv.active_render)
+        # UV maps, colors, `sharp_face` and custom attributes; internal attributes
+        # (selection, hidden state...) start with a dot.
+        for attr in mesh.attributes:
+            if not attr.name.startswith("."):
+                self.attribute(attr)
+        if mesh.shape_keys:
+            for kb in mesh.shape_keys.key_blocks:
+                self.value(kb.name, kb.relative_key.name, kb.mute, kb.value)
+                self.floats(kb.data, "co", 3)
+            if mesh.shape_keys.animation_data:
+                self.action(mesh.shape_keys.animation_data.action)
+        for slot_material in mesh.materials:
+            self.material(slot_material)
+
+    def weights(self, mesh: bpy.types.Mesh):
+        # Deform weights have no flat accessor; two `foreach_get` per vertex.
+        for vertex in mesh.vertices:
+            groups = vertex.groups
+            self.value(len(groups))
+            self.ints(groups, "group")
+            self.floats(groups, "weight", 1)
+
+    def armature(self, armature: bpy.types.Armature):
+        if not self.once(armature):
+            return
+        self.value(armature.name, armature.pose_position)
+        for bone in armature.bones:
+            self.value(
+                bone.name,
+                bone.parent.name if bone.parent else None,
+                bone.use_deform,
+                tuple(round(v, 6) for row in bone.matrix_local for v in row),
+                tuple(bone.head_local),
+                tuple(bone.tail_local),
+            )
+
+    def obj(self, obj: bpy.types.Object, with_weights: bool):
+        self.value(object_fingerprint(obj), obj.name, _idprops(obj))
+        self.value(tuple(round(v, 6) for row in obj.matrix_world for v in row))
+        for slot in obj.material_slots:
+            self.value(slot.link)
+            self.material(slot.material)
+
+        if obj.type == "MESH":
+            self.mesh(obj.data)
+            if with_weights and obj.vertex_groups:
+                self.weights(obj.data)
+        elif obj.type == "ARMATURE":
+            self.armature(obj.data)
+            if obj.pose:
+                for pbone in obj.pose.bones:
+                    self.value(
+                        pbone.name,
+                        tuple(pbone.location),
+                        tuple(pbone.rotation_quaternion),
+                        tuple(pbone.rotation_euler),
+                        tuple(pbone.scale),
+                    )
+
+        anim = obj.animation_data
+        if anim:
+            self.action(anim.action)
+            for track in anim.nla_tracks:
+                self.value(track.name, track.mute, track.is_solo)
+                for strip in track.strips:
+                    self.value(
+                        strip.name, strip.frame_start, strip.frame_end, strip.blend_type
+                    )
+                    self.action(strip.action)
+
+
+def export_content_digest(
+    objects: Iterable[bpy.types.Object],
+    scene: Optional[bpy.types.Scene] = None,
+    with_weights: bool = True,
+) -> str:
+    # Digest of every exported input of the given objects (e.g. the visible ones).
+    scene = scene or bpy.context.scene
+    hasher = _ContentHasher()
+    hasher.value(
+        scene.frame_start,
+        scene.frame_end,
+        scene.render.fps,
+        scene.render.fps_base,
+        scene.frame_current,
+    )
+
+    for collection in scene.collection.children_recursive:
+        hasher.value(collection.name, collection_fingerprint(collection))
+        hasher.value(_idprops(collection))
+
+    for obj in sorted(objects, key=lambda o: o.name_full):
+        hasher.obj(obj, with_weights)
+
+    return hasher.hexdigest()
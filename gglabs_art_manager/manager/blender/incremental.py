@@ -0,0 +1,356 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set
+
+import bpy
+
+from gglabs_art_manager.manager.blender.config import CompiledConfig
+from gglabs_art_manager.manager.blender.issue import Issue, find_object_name
+from gglabs_art_manager.manager.blender.pipeline import TASK_TYPE_MAP
+from gglabs_art_manager.manager.blender.rule_profile import RuleTiming, run_rules
+from gglabs_art_manager.manager.blender.snapshot import SceneSnapshot
+from gglabs_art_manager.manager.engine.cache import cache_root
+from gglabs_art_manager.manager.logger import logger, tracer
+from gglabs_art_manager.version import __version__
+
+# Incremental validation.
+# Every object/collection gets a cheap structural fingerprint (names, types, hierarchy,
+# modifiers, shapekey names, counts...). The fingerprints of the last run are persisted
+# with its result in a sidecar file per blend file and scene, and validation rules only
+# run again when a data-block has changed since then.
+# The state is kept out of the scene: scene custom properties are exported as extras.
+
+# Scene custom property of older versions; removed when the state is saved.
+VALIDATION_STATE_KEY = "gam_validation_state"
+
+# States of files that were never saved, for the session only
+_unsaved_states: Dict[str, str] = {}
+
+__all__ = [
+    "ValidationState",
+    "IncrementalValidationResult",
+    "validate_incremental",
+    "validation_issues",
+    "format_validation_message",
+    "register_live_validation",
+    "unregister_live_validation",
+]
+
+
+@dataclass
+class ValidationState:
+    task_type: str
+    config_digest: str
+    version: str
+    passed: bool
+    message: str
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+    failed_rule: str = ""
+    fail_fast: bool = False
+
+    def is_compatible(
+        self, task_type: str, config: CompiledConfig, fail_fast: bool = False
+    ) -> bool:
+        # A fail-fast result is not reused by a full validation.
+        return (
+            self.task_type == task_type
+            and self.config_digest == config.digest
+            and self.version == __version__
+            and (fail_fast or not self.fail_fast)
+        )
+
+    def dirty_keys(self, fingerprints: Dict[str, str]) -> Set[str]:
+        keys = set(self.fingerprints) | set(fingerprints)
+        return {k for k in keys if self.fingerprints.get(k) != fingerprints.get(k)}
+
+    @classmethod
+    def load(cls, scene: bpy.types.Scene) -> Optional["ValidationState"]:
+        path = _state_path(scene)
+        if path is None:
+            raw = _unsaved_states.get(scene.name_full)
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                raw = None
+        if not raw:
+            return None
+        try:
+            return cls(**json.loads(raw))
+        except (TypeError, ValueError):
+            return None
+
+    def save(self, scene: bpy.types.Scene):
+        if VALIDATION_STATE_KEY in scene:
+            del scene[VALIDATION_STATE_KEY]
+
+        raw = json.dumps(asdict(self))
+        path = _state_path(scene)
+        if path is None:
+            _unsaved_states[scene.name_full] = raw
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part_path = f"{path}.{os.getpid()}.part"
+            with open(part_path, "w", encoding="utf-8") as f:
+                f.write(raw)
+            os.replace(part_path, path)
+        except OSError as e:
+            logger.warning(f"Validation :: failed to save the validation state :: {e}")
+
+    @classmethod
+    def clear(cls, scene: bpy.types.Scene):
+        if VALIDATION_STATE_KEY in scene:
+            del scene[VALIDATION_STATE_KEY]
+        path = _state_path(scene)
+        if path is None:
+            _unsaved_states.pop(scene.name_full, None)
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _state_path(scene: bpy.types.Scene) -> Optional[str]:
+    if not bpy.data.filepath:
+        return None
+    key = f"{os.path.abspath(bpy.data.filepath)}\0{scene.name_full}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_root(), "validation", f"{digest}.json")
+
+
+@dataclass
+class IncrementalValidationResult:
+    passed: bool
+    message: str
+    dirty: List[str]
+    skipped: bool  # True if the previous result was reused without running any rule
+    timings: List[RuleTiming] = field(default_factory=list)
+    failed_rule: str = ""
+    fixed: List[str] = field(default_factory=list)  # data-blocks changed by the rules
+
+
+def validate_incremental(
+    task_type: str, config: CompiledConfig, force: bool = False, fail_fast: bool = False
+) -> IncrementalValidationResult:
+    # NOTE: `blender_validator` has no per-object entrypoint, so a dirty scene is still
+    #       validated as a whole. What's saved is every run on an unchanged scene.
+    scene = bpy.context.scene
+    with tracer.span("snapshot"):
+        fingerprints = SceneSnapshot.capture(scene).fingerprints
+    state = ValidationState.load(scene)
+
+    if (
+        state is not None
+        and state.is_compatible(task_type, config, fail_fast)
+        and not force
+    ):
+        dirty = sorted(state.dirty_keys(fingerprints))
+        if not dirty:
+            return IncrementalValidationResult(
+                state.passed,
+                state.message,
+                dirty,
+                skipped=True,
+                failed_rule=state.failed_rule,
+            )
+    else:
+        dirty = sorted(fingerprints)
+
+    logger.log(f"Validation :: {len(dirty)} dirty data-blocks")
+    with tracer.span("validator", dirty=len(dirty)):
+        rule_result = run_rules(TASK_TYPE_MAP[task_type], config, fail_fast=fail_fast)
+    if rule_result.error is not None:
+        passed, message = False, str(rule_result.error)
+        failed_rule = rule_result.timings[-1].name
+    else:
+        passed, message, failed_rule = True, "", ""
+
+    # Rules may have fixed the scene; remember the fixed state.
+    with tracer.span("snapshot"):
+        fixed_fingerprints = SceneSnapshot.capture(scene).fingerprints
+    keys = set(fingerprints) | set(fixed_fingerprints)
+    fixed = sorted(k for k in keys if fingerprints.get(k) != fixed_fingerprints.get(k))
+    fingerprints = fixed_fingerprints
+    ValidationState(
+        task_type=task_type,
+        config_digest=config.digest,
+        version=__version__,
+        passed=passed,
+        message=message,
+        fingerprints=fingerprints,
+        failed_rule=failed_rule,
+        fail_fast=fail_fast,
+    ).save(scene)
+
+    return IncrementalValidationResult(
+        passed,
+        message,
+        dirty,
+        skipped=False,
+        timings=rule_result.timings,
+        failed_rule=failed_rule,
+        fixed=fixed,
+    )
+
+
+def validation_issues(result: IncrementalValidationResult) -> List[Issue]:
+    # One issue per line of the validator error
+    object_names = bpy.context.scene.objects.keys()
+    return [
+        Issue(
+            severity="ERROR",
+            rule=result.failed_rule,
+            object_name=find_object_name(line, object_names) or "",
+            message=line.strip(),
+        )
+        for line in result.message.splitlines()
+        if line.strip()
+    ]
+
+
+# Live mode
+# A depsgraph handler collects the names of updated data-blocks, and a timer
+# revalidates once the scene has been quiet for `LIVE_VALIDATION_DEBOUNCE` seconds.
+# Rules fix the scene as they validate it, so fixes made by a live run get their own
+# undo step and are reported in the log and the panel. Undo/redo restores a scene
+# the rules would fix again, so the restored scene is left alone until it is edited.
+
+LIVE_VALIDATION_UNDO_MESSAGE = "실시간 유효성 검사 보정"
+
+LIVE_VALIDATION_POLL = 0.5
+LIVE_VALIDATION_DEBOUNCE = 1.5
+
+_live_dirty: Set[str] = set()
+_live_last_update = 0.0
+_live_running = False
+# Fingerprints of the scene restored by undo/redo
+_live_restored: Optional[Dict[str, str]] = None
+
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph):
+    global _live_last_update  # pylint: disable=global-statement
+
+    if _live_running:
+        return
+
+    for update in depsgraph.updates:
+        _live_dirty.add(update.id.name)
+    if _live_dirty:
+        _live_last_update = time.monotonic()
+
+
+@bpy.app.handlers.persistent
+def _on_undo_redo(scene, *_args):
+    global _live_restored  # pylint: disable=global-statement
+
+    _live_restored = SceneSnapshot.capture(scene).fingerprints
+
+
+def _live_validation_tick() -> float:
+    global _live_running, _live_restored  # pylint: disable=global-statement
+
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.manager.blender.property_group import (
+        GAM_PGT_Main,
+        store_issues,
+    )
+
+    if not _live_dirty:
+        return LIVE_VALIDATION_POLL
+    if time.monotonic() - _live_last_update < LIVE_VALIDATION_DEBOUNCE:
+        return LIVE_VALIDATION_POLL
+
+    _live_dirty.clear()
+    props = GAM_PGT_Main.getprops()
+    if not props.live_validation or not props.is_validate_config_loaded:
+        return LIVE_VALIDATION_POLL
+    if _live_restored is not None:
+        if SceneSnapshot.capture(bpy.context.scene).fingerprints == _live_restored:
+            return LIVE_VALIDATION_POLL
+        _live_restored = None
+
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.manager.blender.config import load_config
+
+    _live_running = True
+    try:
+        config = load_config(bpy.path.abspath(props.validate_config_filepath))
+        result = validate_incremental(props.task_type, config)
+    except (ValueError, FileNotFoundError) as e:
+        logger.error(f"Live Validation :: {e}")
+        return LIVE_VALIDATION_POLL
+    finally:
+        _live_running = False
+
+    if result.fixed:
+        _push_live_fix_undo(result.fixed)
+    if not result.skipped:
+        props.is_blender_validated = result.passed
+        props.blender_validated_message = format_validation_message(result)
+        store_issues(props.validation_issues, validation_issues(result))
+
+    return LIVE_VALIDATION_POLL
+
+
+def _push_live_fix_undo(fixed: List[str]):
+    logger.log(f"Live Validation :: fixed {', '.join(fixed)}")
+    try:
+        bpy.ops.ed.undo_push(message=LIVE_VALIDATION_UNDO_MESSAGE)
+    except RuntimeError as e:
+        # No undo stack outside of a window (e.g. while loading a file)
+        logger.warning(f"Live Validation :: failed to push an undo step :: {e}")
+
+
+def format_validation_message(result: IncrementalValidationResult) -> str:
+    if result.passed:
+        message = "✅ Blender 파일이 유효성 검사를 마쳤습니다. 이제 GLB를 생성해도 좋습니다!"
+    else:
+        lines = result.message.strip().splitlines() or [""]
+        message = f"⚠️ {lines[0]}"
+        if len(lines) > 1:
+            message += f"\n(외 {len(lines) - 1}건은 아래 목록을 확인해주세요.)"
+
+    if result.skipped:
+        message += "\n(변경된 오브젝트가 없어 이전 검사 결과를 사용합니다.)"
+    else:
+        message += f"\n(변경된 데이터 {len(result.dirty)}건을 검사했습니다.)"
+        if result.fixed:
+            message += f"\n(규칙이 데이터 {len(result.fixed)}건을 보정했습니다. 되돌리면 다시 편집하기 전까지는 보정하지 않습니다.)"
+        if result.timings:
+            elapsed = sum(t.elapsed for t in result.timings)
+            message += f"\n(규칙 {len(result.timings)}개 실행, {elapsed:.2f}초)"
+
+    return message
+
+
+def register_live_validation():
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if _on_undo_redo not in handlers:
+            handlers.append(_on_undo_redo)
+    if not bpy.app.timers.is_registered(_live_validation_tick):
+        bpy.app.timers.register(
+            _live_validation_tick, first_interval=LIVE_VALIDATION_POLL, persistent=True
+        )
+
+
+def unregister_live_validation():
+    global _live_restored  # pylint: disable=global-statement
+
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if _on_undo_redo in handlers:
+            handlers.remove(_on_undo_redo)
+    if bpy.app.timers.is_registered(_live_validation_tick):
+        bpy.app.timers.unregister(_live_validation_tick)
+    _live_dirty.clear()
+    _live_restored = None
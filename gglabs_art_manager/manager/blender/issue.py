@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+__all__ = ["ISSUE_SEVERITIES", "Issue", "find_object_name"]
+
+ISSUE_SEVERITIES = ["ERROR", "WARNING", "INFO"]
+
+
+@dataclass
+class Issue:
+    # An entry of the validation/rename reports, shown in `GAM_UL_Issues`.
+    severity: str  # one of `ISSUE_SEVERITIES`
+    rule: str
+    object_name: str
+    message: str
+
+
+def find_object_name(message: str, object_names: Iterable[str]) -> Optional[str]:
+    # Validator errors are plain text; pick the longest object name mentioned.
+    found = None
+    for name in object_names:
+        if name in message and (found is None or len(name) > len(found)):
+            found = name
+    return found
@@ -1,24 +1,28 @@
-import os
+import uuid
+from typing import Dict, Optional
 
 import bpy
-from blender_validator import BlenderValidator, ConfigLoader, TaskType
-from blender_validator.exception import BlenderValidateError
-from blender_validator.rules.collection import WriteCollectionInfoCustomPropertiesRule
-from blender_validator.utils import load_bpy_context, save_bpy_context
-from gltf_formatter import GltfFormatter
-from gltf_formatter.exception import RuleApplyError
-
-from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
-from gglabs_art_manager.manager.blender.task_controller import reset_task_controllers
-from gglabs_art_manager.manager.blender.utils import control_visibilities_for_tasktype
-from gglabs_art_manager.manager.logger import logger
-from gglabs_art_manager.manager.model import (
-    Project,
-    TaskTypeGltfOptions,
-    TaskTypeToTargetResourceType,
-)
+from blender_validator import TaskType
 
-TASK_TYPE_MAP = {task.name: task for task in TaskType}
+from gglabs_art_manager.manager.blender.config import load_config
+from gglabs_art_manager.manager.blender.incremental import (
+    format_validation_message,
+    validate_incremental,
+    validation_issues,
+)
+from gglabs_art_manager.manager.blender.pipeline import (
+    EXPORT_STAGES,
+    PendingExport,
+    export_glb,
+    export_glb_stages,
+    export_glb_variants,
+)
+from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main, store_issues
+from gglabs_art_manager.manager.blender.task_controller import reset_task_controllers
+from gglabs_art_manager.manager.blender.tracing import operator_trace, trace_dirpath
+from gglabs_art_manager.manager.engine import GltfFormatError
+from gglabs_art_manager.manager.logger import LogLevel, logger, tracer
+from gglabs_art_manager.manager.model import Project
 
 
 class GAM_OT_ValidateBlender(bpy.types.Operator):
@@ -27,6 +31,19 @@ class GAM_OT_ValidateBlender(bpy.types.Operator):
     bl_description = "Blender 파일의 유효성 검사를 진행합니다."
     bl_options = {"REGISTER", "UNDO"}
 
+    # pylint: disable=reportInvalidTypeForm
+    force: bpy.props.BoolProperty(
+        name="전체 다시 검사",
+        description="변경 여부와 상관없이 모든 규칙을 다시 실행합니다.",
+        default=False,
+    )
+
+    fail_fast: bpy.props.BoolProperty(
+        name="빠른 검사",
+        description="이전 실행 시간이 짧은 규칙부터 실행하고, 처음 실패한 규칙에서 멈춥니다.",
+        default=False,
+    )
+
     def execute(self, context):
         accessor = GAM_PGT_Main
 
@@ -35,33 +52,24 @@ class GAM_OT_ValidateBlender(bpy.types.Operator):
 
         config: str = accessor.getattr_abspath("validate_config_filepath")
 
-        try:
-            rule_constants = ConfigLoader.load(config)
-        except (ValueError, FileNotFoundError):
-            message = "유효성 검사 설정 파일을 다시 확인해주세요."
-            accessor.setattr("is_blender_validated", False)
-            accessor.setattr("blender_validated_message", message)
-            return {"FINISHED"}
-
-        validator = BlenderValidator(
-            TASK_TYPE_MAP[mode],
-            rule_constants,
-            use_default_rules=True,
-            custom_rules=[],
-            exclude_rules=[],
-            logger=logger,
-        )
-
-        try:
-            validator.validate_and_fix()
-        except BlenderValidateError as e:
-            message = f"⚠️ {str(e)}"
-            accessor.setattr("is_blender_validated", False)
-        else:
-            message = "✅ Blender 파일이 유효성 검사를 마쳤습니다. 이제 GLB를 생성해도 좋습니다!"
-            accessor.setattr("is_blender_validated", True)
-
-        accessor.setattr("blender_validated_message", message)
+        with operator_trace("validate_blender"):
+            try:
+                with tracer.span("load_config"):
+                    compiled_config = load_config(config)
+            except (ValueError, FileNotFoundError):
+                message = "유효성 검사 설정 파일을 다시 확인해주세요."
+                accessor.setattr("is_blender_validated", False)
+                accessor.setattr("blender_validated_message", message)
+                accessor.getprops().validation_issues.clear()
+                return {"FINISHED"}
+
+            result = validate_incremental(
+                mode, compiled_config, force=self.force, fail_fast=self.fail_fast
+            )
+
+        accessor.setattr("is_blender_validated", result.passed)
+        accessor.setattr("blender_validated_message", format_validation_message(result))
+        store_issues(accessor.getprops().validation_issues, validation_issues(result))
 
         return {"FINISHED"}
 
@@ -69,6 +77,10 @@ class GAM_OT_ValidateBlender(bpy.types.Operator):
         return context.window_manager.invoke_confirm(self, event)
 
 
+def clip_mode_of(animation_clip_mode: str) -> Optional[str]:
+    return None if animation_clip_mode == "NONE" else animation_clip_mode
+
+
 class GAM_OT_ExportGLB(bpy.types.Operator):
     bl_idname = "gglabs_art_manager.export_glb"
     bl_label = "Export GLB file in the regularized format"
@@ -78,73 +90,410 @@ class GAM_OT_ExportGLB(bpy.types.Operator):
     def execute(self, context):
         accessor = GAM_PGT_Main
         config: str = accessor.getattr_abspath("validate_config_filepath")
-        constants = ConfigLoader.load(config)
 
-        # 1. visibility control
         task_type: str = accessor.getattr("task_type")
+        glb_type: str = accessor.getattr("glb_type")
+        output_path: str = accessor.getattr_abspath("output_dirpath")
 
-        # TODO: Make this controlled by mode and project
-        context = save_bpy_context()
-        control_visibilities_for_tasktype(
-            task_type,
-            constants.shapekey_categories + constants.custom_shapekey_categories,
-        )
+        use_cache: bool = accessor.getattr_bool("use_export_cache")
+        quantize: bool = accessor.getattr_bool("use_quantization")
+        encode_textures: bool = accessor.getattr_bool("use_texture_encoding")
+        clip_mode = clip_mode_of(accessor.getattr("animation_clip_mode"))
+
+        with operator_trace("export_glb"):
+            with tracer.span("load_config"):
+                compiled_config = load_config(config)
+
+            glb_filepath = export_glb(
+                task_type,
+                compiled_config,
+                output_path,
+                glb_type,
+                use_cache=use_cache,
+                quantize=quantize,
+                encode_textures=encode_textures,
+                clip_mode=clip_mode,
+            )
 
-        # 2. Generate custom properties for gltf formatting rules.
-        validator = BlenderValidator(
-            TaskType.ANY,
-            constants,
-            use_default_rules=False,
-            custom_rules=[WriteCollectionInfoCustomPropertiesRule],
-            logger=logger,
+        self.report(
+            {"INFO"},
+            f"Model file created :: {glb_filepath}",
         )
-        try:
-            validator.validate_and_fix()
-        except BlenderValidateError as e:
-            logger.log(str(e))
 
-        # 3. Filepath
-        glb_type: str = accessor.getattr("glb_type")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+
+class GAM_OT_ExportGLBVariants(bpy.types.Operator):
+    bl_idname = "gglabs_art_manager.export_glb_variants"
+    bl_label = "Export GLB files of every task type"
+    bl_description = "작업 단계별 GLB 파일(FACE_RIGGING, ANIMATING 등)을 한 번에 export 합니다."
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        accessor = GAM_PGT_Main
+        config: str = accessor.getattr_abspath("validate_config_filepath")
 
+        glb_type: str = accessor.getattr("glb_type")
         output_path: str = accessor.getattr_abspath("output_dirpath")
-        current_filename: str = bpy.path.basename(
-            bpy.context.blend_data.filepath
-        ).rsplit(".", 1)[0]
-        temp_filepath = os.path.join(output_path, f"temp_{current_filename}.{glb_type}")
-        glb_filepath = os.path.join(output_path, f"{current_filename}.{glb_type}")
-
-        # 4. Create an intermediate gltf file
-        export_format = "GLB" if glb_type == "glb" else "GLTF_EMBEDDED"
-        bpy.ops.export_scene.gltf(
-            filepath=temp_filepath,
-            export_format=export_format,
-            export_nla_strips_merged_animation_name="animation",
-            **TaskTypeGltfOptions[task_type],
-        )
 
-        # 5. Postprocess GLB
-        rule_formatter = GltfFormatter(
-            TaskTypeToTargetResourceType[task_type], strict_mode=True, logger=logger
-        )
+        use_cache: bool = accessor.getattr_bool("use_export_cache")
+        quantize: bool = accessor.getattr_bool("use_quantization")
+        encode_textures: bool = accessor.getattr_bool("use_texture_encoding")
+
         try:
-            rule_formatter.format_and_save(temp_filepath, glb_filepath)
-        except RuleApplyError as e:
-            logger.log(e)
-            raise
+            with operator_trace("export_glb_variants"):
+                with tracer.span("load_config"):
+                    compiled_config = load_config(config)
+
+                glb_filepaths = export_glb_variants(
+                    compiled_config,
+                    output_path,
+                    glb_type,
+                    use_cache=use_cache,
+                    quantize=quantize,
+                    encode_textures=encode_textures,
+                )
+        except GltfFormatError as e:
+            self.report({"ERROR"}, f"Export Failed :: {e}")
+            return {"CANCELLED"}
+
+        for glb_filepath in glb_filepaths.values():
+            self.report(
+                {"INFO"},
+                f"Model file created :: {glb_filepath}",
+            )
 
-        # 9. Clean up
-        os.remove(temp_filepath)
-        load_bpy_context(context)
+        return {"FINISHED"}
 
-        self.report(
-            {"INFO"},
-            f"Model file created :: {glb_filepath}",
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+
+EXPORT_STAGE_LABELS = {
+    "visibility": "오브젝트 표시 상태 설정",
+    "custom_properties": "커스텀 속성 생성",
+    "cache": "export 캐시 확인",
+    "gltf_export": "glTF export",
+    "format": "GLB 후처리",
+}
+
+
+def tag_redraw_view3d(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+
+class GAM_OT_EnqueueExport(bpy.types.Operator):
+    bl_idname = "gglabs_art_manager.enqueue_export"
+    bl_label = "Add an export job to the export queue"
+    bl_description = "현재 설정으로 GLB export 작업을 대기열에 추가합니다."
+    bl_options = {"REGISTER"}
+
+    # pylint: disable=reportInvalidTypeForm
+    run: bpy.props.BoolProperty(
+        name="바로 실행",
+        description="추가한 뒤 대기열을 실행합니다.",
+        default=False,
+    )
+
+    def execute(self, context):
+        props = GAM_PGT_Main.getprops()
+
+        job = props.export_queue.add()
+        job.name = uuid.uuid4().hex[:8]
+        job.task_type = props.task_type
+        job.glb_type = props.glb_type
+        job.output_dirpath = props.output_dirpath
+        job.validate_config_filepath = props.validate_config_filepath
+        job.use_export_cache = props.use_export_cache
+        job.use_quantization = props.use_quantization
+        job.use_texture_encoding = props.use_texture_encoding
+        job.animation_clip_mode = props.animation_clip_mode
+        props.export_queue_index = len(props.export_queue) - 1
+
+        if self.run and not GAM_OT_RunExportQueue.running:
+            bpy.ops.gglabs_art_manager.run_export_queue("INVOKE_DEFAULT")
+
+        return {"FINISHED"}
+
+
+class GAM_OT_RemoveExportJob(bpy.types.Operator):
+    bl_idname = "gglabs_art_manager.remove_export_job"
+    bl_label = "Remove the selected export job"
+    bl_description = "선택한 export 작업을 대기열에서 삭제합니다."
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        props = GAM_PGT_Main.getprops()
+        if not 0 <= props.export_queue_index < len(props.export_queue):
+            return False
+        return props.export_queue[props.export_queue_index].status not in {
+            "RUNNING",
+            "FORMATTING",
+        }
+
+    def execute(self, context):
+        props = GAM_PGT_Main.getprops()
+        props.export_queue.remove(props.export_queue_index)
+        props.export_queue_index = min(
+            props.export_queue_index, len(props.export_queue) - 1
+        )
+        return {"FINISHED"}
+
+
+class GAM_OT_ClearExportQueue(bpy.types.Operator):
+    bl_idname = "gglabs_art_manager.clear_export_queue"
+    bl_label = "Clear finished export jobs"
+    bl_description = "완료/실패/취소된 export 작업을 대기열에서 삭제합니다."
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        props = GAM_PGT_Main.getprops()
+        for idx in reversed(range(len(props.export_queue))):
+            if props.export_queue[idx].status not in {
+                "PENDING",
+                "RUNNING",
+                "FORMATTING",
+            }:
+                props.export_queue.remove(idx)
+        props.export_queue_index = max(0, len(props.export_queue) - 1)
+        return {"FINISHED"}
+
+
+class GAM_OT_CancelExport(bpy.types.Operator):
+    bl_idname = "gglabs_art_manager.cancel_export"
+    bl_label = "Cancel the running export queue"
+    bl_description = "진행 중인 export를 취소하고 대기열 실행을 멈춥니다."
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        return GAM_OT_RunExportQueue.running
+
+    def execute(self, context):
+        GAM_OT_RunExportQueue.cancel_requested = True
+        return {"FINISHED"}
+
+
+class GAM_OT_RunExportQueue(bpy.types.Operator):
+    # Drains the export queue on a timer, one export stage per tick, so that the UI stays
+    # responsive between stages and the export can be cancelled.
+    # `GltfFormatter` runs in worker processes, so the next export starts right away.
+    # NOTE: a single blender-side stage (e.g. the glTF exporter) still blocks while it runs.
+    bl_idname = "gglabs_art_manager.run_export_queue"
+    bl_label = "Run the export queue"
+    bl_description = "대기열의 GLB export 작업들을 순서대로 실행합니다."
+    bl_options = {"REGISTER"}
+
+    tick_interval = 0.05
+
+    # Shared between instances; there is only one queue runner at a time.
+    running = False
+    cancel_requested = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timer = None
+        self._stages = None
+        # Items of a CollectionProperty may move in memory when the queue is edited,
+        # so jobs are looked up by their (unique) names.
+        self._job_name = None
+        # job name -> export whose formatting runs in a worker process
+        self._formatting: Dict[str, PendingExport] = {}
+
+    def next_pending_job(self):
+        props = GAM_PGT_Main.getprops()
+        for job in props.export_queue:
+            if job.status == "PENDING":
+                return job
+        return None
+
+    def start_job(self, job, background_format: bool):
+        props = GAM_PGT_Main.getprops()
+        job.status = "RUNNING"
+        job.message = ""
+        props.export_progress = 0.0
+        props.export_stage_message = ""
+
+        self._job_name = job.name
+        tracer.start_trace(f"export_queue_{job.task_type.lower()}")
+        with tracer.span("load_config"):
+            compiled_config = load_config(
+                bpy.path.abspath(job.validate_config_filepath)
+            )
+        self._stages = export_glb_stages(
+            job.task_type,
+            compiled_config,
+            bpy.path.abspath(job.output_dirpath),
+            job.glb_type,
+            use_cache=job.use_export_cache,
+            background_format=background_format,
+            quantize=job.use_quantization,
+            encode_textures=job.use_texture_encoding,
+            clip_mode=clip_mode_of(job.animation_clip_mode),
         )
 
+    def set_job_status(self, job_name: str, status: str, message: str):
+        job = GAM_PGT_Main.getprops().export_queue.get(job_name)
+        if job is not None:
+            job.status = status
+            job.message = message
+
+    def finish_job(self, status: str, message: str):
+        tracer.finish_trace(trace_dirpath())
+        self.set_job_status(self._job_name, status, message)
+        self._job_name = None
+        self._stages = None
+
+    def finish_export(self, job_name: str, pending: PendingExport):
+        try:
+            glb_filepath = pending.result()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"Export Failed :: {e}")
+            self.set_job_status(job_name, "FAILED", str(e))
+        else:
+            self.set_job_status(job_name, "DONE", glb_filepath)
+            self.report({"INFO"}, f"Model file created :: {glb_filepath}")
+
+    def poll_formatting(self):
+        for job_name, pending in list(self._formatting.items()):
+            if pending.done():
+                del self._formatting[job_name]
+                self.finish_export(job_name, pending)
+
+    def step(self, background_format: bool = True) -> bool:
+        # Advances the queue by a single stage. Returns False once the queue is drained.
+        # Formatting of finished exports overlaps with the next export.
+        props = GAM_PGT_Main.getprops()
+        self.poll_formatting()
+
+        if self._stages is None:
+            job = self.next_pending_job()
+            if job is None:
+                return len(self._formatting) > 0
+            try:
+                self.start_job(job, background_format)
+            except (ValueError, FileNotFoundError):
+                self.finish_job("FAILED", "유효성 검사 설정 파일을 다시 확인해주세요.")
+                return True
+
+        try:
+            stage = next(self._stages)
+        except StopIteration as e:
+            pending: PendingExport = e.value
+            job_name = self._job_name
+            self.finish_job("FORMATTING", "")
+            if pending.done():  # pylint: disable=no-member
+                self.finish_export(job_name, pending)
+            else:
+                self._formatting[job_name] = pending
+            props.export_progress = 1.0
+            props.export_stage_message = ""
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"Export Failed :: {e}")
+            self.finish_job("FAILED", str(e))
+        else:
+            props.export_progress = EXPORT_STAGES.index(stage) / len(EXPORT_STAGES)
+            props.export_stage_message = EXPORT_STAGE_LABELS[stage]
+
+        return True
+
+    def cancel_job(self):
+        if self._stages is not None:
+            self._stages.close()  # restores the bpy context
+            self.finish_job("CANCELLED", "")
+
+        # Running formatters can't be interrupted; they still replace their output
+        # atomically, but the jobs are reported as cancelled.
+        for job_name, pending in self._formatting.items():
+            pending.cancel()
+            self.set_job_status(job_name, "CANCELLED", "")
+        self._formatting.clear()
+
+    def end(self, context):
+        props = GAM_PGT_Main.getprops()
+        props.export_stage_message = ""
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        GAM_OT_RunExportQueue.running = False
+        GAM_OT_RunExportQueue.cancel_requested = False
+        tag_redraw_view3d(context)
+
+    def execute(self, context):
+        # Blocking variant for scripts and background mode.
+        GAM_OT_RunExportQueue.running = True
+        try:
+            while self.step(background_format=False):
+                pass
+        finally:
+            self.end(context)
         return {"FINISHED"}
 
     def invoke(self, context, event):
-        return context.window_manager.invoke_confirm(self, event)
+        if GAM_OT_RunExportQueue.running:
+            self.report({"WARNING"}, "이미 export 대기열이 실행 중입니다.")
+            return {"CANCELLED"}
+        if self.next_pending_job() is None:
+            self.report({"INFO"}, "대기 중인 export 작업이 없습니다.")
+            return {"CANCELLED"}
+
+        GAM_OT_RunExportQueue.running = True
+        GAM_OT_RunExportQueue.cancel_requested = False
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(self.tick_interval, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        if event.type == "ESC" or GAM_OT_RunExportQueue.cancel_requested:
+            # `end` always runs, so that the queue can be started again.
+            try:
+                self.cancel_job()
+                for job in GAM_PGT_Main.getprops().export_queue:
+                    if job.status == "PENDING":
+                        job.status = "CANCELLED"
+            finally:
+                self.end(context)
+            self.report({"WARNING"}, "export가 취소되었습니다.")
+            return {"CANCELLED"}
+
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        has_more = self.step()
+        tag_redraw_view3d(context)
+
+        if not has_more:
+            self.end(context)
+            return {"FINISHED"}
+
+        return {"PASS_THROUGH"}
+
+    def cancel(self, context):
+        # Called by blender when the operator is aborted (e.g. on file load).
+        try:
+            self.cancel_job()
+        finally:
+            self.end(context)
+
+
+class GAM_OT_ClearLog(bpy.types.Operator):
+    bl_idname = "gglabs_art_manager.clear_log"
+    bl_label = "Clear the log buffer"
+    bl_description = "패널에 표시된 로그를 모두 지웁니다."
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        logger.clear()
+        return {"FINISHED"}
 
 
 class GAM_OT_Reset(bpy.types.Operator):
@@ -162,8 +511,22 @@ class GAM_OT_Reset(bpy.types.Operator):
         accessor.setattr("validate_config_loaded_message", "")
         accessor.setattr("is_blender_validated", False)
         accessor.setattr("blender_validated_message", "")
+        GAM_PGT_Main.getprops().validation_issues.clear()
+        accessor.setattr("live_validation", False)
         accessor.setattr("output_dirpath", "//")
         accessor.setattr("glb_type", "glb")
+        accessor.setattr("use_export_cache", True)
+        accessor.setattr("use_quantization", False)
+        accessor.setattr("use_texture_encoding", True)
+        accessor.setattr("animation_clip_mode", "NONE")
+        accessor.setattr("watch_export", False)
+        accessor.setattr("show_log", False)
+        accessor.setattr("log_level", LogLevel.INFO.name)
+        accessor.setattr("log_line_count", 15)
+        accessor.setattr("show_trace", False)
+        accessor.setattr("trace_dirpath", "")
+        if not GAM_OT_RunExportQueue.running:
+            GAM_PGT_Main.getprops().export_queue.clear()
 
         reset_task_controllers()
 
@@ -1,16 +1,116 @@
+import time
 from typing import Optional
 
 import bpy
 
 from gglabs_art_manager.manager.blender.operator import (
-    GAM_OT_ExportGLB,
+    GAM_OT_CancelExport,
+    GAM_OT_ClearExportQueue,
+    GAM_OT_ClearLog,
+    GAM_OT_EnqueueExport,
+    GAM_OT_ExportGLBVariants,
+    GAM_OT_RemoveExportJob,
     GAM_OT_Reset,
+    GAM_OT_RunExportQueue,
     GAM_OT_ValidateBlender,
 )
-from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
+from gglabs_art_manager.manager.blender.property_group import (
+    ISSUE_SEVERITY_ITEMS,
+    GAM_PGT_Main,
+)
+from gglabs_art_manager.manager.blender.rule_profile import rule_profiles
 from gglabs_art_manager.manager.blender.task_controller import TaskTypeToViewControllers
+from gglabs_art_manager.manager.logger import LogLevel, logger, tracer
 from gglabs_art_manager.version import __version__
 
+TRACE_SLOWEST_RULES = 8
+
+LOG_LEVEL_ICONS = {
+    LogLevel.DEBUG: "BLANK1",
+    LogLevel.INFO: "INFO",
+    LogLevel.WARNING: "ERROR",
+    LogLevel.ERROR: "CANCEL",
+}
+
+EXPORT_JOB_STATUS_ICONS = {
+    "PENDING": "SORTTIME",
+    "RUNNING": "PLAY",
+    "FORMATTING": "MODIFIER",
+    "DONE": "CHECKMARK",
+    "FAILED": "ERROR",
+    "CANCELLED": "CANCEL",
+}
+
+
+class GAM_UL_ExportQueue(bpy.types.UIList):
+    def draw_item(
+        self, context, layout, data, item, icon, active_data, active_propname, index
+    ):
+        row = layout.row()
+        row.label(
+            text=f"{item.task_type} · {item.glb_type} · {item.output_dirpath}",
+            icon=EXPORT_JOB_STATUS_ICONS[item.status],
+        )
+        if item.message:
+            row.label(text=bpy.path.basename(item.message) or item.message)
+
+
+ISSUE_SEVERITY_ICONS = {
+    "ERROR": "ERROR",
+    "WARNING": "INFO",
+    "INFO": "DOT",
+}
+
+ISSUE_LIST_ROWS = 6
+
+
+class GAM_UL_Issues(bpy.types.UIList):
+    # Only the visible rows are drawn, however many issues there are.
+    # pylint: disable=reportInvalidTypeForm
+    severity_filter: bpy.props.EnumProperty(
+        name="",
+        items=[("ALL", "전체", "모든 수준")] + ISSUE_SEVERITY_ITEMS,
+        default="ALL",
+    )
+
+    def draw_item(
+        self, context, layout, data, item, icon, active_data, active_propname, index
+    ):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon=ISSUE_SEVERITY_ICONS[item.severity])
+        if item.object_name:
+            row.label(text=item.object_name, icon="OBJECT_DATA")
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="", icon="VIEWZOOM")
+        row.prop(self, "severity_filter", text="")
+
+    def filter_items(self, context, data, propname):
+        needle = self.filter_name.lower()
+        flags = []
+        for item in getattr(data, propname):
+            visible = self.severity_filter in ("ALL", item.severity) and (
+                not needle
+                or needle in f"{item.rule} {item.object_name} {item.name}".lower()
+            )
+            flags.append(self.bitflag_filter_item if visible else 0)
+        return flags, []
+
+
+def draw_issues(layout: bpy.types.UILayout, data, propname: str):
+    if len(getattr(data, propname)) == 0:
+        return
+    layout.template_list(
+        GAM_UL_Issues.__name__,
+        propname,
+        data,
+        propname,
+        data,
+        f"{propname}_index",
+        rows=ISSUE_LIST_ROWS,
+    )
+
 
 class GAM_PT_Main(bpy.types.Panel):
     bl_label = f"GGLabs Art Manager (v{__version__})"
@@ -45,6 +145,86 @@ class GAM_PT_Main(bpy.types.Panel):
             col.alignment = "RIGHT"
             col.label(text=getattr(params, message_prop))
 
+    def draw_export_queue(self, layout: bpy.types.UILayout, params):
+        is_running = GAM_OT_RunExportQueue.running
+        if len(params.export_queue) == 0 and not is_running:
+            return
+
+        box = layout.box()
+        box.label(text="Export 대기열")
+
+        row = box.row()
+        row.template_list(
+            GAM_UL_ExportQueue.__name__,
+            "",
+            params,
+            "export_queue",
+            params,
+            "export_queue_index",
+            rows=3,
+        )
+        col = row.column(align=True)
+        col.operator(GAM_OT_RemoveExportJob.bl_idname, icon="REMOVE", text="")
+        col.operator(GAM_OT_ClearExportQueue.bl_idname, icon="TRASH", text="")
+
+        if is_running:
+            box.progress(
+                factor=params.export_progress,
+                text=params.export_stage_message or "export 중...",
+            )
+            box.operator(
+                GAM_OT_CancelExport.bl_idname, icon="CANCEL", text="export 취소하기"
+            )
+        elif any(job.status == "PENDING" for job in params.export_queue):
+            box.operator(GAM_OT_RunExportQueue.bl_idname, icon="PLAY", text="대기열 실행하기")
+
+    def draw_log(self, layout: bpy.types.UILayout, params):
+        box = layout.box()
+        row = box.row()
+        row.prop(params, "show_log")
+        if not params.show_log:
+            return
+        row.prop(params, "log_level")
+        row.prop(params, "log_line_count")
+        row.operator(GAM_OT_ClearLog.bl_idname, icon="TRASH", text="")
+
+        records = logger.tail(params.log_line_count, LogLevel[params.log_level])
+        if not records:
+            box.label(text="표시할 로그가 없습니다.")
+            return
+
+        col = box.column(align=True)
+        for record in records:
+            stamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+            icon = LOG_LEVEL_ICONS[record.level]
+            for line in record.message.splitlines() or [""]:
+                col.label(text=f"{stamp} {line}", icon=icon)
+                icon = "BLANK1"
+
+    def draw_trace(self, layout: bpy.types.UILayout, params):
+        box = layout.box()
+        box.prop(params, "show_trace")
+        if not params.show_trace:
+            return
+
+        box.prop(params, "trace_dirpath")
+        trace = tracer.last_trace
+        if trace is None:
+            box.label(text="아직 기록된 실행 시간이 없습니다.")
+        else:
+            col = box.column(align=True)
+            for line in trace.summary_lines():
+                col.label(text=line)
+            if tracer.last_trace_filepath:
+                box.label(text=f"trace :: {tracer.last_trace_filepath}")
+
+        slowest = rule_profiles().slowest(TRACE_SLOWEST_RULES)
+        if slowest:
+            col = box.column(align=True)
+            col.label(text="유효성 검사 규칙별 소요 시간 (최근 실행)")
+            for name, profile in slowest:
+                col.label(text=f"    {name} :: {profile.summary()}")
+
     def draw(self, context):
         layout = self.layout
         params = GAM_PGT_Main.getprops()
@@ -82,10 +262,19 @@ class GAM_PT_Main(bpy.types.Panel):
             icon="TRACKING_FORWARDS",
             text="Blender 파일 유효성 검사 및 보정하기",
         )
+        row = box.row()
+        row.prop(params, "live_validation")
+        op = row.operator(
+            GAM_OT_ValidateBlender.bl_idname, icon="FILE_REFRESH", text="전체 다시 검사"
+        )
+        op.force = True
+        op = row.operator(GAM_OT_ValidateBlender.bl_idname, icon="FF", text="빠른 검사")
+        op.fail_fast = True
         validate_message: str = getattr(params, "blender_validated_message")
         for line in validate_message.split("\n"):
             if line.rstrip():
                 box.label(text=line.rstrip())
+        draw_issues(box, params, "validation_issues")
         layout.row().separator()
 
         # 4. Render Options
@@ -97,17 +286,40 @@ class GAM_PT_Main(bpy.types.Panel):
             "output_dirpath",
         )
         self.draw_filepath_row(box, params, "GLB 파일 포맷", "glb_type", icon_only=False)
+        box.prop(params, "use_export_cache")
+        box.prop(params, "use_quantization")
+        box.prop(params, "use_texture_encoding")
+        box.prop(params, "animation_clip_mode")
+        box.prop(params, "watch_export")
         layout.row().separator()
 
         is_ready: bool = getattr(params, "is_validate_config_loaded")
         if is_ready:
             layout.row().separator()
-            layout.operator(
-                GAM_OT_ExportGLB.bl_idname,
+            row = layout.row(align=True)
+            op = row.operator(
+                GAM_OT_EnqueueExport.bl_idname,
                 icon="RENDER_STILL",
                 text="GLB 생성하기",
             )
+            op.run = True
+            op = row.operator(
+                GAM_OT_EnqueueExport.bl_idname,
+                icon="ADD",
+                text="대기열에 추가",
+            )
+            op.run = False
+            layout.operator(
+                GAM_OT_ExportGLBVariants.bl_idname,
+                icon="RENDERLAYERS",
+                text="모든 작업 단계 GLB 생성하기",
+            )
+            self.draw_export_queue(layout, params)
         else:
             layout.label(text="GLB를 생성하기 위해서는 먼저 설정 파일이 정상적으로 로드되어야 합니다!")
 
+        # 5. Logs and timings
+        self.draw_log(layout, params)
+        self.draw_trace(layout, params)
+
         layout.row()
@@ -0,0 +1,640 @@
+import os
+import shutil
+import sys
+from concurrent.futures import Future
+from dataclasses import asdict
+from typing import Callable, Dict, Generator, List, Optional, Tuple, TypeVar
+
+import bpy
+from blender_validator import BlenderValidator, TaskType
+from blender_validator.exception import BlenderValidateError
+from blender_validator.utils import (
+    load_bpy_context,
+    remove_prefix_from_shapekeys,
+    save_bpy_context,
+)
+
+from gglabs_art_manager.dependency import read_external_lib_manifest
+from gglabs_art_manager.manager.blender.config import CompiledConfig
+from gglabs_art_manager.manager.blender.fingerprint import export_content_digest
+from gglabs_art_manager.manager.blender.issue import Issue
+from gglabs_art_manager.manager.blender.rule_profile import RuleRunResult, run_rules
+from gglabs_art_manager.manager.blender.scene_index import SceneIndex
+from gglabs_art_manager.manager.blender.snapshot import SceneSnapshot
+from gglabs_art_manager.manager.blender.utils import control_visibilities_for_tasktype
+from gglabs_art_manager.manager.engine import (
+    FormatResult,
+    GltfFormatError,
+    PostprocessOptions,
+    atomic_output,
+    available_formats,
+    cache_key,
+    export_cache,
+    format_glb,
+    make_scratch_dir,
+    submit_format,
+)
+from gglabs_art_manager.manager.logger import logger, tracer
+from gglabs_art_manager.manager.model import (
+    AnimationSplitGltfOptions,
+    TaskTypeDedupOptions,
+    TaskTypeGltfOptions,
+    TaskTypeKeyframeReductionOptions,
+    TaskTypeQuantizationOptions,
+    TaskTypeSparseMorphOptions,
+    TaskTypeTextureOptions,
+    TaskTypeToTargetResourceTypeName,
+)
+from gglabs_art_manager.version import __version__
+
+# Operator-independent steps shared by the blender panel and the headless batch workers.
+# Every function works on the currently opened blender file (`bpy.context`).
+
+TASK_TYPE_MAP = {task.name: task for task in TaskType}
+
+T = TypeVar("T")
+
+__all__ = [
+    "TASK_TYPE_MAP",
+    "current_blend_name",
+    "validate_blender",
+    "remove_shapekey_prefix",
+    "postprocess_options",
+    "export_cache_key",
+    "EXPORT_STAGES",
+    "PendingExport",
+    "write_collection_info",
+    "clips_dirpath",
+    "export_glb_stages",
+    "VARIANT_TASK_TYPES",
+    "variant_filename",
+    "export_variants_stages",
+    "run_stages",
+    "export_glb",
+    "export_glb_variants",
+]
+
+
+def current_blend_name() -> str:
+    return bpy.path.basename(bpy.context.blend_data.filepath).rsplit(".", 1)[0]
+
+
+def validate_blender(
+    task_type: str, config: CompiledConfig, fail_fast: bool = False
+) -> RuleRunResult:
+    # Raises `BlenderValidateError` on the first rule violation that can't be fixed.
+    # Per-rule timings are recorded in `rule_profiles()`.
+    result = run_rules(TASK_TYPE_MAP[task_type], config, fail_fast=fail_fast)
+    if result.error is not None:
+        raise result.error
+    return result
+
+
+def remove_shapekey_prefix(config: CompiledConfig, prefix: str) -> List[Issue]:
+    # Removes `prefix` from the shapekey names of the parts meshes; an issue per rename.
+    issues: List[Issue] = []
+    with tracer.span("snapshot"):
+        snapshot = SceneSnapshot.capture(with_fingerprints=False)
+        index = SceneIndex.build(snapshot=snapshot)
+
+    # Checked against the snapshot; only meshes that may have the prefix are touched.
+    lowered_prefix = prefix.lower()
+    for col_expr, _, obj in index.iterate_category_meshes(config.parts_category_keys):
+        if not any(
+            lowered_prefix in name.lower()
+            for name in snapshot.objects[obj.name].shapekey_names
+        ):
+            continue
+
+        with tracer.span("remove_prefix", object=obj.name):
+            sk_report_lines = [
+                f"Shapekey[{d.key}] {d.detail}"
+                for details in remove_prefix_from_shapekeys(obj, prefix).values()
+                for d in details
+            ]
+
+        if len(sk_report_lines) > 0:
+            logger.log(f"Shapekey Fixed :: [{col_expr}] {obj.name} ({obj.data.name})")
+            for line in sk_report_lines:
+                logger.log(line)
+                issues.append(Issue("INFO", "remove_prefix", obj.name, line))
+            logger.log("")
+
+    return issues
+
+
+def _module_version(name: str) -> Optional[str]:
+    # Modules imported lazily (`gltf_formatter`) fall back to the bundled version.
+    version = getattr(sys.modules.get(name), "__version__", None)
+    if version is None:
+        version = read_external_lib_manifest()["packages"].get(name)
+    return version
+
+
+def postprocess_options(
+    task_type: str, glb_type: str, quantize: bool = False, encode_textures: bool = True
+) -> Optional[PostprocessOptions]:
+    # Binary GLBs only; `.gltf` outputs are left as formatted.
+    if glb_type != "glb":
+        return None
+    if encode_textures and not available_formats():
+        # Pillow may be missing from the python of blender
+        logger.warning("Textures :: no image encoder available (Pillow, cwebp, toktx)")
+        encode_textures = False
+    return PostprocessOptions(
+        quantization=TaskTypeQuantizationOptions.get(task_type) if quantize else None,
+        textures=TaskTypeTextureOptions.get(task_type) if encode_textures else None,
+        keyframes=TaskTypeKeyframeReductionOptions.get(task_type),
+        sparse_morphs=TaskTypeSparseMorphOptions.get(task_type),
+        dedup=TaskTypeDedupOptions.get(task_type),
+    )
+
+
+def _postprocess_key(postprocess: Optional[PostprocessOptions]) -> Optional[List]:
+    if postprocess is None or not postprocess.enabled:
+        return None
+    passes = [
+        postprocess.quantization,
+        postprocess.keyframes,
+        postprocess.sparse_morphs,
+        postprocess.dedup,
+    ]
+    textures = postprocess.textures
+    return [
+        *(asdict(options) if options else None for options in passes),
+        # Encoded textures depend on the encoders found on this machine
+        [asdict(textures), available_formats()] if textures else None,
+    ]
+
+
+def export_cache_key(
+    task_type: str,
+    config: CompiledConfig,
+    glb_type: str,
+    filename: str,
+    postprocess: Optional[PostprocessOptions] = None,
+    gltf_options: Optional[Dict] = None,
+) -> str:
+    # Everything an export depends on; only the visible objects are exported.
+    options = gltf_options or TaskTypeGltfOptions[task_type]
+    visible_objects = [o for o in bpy.context.scene.objects if o.visible_get()]
+
+    return cache_key(
+        "export",
+        __version__,
+        bpy.app.version_string,
+        _module_version("blender_validator"),
+        _module_version("gltf_formatter"),
+        task_type,
+        TaskTypeToTargetResourceTypeName[task_type],
+        options,
+        _postprocess_key(postprocess),
+        config.digest,
+        glb_type,
+        filename,
+        export_content_digest(visible_objects, with_weights=options["export_skins"]),
+    )
+
+
+# Stages of `export_glb_stages`, yielded right before each of them runs.
+EXPORT_STAGES = [
+    "visibility",
+    "custom_properties",
+    "cache",
+    "gltf_export",
+    "format",
+]
+
+
+class PendingExport:
+    # Result of `export_glb_stages`; formatting may still be running in a worker process.
+    def __init__(
+        self, output_filepath: str, future: "Optional[Future[FormatResult]]" = None
+    ):
+        self.output_filepath = output_filepath
+        self.future = future
+        self._reported = False
+
+    def done(self) -> bool:
+        return self.future is None or self.future.done()
+
+    def cancel(self):
+        # Only formatting that hasn't started yet is cancelled.
+        if self.future is not None:
+            self.future.cancel()
+
+    def on_success(self, callback: Callable[[], None]):
+        if self.future is None:
+            callback()
+            return
+
+        def _callback(future: "Future[FormatResult]"):
+            if not future.cancelled() and future.exception() is None:
+                if future.result().error is None:
+                    callback()
+
+        self.future.add_done_callback(_callback)
+
+    def result(self) -> str:
+        # Blocks until formatting is over. Raises `GltfFormatError` if it has failed.
+        if self.future is not None:
+            with tracer.span("format_wait"):
+                res: FormatResult = self.future.result()
+            if not self._reported:
+                self._reported = True
+                for line in res.logs:
+                    logger.log(line)
+                if res.textures is not None and res.textures.images:
+                    logger.log(f"Textures :: {res.textures.summary()}")
+                    for image, reason in res.textures.skipped.items():
+                        logger.debug(f"Textures :: {image} skipped ({reason})")
+                if res.clips:
+                    dirpath = os.path.dirname(res.clips[0])
+                    logger.log(f"Clips :: {len(res.clips)} files in {dirpath}")
+                if res.keyframes is not None and res.keyframes.channels:
+                    logger.log(f"Keyframes :: {res.keyframes.summary()}")
+                    for name, reason in res.keyframes.skipped.items():
+                        logger.debug(f"Keyframes :: {name} skipped ({reason})")
+                if res.sparse_morphs is not None and res.sparse_morphs.targets:
+                    logger.log(f"Sparse Morphs :: {res.sparse_morphs.summary()}")
+                    for mesh, saved in res.sparse_morphs.meshes.items():
+                        logger.log(f"Sparse Morphs :: {mesh} -{saved / 1024:.1f}KB")
+                if res.quantization is not None:
+                    logger.log(f"Quantization :: {res.quantization.summary()}")
+                    for attribute, reason in res.quantization.skipped.items():
+                        logger.warning(
+                            f"Quantization :: {attribute} skipped ({reason})"
+                        )
+                if res.dedup is not None and res.dedup.saved_bytes:
+                    logger.log(f"Dedup :: {res.dedup.summary()}")
+                if res.error:
+                    logger.error(f"GltfFormatter :: {res.error}")
+            if res.error:
+                raise GltfFormatError(res.error)
+        return self.output_filepath
+
+
+class _SavedBpyContext:
+    # A single `save_bpy_context` snapshot, restored as often as needed.
+    def __init__(self):
+        with tracer.span("save_context"):
+            self.context = save_bpy_context()
+        self.is_restored = True
+
+    def modified(self):
+        self.is_restored = False
+
+    def restore(self):
+        if not self.is_restored:
+            with tracer.span("restore_context"):
+                load_bpy_context(self.context)
+            self.is_restored = True
+
+
+def write_collection_info(config: CompiledConfig):
+    # Generate custom properties for gltf formatting rules.
+    # pylint: disable=import-outside-toplevel
+    from blender_validator.rules.collection import (
+        WriteCollectionInfoCustomPropertiesRule,
+    )
+
+    validator = BlenderValidator(
+        TaskType.ANY,
+        config.constants,
+        use_default_rules=False,
+        custom_rules=[WriteCollectionInfoCustomPropertiesRule],
+        logger=logger,
+    )
+    try:
+        with tracer.span("custom_properties"):
+            validator.validate_and_fix()
+    except BlenderValidateError as e:
+        logger.warning(str(e))
+
+
+def _export_visible_stages(
+    saved: _SavedBpyContext,
+    task_type: str,
+    config: CompiledConfig,
+    glb_filepath: str,
+    glb_type: str,
+    use_cache: bool,
+    background_format: bool,
+    quantize: bool,
+    encode_textures: bool,
+    gltf_options: Optional[Dict] = None,
+    clips_output: Optional[str] = None,
+) -> Generator[str, None, PendingExport]:
+    # Exports the currently visible objects; the "cache", "gltf_export" and "format" stages.
+    # With `clips_output`, the animations go to clip files there (not cached).
+    gltf_options = gltf_options or TaskTypeGltfOptions[task_type]
+    current_filename = os.path.basename(glb_filepath).rsplit(".", 1)[0]
+    postprocess = postprocess_options(task_type, glb_type, quantize, encode_textures)
+
+    # Reuse the previous output if none of the inputs has changed
+    yield "cache"
+    cache = export_cache() if use_cache and clips_output is None else None
+    if cache is not None:
+        with tracer.span("cache_key"):
+            key = export_cache_key(
+                task_type,
+                config,
+                glb_type,
+                current_filename,
+                postprocess,
+                gltf_options,
+            )
+        try:
+            with atomic_output(glb_filepath) as part_filepath:
+                # A miss, or an entry evicted by another process in between
+                if not cache.fetch(key, part_filepath, f".{glb_type}"):
+                    raise FileNotFoundError(key)
+        except FileNotFoundError:
+            pass
+        else:
+            logger.log(f"Export Cache :: reuse {key[:12]} for {glb_filepath}")
+            return PendingExport(glb_filepath)
+
+    # Create an intermediate gltf file on a RAM-backed scratch directory
+    yield "gltf_export"
+    tmpdir: Optional[str] = make_scratch_dir()
+    try:
+        temp_filepath = os.path.join(tmpdir, f"{current_filename}.{glb_type}")
+        export_format = "GLB" if glb_type == "glb" else "GLTF_EMBEDDED"
+        with tracer.span("gltf_export", task_type=task_type):
+            bpy.ops.export_scene.gltf(
+                filepath=temp_filepath,
+                export_format=export_format,
+                export_nla_strips_merged_animation_name="animation",
+                **gltf_options,
+            )
+
+        # Formatting doesn't need bpy anymore; give the scene back first.
+        saved.restore()
+
+        # Postprocess GLB, then replace the output file at once
+        yield "format"
+        target_resource_type = TaskTypeToTargetResourceTypeName[task_type]
+        if background_format:
+            pending = PendingExport(
+                glb_filepath,
+                submit_format(
+                    target_resource_type,
+                    temp_filepath,
+                    glb_filepath,
+                    cleanup_dirpath=tmpdir,
+                    postprocess=postprocess,
+                    clips_dirpath=clips_output,
+                ),
+            )
+            tmpdir = None  # owned by the format job
+        else:
+            future: "Future[FormatResult]" = Future()
+            with tracer.span("format", task_type=task_type):
+                future.set_result(
+                    format_glb(
+                        target_resource_type,
+                        temp_filepath,
+                        glb_filepath,
+                        postprocess=postprocess,
+                        clips_dirpath=clips_output,
+                    )
+                )
+            pending = PendingExport(glb_filepath, future)
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    if cache is not None:
+        pending.on_success(lambda: cache.put(key, glb_filepath, f".{glb_type}"))
+
+    return pending
+
+
+def clips_dirpath(glb_filepath: str) -> str:
+    # Clip files of a split animation export, next to the rig GLB
+    return f"{glb_filepath.rsplit('.', 1)[0]}_clips"
+
+
+def export_glb_stages(
+    task_type: str,
+    config: CompiledConfig,
+    output_path: str,
+    glb_type: str = "glb",
+    filename: Optional[str] = None,
+    use_cache: bool = True,
+    background_format: bool = False,
+    quantize: bool = False,
+    encode_textures: bool = True,
+    clip_mode: Optional[str] = None,
+) -> Generator[str, None, PendingExport]:
+    # Runs the export step by step; yields the name of the next stage.
+    # Closing the generator (e.g. on cancel) restores the bpy context and removes
+    # intermediate files. With `background_format`, the `GltfFormatter` pass runs in a
+    # worker process and the returned `PendingExport` completes later.
+    # With a `clip_mode` (`ANIMATION_CLIP_MODES`), ANIMATING GLBs are split: the rig
+    # and meshes without animations, and a clip file per action or NLA track.
+
+    # 1. visibility control
+    # TODO: Make this controlled by mode and project
+    saved = _SavedBpyContext()
+    try:
+        yield "visibility"
+        saved.modified()
+        with tracer.span("visibility"):
+            control_visibilities_for_tasktype(
+                task_type, config.shapekey_category_keys, SceneIndex.build()
+            )
+
+        # 2. Generate custom properties for gltf formatting rules.
+        yield "custom_properties"
+        write_collection_info(config)
+
+        # 3. Filepath
+        current_filename = filename or current_blend_name()
+        glb_filepath = os.path.join(output_path, f"{current_filename}.{glb_type}")
+
+        # 4. Export and postprocess
+        gltf_options = None
+        output_dirpath = None
+        if clip_mode and task_type == TaskType.ANIMATING.name:
+            if glb_type == "glb":
+                gltf_options = AnimationSplitGltfOptions[clip_mode]
+                output_dirpath = clips_dirpath(glb_filepath)
+            else:
+                logger.warning("Clips :: split export needs GLB; exporting as one file")
+
+        pending = yield from _export_visible_stages(
+            saved,
+            task_type,
+            config,
+            glb_filepath,
+            glb_type,
+            use_cache,
+            background_format,
+            quantize,
+            encode_textures,
+            gltf_options,
+            output_dirpath,
+        )
+    finally:
+        # 9. Clean up
+        saved.restore()
+
+    return pending
+
+
+def _tagged_stages(
+    tag: str, stages: Generator[str, None, T]
+) -> Generator[Tuple[str, str], None, T]:
+    try:
+        while True:
+            try:
+                stage = next(stages)
+            except StopIteration as e:
+                return e.value
+            yield tag, stage
+    finally:
+        stages.close()
+
+
+# Task types that have both export options and a formatting target
+VARIANT_TASK_TYPES = [
+    task.name
+    for task in TaskType
+    if task.name in TaskTypeGltfOptions
+    and task.name in TaskTypeToTargetResourceTypeName
+]
+
+
+def variant_filename(task_type: str, filename: Optional[str] = None) -> str:
+    return f"{filename or current_blend_name()}_{task_type.lower()}"
+
+
+def export_variants_stages(
+    config: CompiledConfig,
+    output_path: str,
+    glb_type: str = "glb",
+    task_types: Optional[List[str]] = None,
+    filename: Optional[str] = None,
+    use_cache: bool = True,
+    background_format: bool = True,
+    quantize: bool = False,
+    encode_textures: bool = True,
+) -> Generator[Tuple[str, str], None, Dict[str, PendingExport]]:
+    # Exports one GLB per task type (`{filename}_{task type}.glb`) from the same scene.
+    # The bpy context is saved once and restored between the variants, the collection
+    # info is written once, and formatting of a variant overlaps with the next export.
+    # Yields (task type, stage); on failure, the remaining variants are not exported.
+    task_types = task_types or VARIANT_TASK_TYPES
+    with tracer.span("scene_index"):
+        index = SceneIndex.build()
+
+    pendings: Dict[str, PendingExport] = {}
+    saved = _SavedBpyContext()
+    try:
+        yield task_types[0], "custom_properties"
+        write_collection_info(config)
+
+        for task_type in task_types:
+            yield task_type, "visibility"
+            saved.restore()
+            saved.modified()
+            with tracer.span("visibility", task_type=task_type):
+                control_visibilities_for_tasktype(
+                    task_type, config.shapekey_category_keys, index
+                )
+
+            glb_filepath = os.path.join(
+                output_path, f"{variant_filename(task_type, filename)}.{glb_type}"
+            )
+            stages = _export_visible_stages(
+                saved,
+                task_type,
+                config,
+                glb_filepath,
+                glb_type,
+                use_cache,
+                background_format,
+                quantize,
+                encode_textures,
+            )
+            pendings[task_type] = yield from _tagged_stages(task_type, stages)
+    finally:
+        saved.restore()
+
+    return pendings
+
+
+def run_stages(stages: Generator[str, None, T]) -> T:
+    while True:
+        try:
+            next(stages)
+        except StopIteration as e:
+            return e.value
+
+
+def export_glb(
+    task_type: str,
+    config: CompiledConfig,
+    output_path: str,
+    glb_type: str = "glb",
+    filename: Optional[str] = None,
+    use_cache: bool = True,
+    quantize: bool = False,
+    encode_textures: bool = True,
+    clip_mode: Optional[str] = None,
+) -> str:
+    pending = run_stages(
+        export_glb_stages(
+            task_type,
+            config,
+            output_path,
+            glb_type,
+            filename,
+            use_cache=use_cache,
+            quantize=quantize,
+            encode_textures=encode_textures,
+            clip_mode=clip_mode,
+        )
+    )
+    return pending.result()  # pylint: disable=no-member
+
+
+def export_glb_variants(
+    config: CompiledConfig,
+    output_path: str,
+    glb_type: str = "glb",
+    task_types: Optional[List[str]] = None,
+    filename: Optional[str] = None,
+    use_cache: bool = True,
+    quantize: bool = False,
+    encode_textures: bool = True,
+) -> Dict[str, str]:
+    # Returns {task type: output filepath}. Raises the first formatting error after
+    # every variant has been written.
+    pendings = run_stages(
+        export_variants_stages(
+            config,
+            output_path,
+            glb_type,
+            task_types,
+            filename,
+            use_cache=use_cache,
+            quantize=quantize,
+            encode_textures=encode_textures,
+        )
+    )
+
+    outputs: Dict[str, str] = {}
+    errors: List[str] = []
+    for task_type, pending in pendings.items():  # pylint: disable=no-member
+        try:
+            outputs[task_type] = pending.result()
+        except GltfFormatError as e:
+            errors.append(f"{task_type}: {e}")
+
+    if errors:
+        raise GltfFormatError("\n".join(errors))
+
+    return outputs
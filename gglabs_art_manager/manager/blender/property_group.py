@@ -1,14 +1,196 @@
+from typing import Iterable
+
 import bpy
-from blender_validator import BlenderValidator, ConfigLoader, TaskType
+from blender_validator import BlenderValidator, TaskType
 
 from gglabs_art_manager.blender import GAM_PGT_Base
-from gglabs_art_manager.manager.logger import logger
+from gglabs_art_manager.manager.blender.config import load_config
+from gglabs_art_manager.manager.blender.issue import Issue
+from gglabs_art_manager.manager.blender.rule_profile import rule_profiles
+from gglabs_art_manager.manager.logger import LogLevel, logger
 from gglabs_art_manager.manager.model import Project
 
-__all__ = ["GAM_PGT_Main"]
+__all__ = [
+    "GAM_PGT_ExportJob",
+    "GAM_PGT_Issue",
+    "GAM_PGT_Main",
+    "store_issues",
+    "select_issue_object",
+]
+
+TASK_TYPE_ITEMS = [
+    (
+        TaskType.FACE_MODELING.name,
+        TaskType.FACE_MODELING.value,
+        TaskType.FACE_MODELING.value,
+    ),
+    (
+        TaskType.FACE_RIGGING.name,
+        TaskType.FACE_RIGGING.value,
+        TaskType.FACE_RIGGING.value,
+    ),
+    (
+        TaskType.BODY_MODELING.name,
+        TaskType.BODY_MODELING.value,
+        TaskType.BODY_MODELING.value,
+    ),
+    (
+        TaskType.BODY_RIGGING.name,
+        TaskType.BODY_RIGGING.value,
+        TaskType.BODY_RIGGING.value,
+    ),
+    (
+        TaskType.ANIMATING.name,
+        TaskType.ANIMATING.value,
+        TaskType.ANIMATING.value,
+    ),
+    (
+        TaskType.MASTERING.name,
+        TaskType.MASTERING.value,
+        TaskType.MASTERING.value,
+    ),
+]
+
+GLB_TYPE_ITEMS = [("glb", "GLB", "GLB"), ("gltf", "GLTF", "GLTF_EMBEDDED")]
+
+ANIMATION_CLIP_MODE_ITEMS = [
+    ("NONE", "하나의 파일", "메시와 애니메이션을 하나의 GLB로 export"),
+    ("ACTIONS", "액션별 클립", "리그/메시 GLB 하나와 액션별 애니메이션 GLB로 분리"),
+    ("NLA_TRACKS", "NLA 트랙별 클립", "리그/메시 GLB 하나와 NLA 트랙별 애니메이션 GLB로 분리"),
+]
+
+EXPORT_JOB_STATUS_ITEMS = [
+    ("PENDING", "대기", "실행을 기다리는 중"),
+    ("RUNNING", "진행 중", "export 진행 중"),
+    ("FORMATTING", "후처리 중", "GLB 후처리 진행 중"),
+    ("DONE", "완료", "export 완료"),
+    ("FAILED", "실패", "export 실패"),
+    ("CANCELLED", "취소", "사용자가 취소함"),
+]
+
+LOG_LEVEL_ITEMS = [(level.name, level.name, level.name) for level in LogLevel]
+
+ISSUE_SEVERITY_ITEMS = [
+    ("ERROR", "오류", "오류"),
+    ("WARNING", "경고", "경고"),
+    ("INFO", "정보", "정보"),
+]
+
+
+# pylint: disable=reportInvalidTypeForm
+class GAM_PGT_ExportJob(bpy.types.PropertyGroup):
+    # An item of the export queue; the options of the panel are captured on enqueue.
+    task_type: bpy.props.EnumProperty(
+        name="작업 단계",
+        items=TASK_TYPE_ITEMS,
+        default=TaskType.FACE_RIGGING.name,
+    )
+
+    glb_type: bpy.props.EnumProperty(
+        name="GLB 파일 포맷",
+        items=GLB_TYPE_ITEMS,
+        default="glb",
+    )
+
+    output_dirpath: bpy.props.StringProperty(
+        name="GLB 파일 생성 경로",
+        default="//",
+        maxlen=1024,
+        subtype="DIR_PATH",
+    )
+
+    validate_config_filepath: bpy.props.StringProperty(
+        name="Blender 유효성 검사 설정 파일",
+        maxlen=1024,
+        subtype="FILE_PATH",
+    )
+
+    use_export_cache: bpy.props.BoolProperty(
+        name="변경 사항이 없으면 이전 GLB 재사용",
+        default=True,
+    )
+
+    use_quantization: bpy.props.BoolProperty(
+        name="메시 양자화 (KHR_mesh_quantization)",
+        default=False,
+    )
+
+    use_texture_encoding: bpy.props.BoolProperty(
+        name="텍스처 축소 및 재인코딩",
+        default=True,
+    )
+
+    animation_clip_mode: bpy.props.EnumProperty(
+        name="애니메이션 분리",
+        items=ANIMATION_CLIP_MODE_ITEMS,
+        default="NONE",
+    )
+
+    status: bpy.props.EnumProperty(
+        name="상태",
+        items=EXPORT_JOB_STATUS_ITEMS,
+        default="PENDING",
+    )
+
+    message: bpy.props.StringProperty(
+        name="결과",
+        description="export 결과 파일 경로 또는 에러메세지",
+        default="",
+    )
+
+
+class GAM_PGT_Issue(bpy.types.PropertyGroup):
+    # An item of the validation/rename reports; `name` holds the message.
+    severity: bpy.props.EnumProperty(
+        name="수준",
+        items=ISSUE_SEVERITY_ITEMS,
+        default="ERROR",
+    )
+
+    rule: bpy.props.StringProperty(
+        name="규칙",
+        default="",
+    )
+
+    object_name: bpy.props.StringProperty(
+        name="오브젝트",
+        default="",
+    )
+
+
+def store_issues(collection, issues: Iterable[Issue]):
+    collection.clear()
+    for issue in issues:
+        item = collection.add()
+        item.name = issue.message
+        item.severity = issue.severity
+        item.rule = issue.rule
+        item.object_name = issue.object_name
+
+
+def select_issue_object(collection, index: int):
+    # Makes the object of the clicked issue the only selected and active one.
+    if not 0 <= index < len(collection):
+        return
+
+    view_layer = bpy.context.view_layer
+    obj = view_layer.objects.get(collection[index].object_name)
+    if obj is None:
+        return
+
+    for selected in view_layer.objects.selected:
+        selected.select_set(False)
+    try:
+        obj.select_set(True)
+    except RuntimeError:
+        pass
+    view_layer.objects.active = obj
 
 
 class GAM_PGT_Main(GAM_PGT_Base):
+    def on_validation_issue_selected(self, context):
+        select_issue_object(self.validation_issues, self.validation_issues_index)
+
     def check_validity_on_validate_config(self, context):
         if self.validate_config_filepath == "":
             self.validate_config_loaded_message = ""
@@ -17,7 +199,7 @@ class GAM_PGT_Main(GAM_PGT_Base):
 
         fpath = bpy.path.abspath(self.validate_config_filepath)
         try:
-            rule_constants = ConfigLoader.load(fpath)
+            compiled_config = load_config(fpath)
         except ValueError as e:
             self.validate_config_loaded_message = str(e)
             self.is_validate_config_loaded = False
@@ -29,14 +211,17 @@ class GAM_PGT_Main(GAM_PGT_Base):
 
             validator = BlenderValidator(
                 TaskType.from_str(self.task_type),
-                rule_constants,
+                compiled_config.constants,
                 use_default_rules=True,
                 exclude_rules=[],
             )
 
             logger.log("RuleProvider :: Loaded Rule List")
+            profiles = rule_profiles()
             for rule in validator.rules:
-                logger.log(f"{rule.name()}: {rule.description_kr}")
+                profile = profiles.get(rule.name())
+                stats = f" [{profile.summary()}]" if profile else ""
+                logger.log(f"{rule.name()}: {rule.description_kr}{stats}")
 
     # pylint: disable=reportInvalidTypeForm
     project_type: bpy.props.EnumProperty(
@@ -60,38 +245,7 @@ class GAM_PGT_Main(GAM_PGT_Base):
     task_type: bpy.props.EnumProperty(
         name="",
         description="현재 blender 파일에 해당되는 작업 단계를 지정합니다.",
-        items=[
-            (
-                TaskType.FACE_MODELING.name,
-                TaskType.FACE_MODELING.value,
-                TaskType.FACE_MODELING.value,
-            ),
-            (
-                TaskType.FACE_RIGGING.name,
-                TaskType.FACE_RIGGING.value,
-                TaskType.FACE_RIGGING.value,
-            ),
-            (
-                TaskType.BODY_MODELING.name,
-                TaskType.BODY_MODELING.value,
-                TaskType.BODY_MODELING.value,
-            ),
-            (
-                TaskType.BODY_RIGGING.name,
-                TaskType.BODY_RIGGING.value,
-                TaskType.BODY_RIGGING.value,
-            ),
-            (
-                TaskType.ANIMATING.name,
-                TaskType.ANIMATING.value,
-                TaskType.ANIMATING.value,
-            ),
-            (
-                TaskType.MASTERING.name,
-                TaskType.MASTERING.value,
-                TaskType.MASTERING.value,
-            ),
-        ],
+        items=TASK_TYPE_ITEMS,
         default=TaskType.FACE_RIGGING.name,
     )
 
@@ -127,6 +281,19 @@ class GAM_PGT_Main(GAM_PGT_Base):
         default="",
     )
 
+    validation_issues: bpy.props.CollectionProperty(type=GAM_PGT_Issue)
+
+    validation_issues_index: bpy.props.IntProperty(
+        default=0,
+        update=on_validation_issue_selected,
+    )
+
+    live_validation: bpy.props.BoolProperty(
+        name="실시간 유효성 검사",
+        description="오브젝트가 변경되면 잠시 후 변경된 파일을 자동으로 다시 검사 및 보정합니다. 보정은 되돌리기(Ctrl+Z)로 취소할 수 있습니다.",
+        default=False,
+    )
+
     output_dirpath: bpy.props.StringProperty(
         name="GLB 파일 생성 경로",
         description="GLB 파일을 생성할 경로를 입력합니다.",
@@ -138,6 +305,88 @@ class GAM_PGT_Main(GAM_PGT_Base):
     glb_type: bpy.props.EnumProperty(
         name="",
         description="GLB/GLTF 파일 포맷",
-        items=[("glb", "GLB", "GLB"), ("gltf", "GLTF", "GLTF_EMBEDDED")],
+        items=GLB_TYPE_ITEMS,
         default="glb",
     )
+
+    use_export_cache: bpy.props.BoolProperty(
+        name="변경 사항이 없으면 이전 GLB 재사용",
+        description="씬, 설정 파일, export 옵션, 애드온 버전이 이전과 같으면 export를 생략하고 캐시된 결과를 사용합니다.",
+        default=True,
+    )
+
+    use_quantization: bpy.props.BoolProperty(
+        name="메시 양자화 (KHR_mesh_quantization)",
+        description="얼굴/아바타 GLB의 normal, UV, shapekey 데이터를 8/16비트 정수로 저장해 파일 크기를 줄입니다. KHR_mesh_quantization을 지원하지 않는 로더에서는 열 수 없습니다.",
+        default=False,
+    )
+
+    use_texture_encoding: bpy.props.BoolProperty(
+        name="텍스처 축소 및 재인코딩",
+        description="작업 단계별 최대 해상도로 텍스처를 줄이고, 사용 가능한 인코더로 WebP/JPEG 등으로 다시 저장합니다. 같은 텍스처는 캐시된 결과를 재사용합니다.",
+        default=True,
+    )
+
+    animation_clip_mode: bpy.props.EnumProperty(
+        name="애니메이션 분리",
+        description="ANIMATING export 시 리그와 메시는 한 번만 export 하고, 애니메이션은 노드 이름으로 리그를 참조하는 클립 파일로 나눕니다.",
+        items=ANIMATION_CLIP_MODE_ITEMS,
+        default="NONE",
+    )
+
+    watch_export: bpy.props.BoolProperty(
+        name="저장 시 자동 검사 및 GLB 생성",
+        description="파일을 저장하면 백그라운드 watcher(python -m gglabs_art_manager.batch watch)가 현재 설정으로 유효성 검사 및 GLB 생성을 진행합니다.",
+        default=False,
+    )
+
+    export_queue: bpy.props.CollectionProperty(type=GAM_PGT_ExportJob)
+
+    export_queue_index: bpy.props.IntProperty(default=0)
+
+    export_progress: bpy.props.FloatProperty(
+        name="export 진행률",
+        default=0.0,
+        min=0.0,
+        max=1.0,
+    )
+
+    export_stage_message: bpy.props.StringProperty(
+        name="export 진행 단계",
+        default="",
+    )
+
+    show_log: bpy.props.BoolProperty(
+        name="로그 보기",
+        description="최근 로그를 패널에 표시합니다.",
+        default=False,
+    )
+
+    log_level: bpy.props.EnumProperty(
+        name="",
+        description="표시할 최소 로그 수준",
+        items=LOG_LEVEL_ITEMS,
+        default=LogLevel.INFO.name,
+    )
+
+    log_line_count: bpy.props.IntProperty(
+        name="줄 수",
+        description="표시할 로그 줄 수",
+        default=15,
+        min=1,
+        max=200,
+    )
+
+    show_trace: bpy.props.BoolProperty(
+        name="실행 시간 표시",
+        description="최근 실행한 유효성 검사/export의 단계별 소요 시간을 표시합니다.",
+        default=False,
+    )
+
+    trace_dirpath: bpy.props.StringProperty(
+        name="trace 파일 저장 경로",
+        description="입력하면 실행할 때마다 Chrome trace(JSON) 파일을 저장합니다. (chrome://tracing, Perfetto)",
+        default="",
+        maxlen=1024,
+        subtype="DIR_PATH",
+    )
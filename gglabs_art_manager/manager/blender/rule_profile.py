@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+from blender_validator import BlenderValidator
+from blender_validator.exception import BlenderValidateError
+
+from gglabs_art_manager.manager.blender.config import CompiledConfig
+from gglabs_art_manager.manager.blender.snapshot import SceneSnapshot
+from gglabs_art_manager.manager.engine.cache import cache_root
+from gglabs_art_manager.manager.logger import logger, tracer
+
+# Per-rule wall time of validator runs. Every default rule runs in its own
+# single-rule `BlenderValidator`, so that the time and the failure of each rule are
+# known. The stats are kept across sessions and used to order the rules by cost
+# in the fail-fast mode.
+# Rules fix the scene as they validate it, and later rules may depend on those fixes.
+# A rule counts as a fix-up once it has changed the structural fingerprints of the
+# scene in any run (or before it has been checked `FIX_CHECK_RUNS` times); fail-fast
+# only reorders the check-only rules between two fix-ups, so every rule sees the same
+# scene as in a normal run. The fingerprints are only taken around rules that are
+# still being checked, since each snapshot walks the whole scene.
+
+RULE_PROFILES_FILENAME = "rule_profiles.json"
+
+# Weight of the latest run in `RuleProfile.cost_per_object`
+COST_SMOOTHING = 0.3
+# Runs without changes to the scene after which a rule counts as check-only
+FIX_CHECK_RUNS = 3
+
+__all__ = [
+    "RuleProfile",
+    "RuleTiming",
+    "RuleRunResult",
+    "RuleProfiles",
+    "rule_profiles",
+    "default_rules",
+    "run_rules",
+]
+
+
+@dataclass
+class RuleProfile:
+    runs: int = 0
+    failures: int = 0
+    total_elapsed: float = 0.0
+    last_elapsed: float = 0.0
+    last_objects: int = 0
+    cost_per_object: float = 0.0  # seconds, smoothed over runs
+    fix_checks: int = 0  # runs checked for changes to the scene
+    fixes: int = 0  # runs that changed the scene
+
+    @property
+    def mean_elapsed(self) -> float:
+        return self.total_elapsed / self.runs if self.runs else 0.0
+
+    @property
+    def is_check_only(self) -> bool:
+        return self.fix_checks >= FIX_CHECK_RUNS and self.fixes == 0
+
+    @property
+    def needs_fix_check(self) -> bool:
+        return self.fixes == 0 and self.fix_checks < FIX_CHECK_RUNS
+
+    def record(
+        self, elapsed: float, objects: int, failed: bool, fixed: Optional[bool] = None
+    ):
+        cost = elapsed / max(objects, 1)
+        if self.runs == 0:
+            self.cost_per_object = cost
+        else:
+            self.cost_per_object += COST_SMOOTHING * (cost - self.cost_per_object)
+        self.runs += 1
+        self.failures += int(failed)
+        self.total_elapsed += elapsed
+        self.last_elapsed = elapsed
+        self.last_objects = objects
+        if fixed is not None:
+            self.fix_checks += 1
+            self.fixes += int(fixed)
+
+    def summary(self) -> str:
+        return (
+            f"{self.last_elapsed * 1000:.1f}ms / {self.last_objects} objects"
+            f" (avg {self.mean_elapsed * 1000:.1f}ms, {self.runs} runs)"
+        )
+
+
+@dataclass
+class RuleTiming:
+    name: str
+    elapsed: float
+    objects: int
+    error: Optional[str] = None
+    fixed: Optional[bool] = None  # None if not checked
+
+
+class RuleProfiles:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.profiles: Dict[str, RuleProfile] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.profiles = {name: RuleProfile(**v) for name, v in data.items()}
+        except (OSError, ValueError, TypeError):
+            self.profiles = {}
+
+    def get(self, name: str) -> Optional[RuleProfile]:
+        with self._lock:
+            self._load()
+            return self.profiles.get(name)
+
+    def record(self, timings: List[RuleTiming]):
+        with self._lock:
+            self._load()
+            for t in timings:
+                profile = self.profiles.setdefault(t.name, RuleProfile())
+                profile.record(t.elapsed, t.objects, t.error is not None, t.fixed)
+            self._save()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            part_filepath = f"{self.filepath}.{os.getpid()}.part"
+            with open(part_filepath, "w", encoding="utf-8") as f:
+                json.dump({k: asdict(v) for k, v in self.profiles.items()}, f)
+            os.replace(part_filepath, self.filepath)
+        except OSError as e:
+            logger.warning(f"Rule Profile :: failed to save ({e})")
+
+    def slowest(self, count: int) -> List[Tuple[str, RuleProfile]]:
+        with self._lock:
+            self._load()
+            items = sorted(
+                self.profiles.items(), key=lambda kv: kv[1].last_elapsed, reverse=True
+            )
+        return items[:count]
+
+    def clear(self):
+        with self._lock:
+            self.profiles = {}
+            self._loaded = True
+            self._save()
+
+
+_rule_profiles: Optional[RuleProfiles] = None
+
+
+def rule_profiles() -> RuleProfiles:
+    global _rule_profiles  # pylint: disable=global-statement
+
+    if _rule_profiles is None:
+        _rule_profiles = RuleProfiles(
+            os.path.join(cache_root(), RULE_PROFILES_FILENAME)
+        )
+    return _rule_profiles
+
+
+def default_rules(task, config: CompiledConfig) -> List[Tuple[str, type]]:
+    # (name, rule class) of the default rules, in their default order
+    validator = BlenderValidator(
+        task,
+        config.constants,
+        use_default_rules=True,
+        custom_rules=[],
+        exclude_rules=[],
+        logger=logger,
+    )
+    return [
+        (rule.name(), rule if isinstance(rule, type) else type(rule))
+        for rule in validator.rules
+    ]
+
+
+@dataclass
+class RuleRunResult:
+    timings: List[RuleTiming] = field(default_factory=list)
+    error: Optional[BlenderValidateError] = None
+
+
+def _fail_fast_order(
+    rules: List[Tuple[str, type]], profiles: RuleProfiles
+) -> List[Tuple[str, type]]:
+    # Check-only rules in order of their recorded cost per object, without moving any
+    # of them across a fix-up rule.
+    def cost(rule: Tuple[str, type]) -> float:
+        return profiles.get(rule[0]).cost_per_object
+
+    ordered: List[Tuple[str, type]] = []
+    segment: List[Tuple[str, type]] = []
+    for rule in rules:
+        profile = profiles.get(rule[0])
+        if profile is not None and profile.is_check_only:
+            segment.append(rule)
+            continue
+        ordered.extend(sorted(segment, key=cost))
+        segment = []
+        ordered.append(rule)
+    ordered.extend(sorted(segment, key=cost))
+    return ordered
+
+
+def _fingerprints() -> Dict[str, str]:
+    return SceneSnapshot.capture(bpy.context.scene).fingerprints
+
+
+def run_rules(task, config: CompiledConfig, fail_fast: bool = False) -> RuleRunResult:
+    # Runs the default rules one by one and stops at the first failure, like a single
+    # validator run. With `fail_fast`, check-only rules run cheapest first, so that
+    # broken files fail early.
+    rules = default_rules(task, config)
+    profiles = rule_profiles()
+    if fail_fast:
+        rules = _fail_fast_order(rules, profiles)
+
+    result = RuleRunResult()
+    objects = len(bpy.context.scene.objects)
+    fingerprints: Optional[Dict[str, str]] = None
+    try:
+        for name, rule_cls in rules:
+            validator = BlenderValidator(
+                task,
+                config.constants,
+                use_default_rules=False,
+                custom_rules=[rule_cls],
+                exclude_rules=[],
+                logger=logger,
+            )
+            timing = RuleTiming(name, 0.0, objects)
+            result.timings.append(timing)
+
+            # Rules known to fix the scene, or known not to, are not checked again.
+            profile = profiles.get(name)
+            check_fixes = profile is None or profile.needs_fix_check
+            if check_fixes and fingerprints is None:
+                with tracer.span("snapshot"):
+                    fingerprints = _fingerprints()
+
+            started = time.perf_counter()
+            try:
+                with tracer.span(timing.name):
+                    validator.validate_and_fix()
+            except BlenderValidateError as e:
+                timing.error = str(e)
+                result.error = e
+                break
+            finally:
+                timing.elapsed = time.perf_counter() - started
+                if check_fixes:
+                    with tracer.span("snapshot"):
+                        fixed_fingerprints = _fingerprints()
+                    timing.fixed = fixed_fingerprints != fingerprints
+                    fingerprints = fixed_fingerprints
+                else:
+                    fingerprints = None
+    finally:
+        profiles.record(result.timings)
+
+    return result
@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import bpy
+
+from gglabs_art_manager.manager.blender.snapshot import SceneSnapshot
+
+# Built once per operator invocation from a `SceneSnapshot`.
+# Maps normalized (`strkey`) category keys of the main collection's children
+# to their collections and objects, so that visibility control and category
+# iteration don't call `strkey`/`is_*_collection` over and over.
+
+__all__ = ["CategoryEntry", "TopCollectionEntry", "SceneIndex"]
+
+
+@dataclass
+class CategoryEntry:
+    key: str
+    collection: bpy.types.Collection
+    is_common: bool
+    is_type: bool  # `type` category collection, holding `body_*` meshes
+    has_armature_subcollection: bool
+    meshes: List[bpy.types.Object] = field(default_factory=list)
+    armatures: List[bpy.types.Object] = field(default_factory=list)
+    body_meshes: List[bpy.types.Object] = field(default_factory=list)
+
+
+@dataclass
+class TopCollectionEntry:
+    collection: bpy.types.Collection
+    is_main: bool
+    # (subcollection, is_common) for main collections
+    children: List[Tuple[bpy.types.Collection, bool]] = field(default_factory=list)
+
+
+@dataclass
+class SceneIndex:
+    scene_objects: List[bpy.types.Object]  # dangled directly to the scene collection
+    top_collections: List[TopCollectionEntry]
+    main: Optional[bpy.types.Collection]
+    categories: List[CategoryEntry]  # children of the main collection, in order
+    by_key: Dict[str, List[CategoryEntry]]
+
+    @classmethod
+    def build(
+        cls,
+        scene: Optional[bpy.types.Scene] = None,
+        snapshot: Optional[SceneSnapshot] = None,
+    ) -> "SceneIndex":
+        snapshot = snapshot or SceneSnapshot.capture(scene, with_fingerprints=False)
+        collections = snapshot.collections
+
+        top_collections = []
+        main_record = None
+        for name in snapshot.top_collections:
+            record = collections[name]
+            entry = TopCollectionEntry(record.collection, record.is_main)
+            if entry.is_main:
+                entry.children = [
+                    (collections[child].collection, collections[child].is_common)
+                    for child in record.children
+                ]
+                if main_record is None:
+                    main_record = record
+            top_collections.append(entry)
+
+        categories = []
+        by_key: Dict[str, List[CategoryEntry]] = {}
+        for name in main_record.children if main_record else []:
+            record = collections[name]
+            entry = CategoryEntry(
+                key=record.key,
+                collection=record.collection,
+                is_common=record.is_common,
+                is_type=record.is_type,
+                has_armature_subcollection=any(
+                    collections[child].is_armature for child in record.children
+                ),
+            )
+            for obj in snapshot.all_objects(name):
+                if obj.type == "MESH":
+                    entry.meshes.append(obj.obj)
+                    if obj.key.startswith("body_"):
+                        entry.body_meshes.append(obj.obj)
+                elif obj.type == "ARMATURE":
+                    entry.armatures.append(obj.obj)
+
+            categories.append(entry)
+            by_key.setdefault(entry.key, []).append(entry)
+
+        return cls(
+            scene_objects=[snapshot.objects[n].obj for n in snapshot.scene_objects],
+            top_collections=top_collections,
+            main=main_record.collection if main_record else None,
+            categories=categories,
+            by_key=by_key,
+        )
+
+    def category_entries(self, keys: FrozenSet[str]) -> Iterator[CategoryEntry]:
+        for entry in self.categories:
+            if entry.key in keys:
+                yield entry
+
+    def iterate_category_meshes(
+        self, keys: FrozenSet[str]
+    ) -> Iterator[Tuple[str, bpy.types.Collection, bpy.types.Object]]:
+        # (collection name, collection, mesh object) of the given categories
+        for entry in self.category_entries(keys):
+            for obj in entry.meshes:
+                yield entry.collection.name, entry.collection, obj
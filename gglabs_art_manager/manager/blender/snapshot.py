@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import bpy
+from blender_validator.utils import (
+    is_armature_collection,
+    is_common_collection,
+    is_main_collection,
+    is_same_strkey,
+    strkey,
+)
+
+from gglabs_art_manager.manager.blender.fingerprint import (
+    collection_fingerprint,
+    object_fingerprint,
+)
+
+# A compact snapshot of the scene, taken in a single walk over its collections and
+# objects. Everything the add-on itself checks (names, `strkey`s, types, hierarchy,
+# collection kinds, shapekey names, structural fingerprints) is read from it, so that
+# RNA is only touched again to apply changes (visibility, fixes, export).
+
+__all__ = ["ObjectRecord", "CollectionRecord", "SceneSnapshot"]
+
+
+def _none(_) -> str:
+    return ""
+
+
+@dataclass
+class ObjectRecord:
+    obj: bpy.types.Object
+    name: str
+    key: str  # `strkey`
+    type: str
+    fingerprint: str
+    shapekey_names: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CollectionRecord:
+    collection: bpy.types.Collection
+    name: str
+    key: str  # `strkey`
+    fingerprint: str
+    is_main: bool
+    is_common: bool
+    is_armature: bool
+    is_type: bool
+    children: List[str] = field(default_factory=list)
+    objects: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SceneSnapshot:
+    scene_fingerprint: str
+    scene_objects: List[str]  # dangled directly to the scene collection
+    top_collections: List[str]
+    collections: Dict[str, CollectionRecord]
+    objects: Dict[str, ObjectRecord]
+
+    @classmethod
+    def capture(
+        cls, scene: Optional[bpy.types.Scene] = None, with_fingerprints: bool = True
+    ) -> "SceneSnapshot":
+        scene = scene or bpy.context.scene
+        fingerprint_collection = collection_fingerprint if with_fingerprints else _none
+        fingerprint_object = object_fingerprint if with_fingerprints else _none
+
+        collections: Dict[str, CollectionRecord] = {}
+        for collection in scene.collection.children_recursive:
+            collections[collection.name] = CollectionRecord(
+                collection=collection,
+                name=collection.name,
+                key=strkey(collection),
+                fingerprint=fingerprint_collection(collection),
+                is_main=is_main_collection(collection),
+                is_common=is_common_collection(collection),
+                is_armature=is_armature_collection(collection),
+                is_type=is_same_strkey(collection, "type"),
+                children=[c.name for c in collection.children],
+                objects=[o.name for o in collection.objects],
+            )
+
+        objects: Dict[str, ObjectRecord] = {}
+        for obj in scene.objects:
+            record = ObjectRecord(
+                obj=obj,
+                name=obj.name,
+                key=strkey(obj),
+                type=obj.type,
+                fingerprint=fingerprint_object(obj),
+            )
+            if obj.type == "MESH" and obj.data.shape_keys:
+                record.shapekey_names = [
+                    kb.name for kb in obj.data.shape_keys.key_blocks
+                ]
+            objects[obj.name] = record
+
+        return cls(
+            scene_fingerprint=fingerprint_collection(scene.collection),
+            scene_objects=[o.name for o in scene.collection.objects],
+            top_collections=[c.name for c in scene.collection.children],
+            collections=collections,
+            objects=objects,
+        )
+
+    @property
+    def fingerprints(self) -> Dict[str, str]:
+        # Keys: "SC" (scene collection), "CO:<collection>", "OB:<object>"
+        fingerprints = {"SC": self.scene_fingerprint}
+        for name, record in self.collections.items():
+            fingerprints[f"CO:{name}"] = record.fingerprint
+        for name, record in self.objects.items():
+            fingerprints[f"OB:{name}"] = record.fingerprint
+        return fingerprints
+
+    def all_objects(self, collection_name: str) -> Iterator[ObjectRecord]:
+        # Same as `Collection.all_objects`, without touching RNA
+        seen = set()
+        stack = [collection_name]
+        while stack:
+            record = self.collections[stack.pop(0)]
+            for name in record.objects:
+                if name not in seen and name in self.objects:
+                    seen.add(name)
+                    yield self.objects[name]
+            stack[:0] = record.children
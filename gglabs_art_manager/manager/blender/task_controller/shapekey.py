@@ -1,16 +1,22 @@
 import bpy
-from blender_validator import ConfigLoader
-from blender_validator.utils import (
-    iterate_category_mesh_objects,
-    remove_prefix_from_shapekeys,
-)
 
 from gglabs_art_manager.blender import GAM_PGT_TaskControlView, TaskControlView
-from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
-from gglabs_art_manager.manager.logger import logger
+from gglabs_art_manager.manager.blender.config import load_config
+from gglabs_art_manager.manager.blender.pipeline import remove_shapekey_prefix
+from gglabs_art_manager.manager.blender.property_group import (
+    GAM_PGT_Issue,
+    GAM_PGT_Main,
+    select_issue_object,
+    store_issues,
+)
+from gglabs_art_manager.manager.blender.tracing import operator_trace
+from gglabs_art_manager.manager.logger import tracer
 
 
 class GAM_PGT_ShapekeyControlPanel(GAM_PGT_TaskControlView):
+    def on_rename_issue_selected(self, context):
+        select_issue_object(self.rename_issues, self.rename_issues_index)
+
     control_enabled: bpy.props.BoolProperty(
         name="Shapekey 이름 보정하기",
         description="Shapekey 이름 보정 도구를 화면에 나타냅니다.",
@@ -29,11 +35,19 @@ class GAM_PGT_ShapekeyControlPanel(GAM_PGT_TaskControlView):
         default="",
     )
 
+    rename_issues: bpy.props.CollectionProperty(type=GAM_PGT_Issue)
+
+    rename_issues_index: bpy.props.IntProperty(
+        default=0,
+        update=on_rename_issue_selected,
+    )
+
     @classmethod
     def reset(cls):
         cls.setattr("control_enabled", False)
         cls.setattr("shapekey_name_prefix", "")
         cls.setattr("result_message", "")
+        cls.getprops().rename_issues.clear()
 
 
 class GAM_OT_RenameShapekey(bpy.types.Operator):
@@ -43,9 +57,14 @@ class GAM_OT_RenameShapekey(bpy.types.Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
+        with operator_trace("rename_shapekey"):
+            return self._execute()
+
+    def _execute(self):
         accessor = GAM_PGT_Main
         config: str = accessor.getattr_abspath("validate_config_filepath")
-        constants = ConfigLoader.load(config)
+        with tracer.span("load_config"):
+            compiled_config = load_config(config)
 
         accessor = GAM_PGT_ShapekeyControlPanel
         prefix: str = accessor.getattr_str("shapekey_name_prefix")
@@ -53,38 +72,20 @@ class GAM_OT_RenameShapekey(bpy.types.Operator):
         if not prefix:
             return {"FINISHED"}
 
-        modified_obj_cnt = 0
-        modified_shapekey_cnt = 0
-
-        for col_expr, _, obj in iterate_category_mesh_objects(
-            constants.parts_categories
-        ):
-            sk_report_lines = [
-                f"Shapekey[{d.key}] {d.detail}"
-                for details in remove_prefix_from_shapekeys(obj, prefix).values()
-                for d in details
-            ]
-
-            if len(sk_report_lines) > 0:
-                logger.log(
-                    f"Shapekey Fixed :: [{col_expr}] {obj.name} ({obj.data.name})"
-                )
-                for line in sk_report_lines:
-                    logger.log(line)
-                logger.log("")
-
-                modified_shapekey_cnt += len(sk_report_lines)
-                modified_obj_cnt += 1
+        issues = remove_shapekey_prefix(compiled_config, prefix)
+        modified_obj_cnt = len({issue.object_name for issue in issues})
+        modified_shapekey_cnt = len(issues)
 
         if modified_obj_cnt == 0:
             message = "해당 prefix를 가진 shapekey가 없습니다!"
         else:
             message = (
                 f"총 {modified_obj_cnt}건의 mesh에서 {modified_shapekey_cnt}의 shapekey들이 변경되었습니다."
-                "\n자세한 변경 내용은 console log를 확인해주세요."
+                "\n자세한 변경 내용은 아래 목록을 확인해주세요."
             )
 
         accessor.setattr("result_message", message)
+        store_issues(accessor.getprops().rename_issues, issues)
 
         return {"FINISHED"}
 
@@ -111,3 +112,15 @@ class ShapekeyControlPanel(TaskControlView):
         for line in message.split("\n"):
             if line.rstrip():
                 layout.label(text=line.rstrip())
+
+        if len(params.rename_issues) > 0:
+            # `GAM_UL_Issues` is registered with the main panel.
+            layout.template_list(
+                "GAM_UL_Issues",
+                "rename_issues",
+                params,
+                "rename_issues",
+                params,
+                "rename_issues_index",
+                rows=6,
+            )
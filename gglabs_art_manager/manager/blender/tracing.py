@@ -0,0 +1,18 @@
+from typing import ContextManager, Optional
+
+import bpy
+
+from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
+from gglabs_art_manager.manager.logger import tracer
+
+__all__ = ["trace_dirpath", "operator_trace"]
+
+
+def trace_dirpath() -> Optional[str]:
+    # Where to write Chrome trace files; `None` keeps the traces in memory only.
+    dirpath = GAM_PGT_Main.getattr_str("trace_dirpath")
+    return bpy.path.abspath(dirpath) if dirpath else None
+
+
+def operator_trace(name: str) -> ContextManager[None]:
+    return tracer.trace(name, trace_dirpath())
@@ -0,0 +1,60 @@
+import bpy
+
+from gglabs_art_manager.batch.model import BatchJob
+from gglabs_art_manager.batch.watch import WatchQueue
+from gglabs_art_manager.manager.logger import logger
+
+# Watch mode, add-on side.
+# On save, the file is queued with the options of the panel for the watcher
+# (`python -m gglabs_art_manager.batch watch`), which validates and exports it in the
+# background. Only a small json file is written; the session never waits for blender.
+
+__all__ = ["register_watch", "unregister_watch"]
+
+
+def watch_job() -> BatchJob:
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.manager.blender.operator import clip_mode_of
+    from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
+
+    props = GAM_PGT_Main.getprops()
+    return BatchJob(
+        blend_filepath=bpy.path.abspath(bpy.data.filepath),
+        config_filepath=bpy.path.abspath(props.validate_config_filepath),
+        task_type=props.task_type,
+        output_dirpath=bpy.path.abspath(props.output_dirpath),
+        glb_type=props.glb_type,
+        use_cache=props.use_export_cache,
+        quantize=props.use_quantization,
+        encode_textures=props.use_texture_encoding,
+        clip_mode=clip_mode_of(props.animation_clip_mode),
+    )
+
+
+@bpy.app.handlers.persistent
+def _on_save_post(*_):
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.manager.blender.property_group import GAM_PGT_Main
+
+    if bpy.app.background or not bpy.data.filepath:
+        return
+    props = GAM_PGT_Main.getprops()
+    if not props.watch_export or not props.is_validate_config_loaded:
+        return
+
+    try:
+        WatchQueue().enqueue(watch_job())
+    except OSError as e:
+        logger.error(f"Watch :: {e}")
+        return
+    logger.log(f"Watch :: queued {bpy.path.basename(bpy.data.filepath)}")
+
+
+def register_watch():
+    if _on_save_post not in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.append(_on_save_post)
+
+
+def unregister_watch():
+    if _on_save_post in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.remove(_on_save_post)
@@ -0,0 +1,76 @@
+# `bpy`-free building blocks of the export pipeline.
+from gglabs_art_manager.manager.engine.cache import FileCache, cache_key, export_cache
+from gglabs_art_manager.manager.engine.clip import split_animation_clips
+from gglabs_art_manager.manager.engine.dedup import DedupOptions, DedupReport, dedup_glb
+from gglabs_art_manager.manager.engine.fileio import (
+    atomic_output,
+    make_scratch_dir,
+    scratch_dir,
+)
+from gglabs_art_manager.manager.engine.formatter import (
+    FormatResult,
+    GltfFormatError,
+    PostprocessOptions,
+    format_glb,
+    shutdown_formatter_pool,
+    submit_format,
+)
+from gglabs_art_manager.manager.engine.keyframe import (
+    KeyframeReductionOptions,
+    KeyframeReductionReport,
+    reduce_glb_keyframes,
+)
+from gglabs_art_manager.manager.engine.quantize import (
+    QuantizationOptions,
+    QuantizationReport,
+    quantize_glb,
+)
+from gglabs_art_manager.manager.engine.sparse import (
+    SparseMorphOptions,
+    SparseMorphReport,
+    sparsify_glb_morphs,
+)
+from gglabs_art_manager.manager.engine.texture import (
+    TextureOptions,
+    TextureReport,
+    available_formats,
+    encode_glb_textures,
+    texture_cache,
+)
+from gglabs_art_manager.manager.engine.trace import Span, Trace, Tracer
+
+__all__ = [
+    "DedupOptions",
+    "DedupReport",
+    "FileCache",
+    "FormatResult",
+    "GltfFormatError",
+    "KeyframeReductionOptions",
+    "KeyframeReductionReport",
+    "PostprocessOptions",
+    "QuantizationOptions",
+    "QuantizationReport",
+    "Span",
+    "SparseMorphOptions",
+    "SparseMorphReport",
+    "TextureOptions",
+    "TextureReport",
+    "Trace",
+    "Tracer",
+    "atomic_output",
+    "available_formats",
+    "cache_key",
+    "dedup_glb",
+    "encode_glb_textures",
+    "export_cache",
+    "format_glb",
+    "make_scratch_dir",
+    "quantize_glb",
+    "reduce_glb_keyframes",
+    "scratch_dir",
+    "shutdown_formatter_pool",
+    "sparsify_glb_morphs",
+    "split_animation_clips",
+    "submit_format",
+    "texture_cache",
+]
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from typing import Any, List, Optional, Tuple
+
+# Content addressed file cache with a size limit.
+# Entries are plain files named after their key; the mtime of an entry is bumped on every
+# hit and the least recently used entries are evicted once the total size is over budget.
+
+CACHE_DIR_ENV = "GAM_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "gglabs_art_manager"
+)
+
+
+def cache_root() -> str:
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+def cache_key(*parts: Any) -> str:
+    # Stable sha256 of json-serializable parts.
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FileCache:
+    def __init__(self, dirpath: str, max_bytes: int):
+        self.dirpath = dirpath
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.dirpath, key[:2], f"{key}{ext}")
+
+    def get(self, key: str, ext: str = "") -> Optional[str]:
+        # Returns the path of the cached file (valid until evicted) or None.
+        path = self._entry_path(key, ext)
+        try:
+            os.utime(path)  # LRU bookkeeping
+        except FileNotFoundError:
+            return None
+        return path
+
+    def fetch(self, key: str, dst: str, ext: str = "") -> bool:
+        path = self.get(key, ext)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, dst)
+        except FileNotFoundError:  # evicted in between
+            return False
+        return True
+
+    def put(self, key: str, src: str, ext: str = "") -> str:
+        path = self._entry_path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        part_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            shutil.copyfile(src, part_path)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+        self.evict()
+        return path
+
+    def put_bytes(self, key: str, data: bytes, ext: str = "") -> str:
+        path = self._entry_path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        part_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            with open(part_path, "wb") as f:
+                f.write(data)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+        self.evict()
+        return path
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        # (atime-ish mtime, size, path) of every entry
+        res = []
+        if not os.path.isdir(self.dirpath):
+            return res
+
+        for root, _, files in os.walk(self.dirpath):
+            for filename in files:
+                if filename.endswith(".part"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                res.append((st.st_mtime, st.st_size, path))
+        return res
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        # Removes the least recently used entries until the cache fits in `max_bytes`.
+        # Other processes may evict at the same time; entries already gone are skipped.
+        removed = 0
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.dirpath, ignore_errors=True)
+
+
+EXPORT_CACHE_MAX_BYTES_ENV = "GAM_EXPORT_CACHE_MAX_BYTES"
+DEFAULT_EXPORT_CACHE_MAX_BYTES = 2 * 1024**3
+
+
+def export_cache() -> FileCache:
+    max_bytes = int(
+        os.environ.get(EXPORT_CACHE_MAX_BYTES_ENV) or DEFAULT_EXPORT_CACHE_MAX_BYTES
+    )
+    return FileCache(os.path.join(cache_root(), "export"), max_bytes)
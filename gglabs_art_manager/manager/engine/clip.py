@@ -0,0 +1,218 @@
+import os
+import re
+from typing import Dict, List
+
+from gglabs_art_manager.manager.engine.fileio import atomic_output
+from gglabs_art_manager.manager.engine.glb import COMPONENT_DTYPES, FLOAT, GlbFile
+
+# Splits the animations of a GLB into animation-only clip files.
+# A clip keeps the node hierarchy (names, rest transforms, extras) and a single
+# animation; the runtime binds its channels to the rig file by node name. Nodes whose
+# morph weights are animated get a one-point stub mesh with the same morph targets
+# (and `extras.targetNames`), since a weights channel must target a mesh with targets.
+
+_POINTS = 0
+
+__all__ = [
+    "clip_filename",
+    "split_animation_clips",
+    "split_gltf_clips",
+    "remove_animations",
+]
+
+
+def clip_filename(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("._") or "animation"
+
+
+class _ClipWriter:
+    def __init__(self, glb: GlbFile):
+        self.glb = glb
+        self.gltf = glb.gltf
+
+    def _copy_accessor(self, clip: GlbFile, accessor_idx: int) -> int:
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import Accessor
+
+        accessor = self.gltf.accessors[accessor_idx]
+        if accessor.sparse is not None or accessor.bufferView is None:
+            raise ValueError(f"accessor {accessor_idx} isn't a dense accessor")
+        data = self.glb.read_accessor(accessor_idx)
+        data = data.astype(COMPONENT_DTYPES[accessor.componentType])
+        clip.gltf.accessors.append(
+            Accessor(
+                bufferView=clip.append_view(data.tobytes()),
+                byteOffset=0,
+                componentType=accessor.componentType,
+                normalized=accessor.normalized,
+                count=accessor.count,
+                type=accessor.type,
+                min=accessor.min,
+                max=accessor.max,
+            )
+        )
+        return len(clip.gltf.accessors) - 1
+
+    def _stub_mesh(self, clip: GlbFile, mesh_idx: int, point: int) -> int:
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import Attributes, Mesh, Primitive
+
+        mesh = self.gltf.meshes[mesh_idx]
+        targets = max((len(p.targets or []) for p in mesh.primitives), default=0)
+        clip.gltf.meshes.append(
+            Mesh(
+                name=mesh.name,
+                weights=mesh.weights,
+                extras=mesh.extras,
+                primitives=[
+                    Primitive(
+                        attributes=Attributes(POSITION=point),
+                        targets=[{"POSITION": point} for _ in range(targets)],
+                        mode=_POINTS,
+                    )
+                ],
+            )
+        )
+        return len(clip.gltf.meshes) - 1
+
+    def _stub_point(self, clip: GlbFile) -> int:
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import Accessor
+
+        clip.gltf.accessors.append(
+            Accessor(
+                bufferView=clip.append_view(b"\0" * 12),
+                byteOffset=0,
+                componentType=FLOAT,
+                count=1,
+                type="VEC3",
+                min=[0.0, 0.0, 0.0],
+                max=[0.0, 0.0, 0.0],
+            )
+        )
+        return len(clip.gltf.accessors) - 1
+
+    def write(self, animation, filepath: str):
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import (
+            GLTF2,
+            Animation,
+            AnimationChannel,
+            AnimationChannelTarget,
+            AnimationSampler,
+            Asset,
+            Buffer,
+            Node,
+            Scene,
+        )
+
+        gltf = self.gltf
+        clip = GlbFile(
+            GLTF2(
+                asset=Asset(generator=gltf.asset.generator, version=gltf.asset.version),
+                scene=gltf.scene,
+                scenes=[
+                    Scene(name=s.name, nodes=list(s.nodes or []), extras=s.extras)
+                    for s in gltf.scenes
+                ],
+                nodes=[
+                    Node(
+                        name=n.name,
+                        children=list(n.children or []),
+                        translation=n.translation,
+                        rotation=n.rotation,
+                        scale=n.scale,
+                        matrix=n.matrix,
+                        extras=n.extras,
+                    )
+                    for n in gltf.nodes
+                ],
+            )
+        )
+
+        accessors: Dict[int, int] = {}
+        samplers = []
+        for sampler in animation.samplers:
+            for idx in (sampler.input, sampler.output):
+                if idx not in accessors:
+                    accessors[idx] = self._copy_accessor(clip, idx)
+            samplers.append(
+                AnimationSampler(
+                    input=accessors[sampler.input],
+                    output=accessors[sampler.output],
+                    interpolation=sampler.interpolation,
+                )
+            )
+
+        meshes: Dict[int, int] = {}
+        point = None
+        for channel in animation.channels:
+            node_idx = channel.target.node
+            if channel.target.path != "weights" or node_idx is None:
+                continue
+            mesh_idx = gltf.nodes[node_idx].mesh
+            if mesh_idx is None:
+                continue
+            if mesh_idx not in meshes:
+                if point is None:
+                    point = self._stub_point(clip)
+                meshes[mesh_idx] = self._stub_mesh(clip, mesh_idx, point)
+            clip.gltf.nodes[node_idx].mesh = meshes[mesh_idx]
+
+        clip.gltf.animations = [
+            Animation(
+                name=animation.name,
+                samplers=samplers,
+                channels=[
+                    AnimationChannel(
+                        sampler=c.sampler,
+                        target=AnimationChannelTarget(
+                            node=c.target.node, path=c.target.path
+                        ),
+                    )
+                    for c in animation.channels
+                ],
+                extras=animation.extras,
+            )
+        ]
+        clip.gltf.buffers = [Buffer(byteLength=clip.byte_length)]
+        with atomic_output(filepath) as part_filepath:
+            clip.save(part_filepath)
+
+
+def split_animation_clips(src: str, output_dirpath: str) -> List[str]:
+    return split_gltf_clips(GlbFile.load(src), output_dirpath)
+
+
+def split_gltf_clips(glb: GlbFile, output_dirpath: str) -> List[str]:
+    # Writes `{output_dirpath}/{animation name}.glb` per animation of `glb` and
+    # removes the clips of previous exports that aren't there anymore.
+    reason = glb.skip_reason()
+    if reason is not None:
+        raise ValueError(f"can't split the animations: {reason}")
+
+    os.makedirs(output_dirpath, exist_ok=True)
+    writer = _ClipWriter(glb)
+    filepaths: List[str] = []
+    for idx, animation in enumerate(glb.gltf.animations):
+        name = clip_filename(animation.name or f"animation_{idx}")
+        filepath = os.path.join(output_dirpath, f"{name}.glb")
+        if filepath in filepaths:
+            filepath = os.path.join(output_dirpath, f"{name}_{idx}.glb")
+        writer.write(animation, filepath)
+        filepaths.append(filepath)
+
+    for filename in os.listdir(output_dirpath):
+        filepath = os.path.join(output_dirpath, filename)
+        if filename.endswith(".glb") and filepath not in filepaths:
+            os.remove(filepath)
+    return filepaths
+
+
+def remove_animations(glb: GlbFile):
+    # What is left once the clips are written: the rig and meshes alone
+    for animation in glb.gltf.animations:
+        for sampler in animation.samplers:
+            glb.release_accessor(sampler.input)
+            glb.release_accessor(sampler.output)
+    glb.gltf.animations = []
@@ -0,0 +1,285 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+from gglabs_art_manager.manager.engine.glb import GlbFile
+
+# Deduplication post-pass for formatted GLBs.
+# Parts shared through the `common` collection come out of the exporter once per
+# user. Identical buffer views (hashed over the blob, without copies), accessors,
+# images, textures, materials and meshes are merged into their first instance and
+# every reference is pointed at it; the copies are dropped on save.
+# Runs last, so that the data written by the other passes is merged as well.
+
+# Extensions referring to materials from outside of the primitives
+_MATERIAL_EXTENSIONS = ("KHR_materials_variants",)
+
+__all__ = ["DedupOptions", "DedupReport", "dedup_gltf", "dedup_glb"]
+
+
+@dataclass(frozen=True)
+class DedupOptions:
+    buffer_views: bool = True
+    accessors: bool = True
+    images: bool = True
+    materials: bool = True  # textures and materials
+    meshes: bool = True
+
+
+@dataclass
+class DedupReport:
+    # Of the binary chunk
+    original_bytes: int = 0
+    output_bytes: int = 0
+    merged: Dict[str, int] = field(default_factory=dict)  # kind -> duplicates
+    skipped: Dict[str, str] = field(default_factory=dict)  # kind -> reason
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.output_bytes
+
+    def summary(self) -> str:
+        ratio = self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+        merged = ", ".join(f"{n} {kind}" for kind, n in self.merged.items() if n)
+        return (
+            f"{self.original_bytes / 1024:.1f}KB -> {self.output_bytes / 1024:.1f}KB"
+            f" (-{ratio * 100:.1f}%), merged {merged or 'nothing'}"
+        )
+
+
+def _duplicates(keys: Iterator[Tuple[int, Hashable]]) -> Dict[int, int]:
+    # {duplicate: first index} of the (index, key) pairs
+    first: Dict[Hashable, int] = {}
+    duplicates: Dict[int, int] = {}
+    for idx, key in keys:
+        if key is None:
+            continue
+        if key in first:
+            duplicates[idx] = first[key]
+        else:
+            first[key] = idx
+    return duplicates
+
+
+def _drop(items: List, duplicates: Dict[int, int]) -> Tuple[List, Dict[int, int]]:
+    # Removes the duplicates; returns the items and {old index: new index}.
+    remap: Dict[int, int] = {}
+    kept = []
+    for idx, item in enumerate(items):
+        if idx not in duplicates:
+            remap[idx] = len(kept)
+            kept.append(item)
+    for idx, target in duplicates.items():
+        remap[idx] = remap[target]
+    return kept, remap
+
+
+def _to_dict(value):
+    # Plain data of a pygltflib object (dataclasses and dicts), for keys
+    if isinstance(value, dict):
+        return {k: _to_dict(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_to_dict(v) for v in value]
+    if hasattr(value, "__dict__"):
+        return {k: _to_dict(v) for k, v in vars(value).items() if v is not None}
+    return value
+
+
+def _unnamed_key(value) -> str:
+    # Everything but the name; the first instance keeps its own
+    data = _to_dict(value)
+    data.pop("name", None)
+    return json.dumps(data, sort_keys=True, default=repr)
+
+
+def _children(value) -> Iterator[Tuple[str, object]]:
+    if isinstance(value, dict):
+        return iter(list(value.items()))
+    if hasattr(value, "__dict__"):
+        return iter(list(vars(value).items()))
+    return iter(())
+
+
+def _texture_refs(value) -> Iterator[object]:
+    # Texture infos (`*Texture` members, also in extensions) holding an `index`
+    for key, child in _children(value):
+        if child is None or isinstance(child, (str, int, float, bool)):
+            continue
+        if key.endswith("Texture") and GlbFile.get_ref(child, "index") is not None:
+            yield child
+        for item in child if isinstance(child, list) else [child]:
+            yield from _texture_refs(item)
+
+
+def _image_refs(texture) -> Iterator[Tuple[object, str]]:
+    # `source` of the texture and of its image extensions (EXT_texture_webp, ...)
+    yield texture, "source"
+    for extension in (texture.extensions or {}).values():
+        if isinstance(extension, dict) and extension.get("source") is not None:
+            yield extension, "source"
+
+
+class _Deduplicator:
+    def __init__(self, glb: GlbFile, options: DedupOptions):
+        self.glb = glb
+        self.gltf = glb.gltf
+        self.options = options
+        self.report = DedupReport()
+
+    def _merged(self, kind: str, duplicates: Dict[int, int]):
+        self.report.merged[kind] = len(duplicates)
+
+    def buffer_views(self):
+        glb = self.glb
+        used = glb.used_views()
+        groups: Dict[Tuple, List[int]] = {}
+        for idx in sorted(used):
+            view = self.gltf.bufferViews[idx]
+            digest = hashlib.blake2b(glb.view_memory(idx), digest_size=16).digest()
+            key = (view.byteLength, view.byteStride, view.target, digest)
+            groups.setdefault(key, []).append(idx)
+
+        duplicates: Dict[int, int] = {}
+        for indices in groups.values():
+            first = indices[0]
+            for idx in indices[1:]:
+                # Compared byte by byte, in case of a hash collision
+                if glb.view_memory(idx) == glb.view_memory(first):
+                    duplicates[idx] = first
+        if duplicates:
+            glb.replace_views(duplicates)
+        self._merged("buffer views", duplicates)
+
+    def accessors(self):
+        def key(accessor):
+            sparse = accessor.sparse
+            return (
+                accessor.bufferView,
+                accessor.byteOffset or 0,
+                accessor.componentType,
+                bool(accessor.normalized),
+                accessor.count,
+                accessor.type,
+                None
+                if sparse is None
+                else (
+                    sparse.count,
+                    sparse.indices.bufferView,
+                    sparse.indices.byteOffset or 0,
+                    sparse.indices.componentType,
+                    sparse.values.bufferView,
+                    sparse.values.byteOffset or 0,
+                ),
+            )
+
+        duplicates = _duplicates(
+            (idx, key(accessor)) for idx, accessor in enumerate(self.gltf.accessors)
+        )
+        if duplicates:
+            self.glb.replace_accessors(duplicates)
+        self._merged("accessors", duplicates)
+
+    def images(self):
+        gltf = self.gltf
+
+        def key(image):
+            if image.bufferView is not None:
+                return ("bufferView", image.bufferView, image.mimeType)
+            if image.uri:
+                return ("uri", image.uri)
+            return None
+
+        duplicates = _duplicates(
+            (idx, key(image)) for idx, image in enumerate(gltf.images)
+        )
+        if duplicates:
+            gltf.images, remap = _drop(gltf.images, duplicates)
+            for texture in gltf.textures:
+                for holder, name in _image_refs(texture):
+                    if GlbFile.get_ref(holder, name) is not None:
+                        GlbFile.set_ref(
+                            holder, name, remap[GlbFile.get_ref(holder, name)]
+                        )
+            self.glb.modified = True
+        self._merged("images", duplicates)
+
+    def materials(self):
+        gltf = self.gltf
+        if any(e in _MATERIAL_EXTENSIONS for e in gltf.extensionsUsed or []):
+            self.report.skipped["materials"] = "material variants"
+            return
+
+        duplicates = _duplicates(
+            (idx, _unnamed_key(texture)) for idx, texture in enumerate(gltf.textures)
+        )
+        if duplicates:
+            gltf.textures, remap = _drop(gltf.textures, duplicates)
+            for material in gltf.materials:
+                for texture_info in _texture_refs(material):
+                    index = remap[GlbFile.get_ref(texture_info, "index")]
+                    GlbFile.set_ref(texture_info, "index", index)
+            self.glb.modified = True
+        self._merged("textures", duplicates)
+
+        duplicates = _duplicates(
+            (idx, _unnamed_key(material)) for idx, material in enumerate(gltf.materials)
+        )
+        if duplicates:
+            gltf.materials, remap = _drop(gltf.materials, duplicates)
+            for mesh in gltf.meshes:
+                for primitive in mesh.primitives:
+                    if primitive.material is not None:
+                        primitive.material = remap[primitive.material]
+            self.glb.modified = True
+        self._merged("materials", duplicates)
+
+    def meshes(self):
+        gltf = self.gltf
+        duplicates = _duplicates(
+            (idx, _unnamed_key(mesh)) for idx, mesh in enumerate(gltf.meshes)
+        )
+        if duplicates:
+            gltf.meshes, remap = _drop(gltf.meshes, duplicates)
+            for node in gltf.nodes:
+                if node.mesh is not None:
+                    node.mesh = remap[node.mesh]
+            self.glb.modified = True
+        self._merged("meshes", duplicates)
+
+    def run(self):
+        options = self.options
+        self.report.original_bytes = self.glb.referenced_bytes()
+        # Each step compares references merged by the previous ones.
+        if options.buffer_views:
+            self.buffer_views()
+        if options.accessors:
+            self.accessors()
+        if options.images:
+            self.images()
+        if options.materials:
+            self.materials()
+        if options.meshes:
+            self.meshes()
+        self.report.output_bytes = self.glb.referenced_bytes()
+
+
+def dedup_gltf(glb: GlbFile, options: DedupOptions) -> DedupReport:
+    # Merges the duplicates of `glb` in place.
+    reason = glb.skip_reason()
+    if reason is not None:
+        report = DedupReport()
+        report.skipped["*"] = reason
+        return report
+
+    deduplicator = _Deduplicator(glb, options)
+    deduplicator.run()
+    return deduplicator.report
+
+
+def dedup_glb(src: str, dst: str, options: DedupOptions) -> DedupReport:
+    # `src` and `dst` may be the same file.
+    glb = GlbFile.load(src)
+    report = dedup_gltf(glb, options)
+    glb.save(dst)
+    return report
@@ -0,0 +1,73 @@
+import contextlib
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Iterator, Optional
+
+# Candidates of RAM-backed directories, used in order.
+RAM_DISK_DIRS = ["/dev/shm"]
+# A RAM-backed directory is only used with room for the expected files and this much
+# more; `/dev/shm` is often only 64MB in containers.
+RAM_DISK_RESERVE_BYTES = 256 * 1024**2
+# Expected size of the scratch files when the caller can't tell
+DEFAULT_SCRATCH_BYTES = 512 * 1024**2
+
+SCRATCH_DIR_ENV = "GAM_SCRATCH_DIR"
+
+
+def _free_bytes(dirpath: str) -> int:
+    try:
+        return shutil.disk_usage(dirpath).free
+    except OSError:
+        return 0
+
+
+def ram_scratch_root(expected_bytes: int = DEFAULT_SCRATCH_BYTES) -> str:
+    root: Optional[str] = os.environ.get(SCRATCH_DIR_ENV)
+    if root:
+        return root
+
+    for d in RAM_DISK_DIRS:
+        if (
+            os.path.isdir(d)
+            and os.access(d, os.W_OK)
+            and _free_bytes(d) >= expected_bytes + RAM_DISK_RESERVE_BYTES
+        ):
+            return d
+
+    return tempfile.gettempdir()
+
+
+def make_scratch_dir(
+    prefix: str = "gam_", expected_bytes: int = DEFAULT_SCRATCH_BYTES
+) -> str:
+    # The caller owns (and removes) the directory.
+    return tempfile.mkdtemp(prefix=prefix, dir=ram_scratch_root(expected_bytes))
+
+
+@contextlib.contextmanager
+def scratch_dir(
+    prefix: str = "gam_", expected_bytes: int = DEFAULT_SCRATCH_BYTES
+) -> Iterator[str]:
+    # Intermediate files never touch the output directory (which may be a network share)
+    # and are removed even if the export fails.
+    d = make_scratch_dir(prefix, expected_bytes)
+    try:
+        yield d
+    finally:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def atomic_output(filepath: str) -> Iterator[str]:
+    # Yields a hidden sibling path to write into, then renames it to `filepath` at once.
+    # Readers of `filepath` never see a half-written file.
+    dirpath, filename = os.path.split(os.path.abspath(filepath))
+    part_filepath = os.path.join(dirpath, f".{filename}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        yield part_filepath
+        os.replace(part_filepath, filepath)
+    finally:
+        if os.path.exists(part_filepath):
+            os.remove(part_filepath)
@@ -0,0 +1,275 @@
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from gglabs_art_manager.manager.engine.clip import remove_animations, split_gltf_clips
+from gglabs_art_manager.manager.engine.dedup import (
+    DedupOptions,
+    DedupReport,
+    dedup_gltf,
+)
+from gglabs_art_manager.manager.engine.fileio import atomic_output, scratch_dir
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.manager.engine.keyframe import (
+    KeyframeReductionOptions,
+    KeyframeReductionReport,
+    reduce_gltf_keyframes,
+)
+from gglabs_art_manager.manager.engine.quantize import (
+    QuantizationOptions,
+    QuantizationReport,
+    quantize_gltf,
+)
+from gglabs_art_manager.manager.engine.sparse import (
+    SparseMorphOptions,
+    SparseMorphReport,
+    sparsify_gltf_morphs,
+)
+from gglabs_art_manager.manager.engine.texture import (
+    TextureOptions,
+    TextureReport,
+    encode_gltf_textures,
+    texture_cache,
+)
+
+# GltfFormatter post-processing in worker processes.
+# Only `gltf_formatter`/`pygltflib` are needed here; `bpy` and `blender_validator`
+# must not be imported by this module, since the workers are plain python processes.
+
+FORMATTER_WORKERS_ENV = "GAM_FORMATTER_WORKERS"
+
+__all__ = [
+    "PostprocessOptions",
+    "FormatResult",
+    "GltfFormatError",
+    "format_glb",
+    "submit_format",
+    "shutdown_formatter_pool",
+]
+
+
+class GltfFormatError(Exception):
+    pass
+
+
+class _CollectingLogger:
+    # Same interface as `StdoutLogger`; lines are sent back to the blender process.
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def log(self, *args):
+        self.lines.append(" ".join(str(arg) for arg in args))
+
+
+@dataclass(frozen=True)
+class PostprocessOptions:
+    # Passes run on the formatted GLB, before it replaces the output file
+    quantization: Optional[QuantizationOptions] = None
+    textures: Optional[TextureOptions] = None
+    keyframes: Optional[KeyframeReductionOptions] = None
+    sparse_morphs: Optional[SparseMorphOptions] = None
+    dedup: Optional[DedupOptions] = None
+    use_texture_cache: bool = True
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            options is not None
+            for options in (
+                self.quantization,
+                self.textures,
+                self.keyframes,
+                self.sparse_morphs,
+                self.dedup,
+            )
+        )
+
+
+@dataclass
+class FormatResult:
+    output_filepath: str
+    error: Optional[str] = None
+    logs: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    quantization: Optional[QuantizationReport] = None
+    textures: Optional[TextureReport] = None
+    keyframes: Optional[KeyframeReductionReport] = None
+    sparse_morphs: Optional[SparseMorphReport] = None
+    dedup: Optional[DedupReport] = None
+    clips: List[str] = field(default_factory=list)
+
+
+def _postprocess(
+    src: str,
+    dst: str,
+    options: PostprocessOptions,
+    result: FormatResult,
+    clips_dirpath: Optional[str] = None,
+):
+    # All passes work on a single load of the GLB.
+    glb = GlbFile.load(src)
+    if options.textures is not None:
+        cache = texture_cache() if options.use_texture_cache else None
+        result.textures = encode_gltf_textures(glb, options.textures, cache)
+    if options.keyframes is not None:
+        result.keyframes = reduce_gltf_keyframes(glb, options.keyframes)
+    if options.sparse_morphs is not None:
+        # Before the quantization, which quantizes the sparse values
+        result.sparse_morphs = sparsify_gltf_morphs(glb, options.sparse_morphs)
+    if options.quantization is not None:
+        result.quantization = quantize_gltf(glb, options.quantization)
+    if options.dedup is not None:
+        # Last, to merge what the other passes have written as well
+        result.dedup = dedup_gltf(glb, options.dedup)
+
+    animation_bytes = 0
+    if clips_dirpath is not None:
+        # The clips take the animations; `dst` keeps the rig and meshes
+        result.clips = split_gltf_clips(glb, clips_dirpath)
+        animation_bytes = glb.referenced_bytes()
+        remove_animations(glb)
+        animation_bytes -= glb.referenced_bytes()
+
+    output_bytes = glb.save(dst)
+    if result.quantization is not None:
+        # Savings of the quantization alone, after the other passes
+        original_bytes = glb.original_bytes
+        if result.textures is not None:
+            original_bytes -= result.textures.original_bytes
+            original_bytes += result.textures.output_bytes
+        if result.keyframes is not None:
+            original_bytes -= result.keyframes.saved_bytes
+        if result.sparse_morphs is not None:
+            original_bytes -= result.sparse_morphs.saved_bytes
+        original_bytes -= animation_bytes
+        result.quantization.original_bytes = original_bytes
+        result.quantization.output_bytes = output_bytes
+        if result.dedup is not None:
+            result.quantization.output_bytes += result.dedup.saved_bytes
+
+
+def format_glb(
+    target_resource_type: str,
+    src: str,
+    dst: str,
+    strict_mode: bool = True,
+    cleanup_dirpath: Optional[str] = None,
+    postprocess: Optional[PostprocessOptions] = None,
+    clips_dirpath: Optional[str] = None,
+) -> FormatResult:
+    # Runs `GltfFormatter.format_and_save` and the `postprocess` passes in a scratch
+    # directory, then writes `dst` once and replaces it at once.
+    # `cleanup_dirpath` (the scratch directory of `src`) is removed afterwards.
+    # With `clips_dirpath`, the animations are written there as clip files
+    # (`split_gltf_clips`) instead of into `dst`.
+    # pylint: disable=import-outside-toplevel
+    from gltf_formatter import GltfFormatter
+    from gltf_formatter.exception import RuleApplyError
+    from gltf_formatter.model import TargetResourceType
+
+    started = time.perf_counter()
+    logger = _CollectingLogger()
+    result = FormatResult(output_filepath=dst, logs=logger.lines)
+    try:
+        formatter = GltfFormatter(
+            TargetResourceType[target_resource_type],
+            strict_mode=strict_mode,
+            logger=logger,
+        )
+        # The formatted file is about the size of `src`
+        with scratch_dir("gam_format_", os.path.getsize(src)) as dirpath:
+            formatted_filepath = os.path.join(dirpath, os.path.basename(dst))
+            formatter.format_and_save(src, formatted_filepath)
+            with atomic_output(dst) as part_filepath:
+                if clips_dirpath is not None or (
+                    postprocess is not None and postprocess.enabled
+                ):
+                    _postprocess(
+                        formatted_filepath,
+                        part_filepath,
+                        postprocess or PostprocessOptions(),
+                        result,
+                        clips_dirpath,
+                    )
+                else:
+                    shutil.copyfile(formatted_filepath, part_filepath)
+    except RuleApplyError as e:
+        logger.log(e)
+        result.error = f"{type(e).__name__}: {e}"
+    except Exception as e:  # pylint: disable=broad-except
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if cleanup_dirpath:
+            shutil.rmtree(cleanup_dirpath, ignore_errors=True)
+        result.elapsed = time.perf_counter() - started
+
+    return result
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _formatter_pool() -> ProcessPoolExecutor:
+    global _pool  # pylint: disable=global-statement
+
+    with _pool_lock:
+        if _pool is None:
+            workers = int(
+                os.environ.get(FORMATTER_WORKERS_ENV)
+                or max(1, min(2, (os.cpu_count() or 2) - 1))
+            )
+            # `spawn` so that workers never inherit blender's state.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _submit(
+    fn, *args, cleanup_dirpath: Optional[str], **kwargs
+) -> "Future[FormatResult]":
+    future = _formatter_pool().submit(
+        fn, *args, cleanup_dirpath=cleanup_dirpath, **kwargs
+    )
+    if cleanup_dirpath:
+        # In case the worker never got to run the job (cancelled, broken pool)
+        future.add_done_callback(
+            lambda _: shutil.rmtree(cleanup_dirpath, ignore_errors=True)
+        )
+    return future
+
+
+def submit_format(
+    target_resource_type: str,
+    src: str,
+    dst: str,
+    strict_mode: bool = True,
+    cleanup_dirpath: Optional[str] = None,
+    postprocess: Optional[PostprocessOptions] = None,
+    clips_dirpath: Optional[str] = None,
+) -> "Future[FormatResult]":
+    return _submit(
+        format_glb,
+        target_resource_type,
+        src,
+        dst,
+        strict_mode,
+        postprocess=postprocess,
+        clips_dirpath=clips_dirpath,
+        cleanup_dirpath=cleanup_dirpath,
+    )
+
+
+def shutdown_formatter_pool():
+    global _pool  # pylint: disable=global-statement
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
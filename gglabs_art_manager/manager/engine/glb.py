@@ -0,0 +1,332 @@
+import bisect
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# A loaded GLB whose binary chunk can be edited by the post-processing passes
+# (quantization, texture encoding, keyframe reduction). New data is appended as new
+# buffer views; released accessors and the views nobody refers to anymore are dropped
+# on `save`.
+# The loaded binary chunk is never copied: views are read through a `memoryview` of
+# it, appended views are kept as separate chunks addressed after its end, and `save`
+# writes the views in use straight to the file.
+
+ARRAY_BUFFER = 34962
+FLOAT = 5126
+
+COMPONENT_COUNTS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+COMPONENT_DTYPES = {
+    5120: "<i1",
+    5121: "<u1",
+    5122: "<i2",
+    5123: "<u2",
+    5125: "<u4",
+    FLOAT: "<f4",
+}
+
+# Extensions referring to buffer views the passes don't know about
+_OPAQUE_EXTENSIONS = ("KHR_draco_mesh_compression", "EXT_meshopt_compression")
+# Extensions referring to accessors; accessors are never dropped when used
+_ACCESSOR_EXTENSIONS = ("EXT_mesh_gpu_instancing",)
+
+__all__ = [
+    "ARRAY_BUFFER",
+    "COMPONENT_COUNTS",
+    "COMPONENT_DTYPES",
+    "FLOAT",
+    "GlbFile",
+]
+
+
+_GLB_MAGIC = b"glTF"
+_GLB_VERSION = 2
+_CHUNK_JSON = b"JSON"
+_CHUNK_BIN = b"BIN\0"
+
+
+def _align(offset: int) -> int:
+    return (offset + 3) // 4 * 4
+
+
+def _keys(attributes) -> Iterator[str]:
+    # Attribute names, including the custom (`_NAME`) ones
+    names = attributes if isinstance(attributes, dict) else vars(attributes)
+    return (name for name in names if not name.startswith("__"))
+
+
+class GlbFile:
+    def __init__(self, gltf, filepath: Optional[str] = None):
+        self.gltf = gltf
+        self.original_bytes = os.path.getsize(filepath) if filepath else 0
+        self.modified = False
+        self._released_accessors: Set[int] = set()
+        self._blob = memoryview(gltf.binary_blob() or b"")
+        # Appended views: offsets (after the loaded blob) and data
+        self._chunk_offsets: List[int] = []
+        self._chunks: List[bytes] = []
+        self._end = len(self._blob)
+
+    @staticmethod
+    def get_ref(holder, key: str) -> Optional[int]:
+        # Morph targets and extensions may be loaded as plain dicts
+        if isinstance(holder, dict):
+            return holder.get(key)
+        return getattr(holder, key, None)
+
+    @staticmethod
+    def set_ref(holder, key: str, value: int):
+        if isinstance(holder, dict):
+            holder[key] = value
+        else:
+            setattr(holder, key, value)
+
+    @property
+    def byte_length(self) -> int:
+        # Of the binary chunk the views are addressed in
+        return _align(self._end)
+
+    @classmethod
+    def load(cls, filepath: str) -> "GlbFile":
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import GLTF2
+
+        return cls(GLTF2().load_binary(filepath), filepath)
+
+    def skip_reason(self) -> Optional[str]:
+        gltf = self.gltf
+        if len(gltf.buffers) != 1 or gltf.buffers[0].uri:
+            return "not a single-buffer GLB"
+        for extension in gltf.extensionsUsed or []:
+            if extension in _OPAQUE_EXTENSIONS:
+                return f"already compressed ({extension})"
+        return None
+
+    def view_bytes(self, view_idx: int) -> bytes:
+        return bytes(self.view_memory(view_idx))
+
+    def view_memory(self, view_idx: int) -> memoryview:
+        # Without a copy
+        view = self.gltf.bufferViews[view_idx]
+        offset = view.byteOffset or 0
+        if offset < len(self._blob):
+            return self._blob[offset : offset + view.byteLength]
+        idx = bisect.bisect_right(self._chunk_offsets, offset) - 1
+        start = offset - self._chunk_offsets[idx]
+        return memoryview(self._chunks[idx])[start : start + view.byteLength]
+
+    def read(self, view_idx: int, byte_offset: int, count: int, accessor):
+        # `count` values of the type of `accessor` stored in a view (e.g. the sparse
+        # values of the accessor), as a (count, components) float64 array
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        view = self.gltf.bufferViews[view_idx]
+        dtype = np.dtype(COMPONENT_DTYPES[accessor.componentType])
+        components = COMPONENT_COUNTS[accessor.type]
+        data = np.ndarray(
+            (count, components),
+            dtype=dtype,
+            buffer=self.view_memory(view_idx),
+            offset=byte_offset,
+            strides=(view.byteStride or dtype.itemsize * components, dtype.itemsize),
+        )
+        return data.astype(np.float64)
+
+    def read_accessor(self, accessor_idx: int):
+        # Stored values of a dense accessor
+        accessor = self.gltf.accessors[accessor_idx]
+        return self.read(
+            accessor.bufferView, accessor.byteOffset or 0, accessor.count, accessor
+        )
+
+    def append_view(
+        self,
+        data: bytes,
+        byte_stride: Optional[int] = None,
+        target: Optional[int] = None,
+    ) -> int:
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import BufferView
+
+        offset = _align(self._end)
+        self.gltf.bufferViews.append(
+            BufferView(
+                buffer=0,
+                byteOffset=offset,
+                byteLength=len(data),
+                byteStride=byte_stride,
+                target=target,
+            )
+        )
+        self._chunk_offsets.append(offset)
+        self._chunks.append(data)
+        self._end = offset + len(data)
+        self.modified = True
+        return len(self.gltf.bufferViews) - 1
+
+    def use_extension(self, name: str, required: bool = False):
+        gltf = self.gltf
+        names = ["extensionsUsed", "extensionsRequired"] if required else []
+        for attr in names or ["extensionsUsed"]:
+            extensions = getattr(gltf, attr) or []
+            if name not in extensions:
+                setattr(gltf, attr, extensions + [name])
+
+    def release_accessor(self, accessor_idx: int):
+        # The caller doesn't refer to the accessor anymore; it is dropped on `save`
+        # unless something else does.
+        self._released_accessors.add(accessor_idx)
+        self.modified = True
+
+    def _accessor_refs(self) -> Iterator[Tuple[object, str]]:
+        # (holder, key) of the accessor references of the core spec
+        gltf = self.gltf
+        for mesh in gltf.meshes:
+            for primitive in mesh.primitives:
+                attributes = primitive.attributes
+                for key in list(_keys(attributes)):
+                    yield attributes, key
+                yield primitive, "indices"
+                for target in primitive.targets or []:
+                    for key in list(_keys(target)):
+                        yield target, key
+        for skin in gltf.skins:
+            yield skin, "inverseBindMatrices"
+        for animation in gltf.animations:
+            for sampler in animation.samplers:
+                yield sampler, "input"
+                yield sampler, "output"
+
+    def _view_refs(self) -> Iterator[Tuple[object, str]]:
+        # (holder, key) of the buffer view references
+        gltf = self.gltf
+        for accessor in gltf.accessors:
+            yield accessor, "bufferView"
+            if accessor.sparse is not None:
+                yield accessor.sparse.indices, "bufferView"
+                yield accessor.sparse.values, "bufferView"
+        for image in gltf.images:
+            yield image, "bufferView"
+
+    def used_views(self) -> Set[int]:
+        return {
+            self.get_ref(holder, key)
+            for holder, key in self._view_refs()
+            if self.get_ref(holder, key) is not None
+        }
+
+    def referenced_bytes(self) -> int:
+        # Size of the buffer views in use, about the binary chunk `save` writes
+        gltf = self.gltf
+        views = set()
+        for accessor_idx in {self.get_ref(h, k) for h, k in self._accessor_refs()}:
+            if accessor_idx is None:
+                continue
+            accessor = gltf.accessors[accessor_idx]
+            views.add(accessor.bufferView)
+            if accessor.sparse is not None:
+                views.add(accessor.sparse.indices.bufferView)
+                views.add(accessor.sparse.values.bufferView)
+        views.update(image.bufferView for image in gltf.images)
+        views.discard(None)
+        return sum(gltf.bufferViews[idx].byteLength for idx in views)
+
+    def replace_views(self, replacements: Dict[int, int]):
+        # Points the references of the keys to the values instead.
+        for holder, key in self._view_refs():
+            if self.get_ref(holder, key) in replacements:
+                self.set_ref(holder, key, replacements[self.get_ref(holder, key)])
+        self.modified = True
+
+    def replace_accessors(self, replacements: Dict[int, int]):
+        # Points the references of the keys to the values instead, and releases them.
+        for holder, key in self._accessor_refs():
+            if self.get_ref(holder, key) in replacements:
+                self.set_ref(holder, key, replacements[self.get_ref(holder, key)])
+        for accessor_idx in replacements:
+            self.release_accessor(accessor_idx)
+
+    def _compact_accessors(self):
+        gltf = self.gltf
+        released, self._released_accessors = self._released_accessors, set()
+        if not released or any(
+            extension in _ACCESSOR_EXTENSIONS for extension in gltf.extensionsUsed or []
+        ):
+            return
+        refs = [
+            (h, k) for h, k in self._accessor_refs() if self.get_ref(h, k) is not None
+        ]
+        unused = released - {self.get_ref(h, k) for h, k in refs}
+        if not unused:
+            return
+
+        remap: Dict[int, int] = {}
+        accessors = []
+        for idx, accessor in enumerate(gltf.accessors):
+            if idx not in unused:
+                remap[idx] = len(accessors)
+                accessors.append(accessor)
+        gltf.accessors = accessors
+        for holder, key in refs:
+            self.set_ref(holder, key, remap[self.get_ref(holder, key)])
+
+    def _compact(self):
+        # Drops the released accessors and the buffer views that no longer have any
+        # reference.
+        self._compact_accessors()
+        gltf = self.gltf
+        used = self.used_views()
+
+        remap: Dict[int, int] = {}
+        views = []
+        for idx, view in enumerate(gltf.bufferViews):
+            if idx in used:
+                remap[idx] = len(views)
+                views.append(view)
+        gltf.bufferViews = views
+        for holder, key in self._view_refs():
+            if self.get_ref(holder, key) is not None:
+                self.set_ref(holder, key, remap[self.get_ref(holder, key)])
+
+    def save(self, filepath: str) -> int:
+        # Writes the views one after another as the binary chunk. The views keep
+        # their addresses in memory, so the file stays usable after saving.
+        # Returns the size of the written file.
+        if self.modified:
+            self._compact()
+            self.modified = False
+
+        gltf = self.gltf
+        offsets = []
+        length = 0
+        for view in gltf.bufferViews:
+            offsets.append(_align(length))
+            length = offsets[-1] + view.byteLength
+        length = _align(length)
+
+        addresses = [view.byteOffset for view in gltf.bufferViews]
+        buffer_length = gltf.buffers[0].byteLength
+        try:
+            for view, offset in zip(gltf.bufferViews, offsets):
+                view.byteOffset = offset
+            gltf.buffers[0].byteLength = length
+            json_blob = gltf.gltf_to_json(separators=(",", ":"), indent=None)
+        finally:
+            for view, address in zip(gltf.bufferViews, addresses):
+                view.byteOffset = address
+            gltf.buffers[0].byteLength = buffer_length
+        json_blob = json_blob.encode("utf-8")
+        json_blob += b" " * (-len(json_blob) % 4)
+
+        total = 12 + 8 + len(json_blob) + 8 + length
+        with open(filepath, "wb") as f:
+            f.write(_GLB_MAGIC + struct.pack("<II", _GLB_VERSION, total))
+            f.write(struct.pack("<I", len(json_blob)) + _CHUNK_JSON + json_blob)
+            f.write(struct.pack("<I", length) + _CHUNK_BIN)
+            written = 0
+            for view_idx, offset in enumerate(offsets):
+                f.write(b"\0" * (offset - written))
+                f.write(self.view_memory(view_idx))
+                written = offset + gltf.bufferViews[view_idx].byteLength
+            f.write(b"\0" * (length - written))
+        return total
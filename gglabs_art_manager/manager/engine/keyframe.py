@@ -0,0 +1,356 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+
+from gglabs_art_manager.manager.engine.glb import (
+    COMPONENT_COUNTS,
+    COMPONENT_DTYPES,
+    FLOAT,
+    GlbFile,
+)
+
+# Keyframe reduction post-pass for formatted GLBs.
+# ANIMATING scenes are exported with `export_force_sampling`, i.e. a key per frame for
+# every bone and morph weight. Per channel:
+#   - constant channels matching the rest pose of their node are removed, other
+#     constant channels keep their first and last keys,
+#   - LINEAR curves are simplified with Ramer-Douglas-Peucker (slerp for rotations),
+#     always measured against the original samples, so the tolerance holds for every
+#     exported frame,
+#   - STEP curves keep the keys where the value changes.
+# CUBICSPLINE samplers are left as they are.
+
+_TYPES = {1: "SCALAR", 3: "VEC3", 4: "VEC4"}
+_REST_VALUES = {
+    "translation": [0.0, 0.0, 0.0],
+    "rotation": [0.0, 0.0, 0.0, 1.0],
+    "scale": [1.0, 1.0, 1.0],
+}
+
+__all__ = [
+    "KeyframeReductionOptions",
+    "KeyframeReductionReport",
+    "reduce_gltf_keyframes",
+    "reduce_glb_keyframes",
+]
+
+
+@dataclass(frozen=True)
+class KeyframeReductionOptions:
+    # Maximum error of a reduced curve, per channel path
+    translation_tolerance: float = 1e-4  # meters
+    rotation_tolerance: float = 1e-3  # radians
+    scale_tolerance: float = 1e-4
+    weight_tolerance: float = 1e-3
+    # Remove the constant channels matching the rest pose of their node
+    remove_rest_channels: bool = True
+
+    def tolerance(self, path: str) -> float:
+        return {
+            "translation": self.translation_tolerance,
+            "rotation": self.rotation_tolerance,
+            "scale": self.scale_tolerance,
+            "weights": self.weight_tolerance,
+        }[path]
+
+
+@dataclass
+class KeyframeReductionReport:
+    channels: int = 0
+    removed_channels: int = 0
+    original_keys: int = 0
+    output_keys: int = 0
+    # Of the animation sampler accessors
+    original_bytes: int = 0
+    output_bytes: int = 0
+    skipped: Dict[str, str] = field(default_factory=dict)  # animation/path -> reason
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.output_bytes
+
+    def summary(self) -> str:
+        ratio = self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+        return (
+            f"{self.original_keys} -> {self.output_keys} keys,"
+            f" {self.removed_channels}/{self.channels} channels removed,"
+            f" {self.original_bytes / 1024:.1f}KB -> {self.output_bytes / 1024:.1f}KB"
+            f" (-{ratio * 100:.1f}%)"
+        )
+
+
+class _Reducer:
+    def __init__(self, glb: GlbFile, options: KeyframeReductionOptions):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        self.np = np
+        self.glb = glb
+        self.gltf = glb.gltf
+        self.options = options
+        self.report = KeyframeReductionReport()
+        self._inputs: Dict[bytes, int] = {}  # reduced key times -> accessor
+
+    def _measure(self) -> Tuple[int, int]:
+        # (keys, bytes) of all the animation channels
+        keys, accessors = 0, set()
+        for animation in self.gltf.animations:
+            for channel in animation.channels:
+                sampler = animation.samplers[channel.sampler]
+                keys += self.gltf.accessors[sampler.input].count
+            for sampler in animation.samplers:
+                accessors.update((sampler.input, sampler.output))
+        size = 0
+        for accessor_idx in accessors:
+            accessor = self.gltf.accessors[accessor_idx]
+            itemsize = self.np.dtype(COMPONENT_DTYPES[accessor.componentType]).itemsize
+            size += accessor.count * COMPONENT_COUNTS[accessor.type] * itemsize
+        return keys, size
+
+    def _rest_value(self, node_idx: Optional[int], path: str):
+        np = self.np
+        if node_idx is None:
+            return None
+        node = self.gltf.nodes[node_idx]
+        if path == "weights":
+            if node.mesh is None:
+                return None
+            mesh = self.gltf.meshes[node.mesh]
+            targets = max((len(p.targets or []) for p in mesh.primitives), default=0)
+            return np.array(
+                getattr(node, "weights", None) or mesh.weights or [0.0] * targets
+            )
+        if node.matrix is not None:
+            return None
+        return np.array(getattr(node, path) or _REST_VALUES[path])
+
+    def _error(self, path: str, values, expected):
+        # Per key: angle for rotations, largest component difference otherwise
+        np = self.np
+        if path == "rotation":
+            # atan2 rather than arccos, which is too coarse around 1 for float32 keys
+            values = values / np.linalg.norm(values, axis=-1, keepdims=True)
+            expected = expected / np.linalg.norm(expected, axis=-1, keepdims=True)
+            sign = np.where(np.sum(values * expected, axis=-1) < 0.0, -1.0, 1.0)
+            expected = expected * np.expand_dims(sign, -1)
+            return 4.0 * np.arctan2(
+                np.linalg.norm(values - expected, axis=-1),
+                np.linalg.norm(values + expected, axis=-1),
+            )
+        return np.abs(values - expected).max(axis=-1)
+
+    def _interpolate(self, path: str, times, values, a: int, b: int):
+        # Values of keys a+1..b-1 interpolated between keys a and b
+        np = self.np
+        t = ((times[a + 1 : b] - times[a]) / (times[b] - times[a]))[:, None]
+        start, end = values[a], values[b]
+        if path != "rotation":
+            return start + (end - start) * t
+
+        dot = float(np.dot(start, end))
+        if dot < 0.0:  # shortest path
+            end, dot = -end, -dot
+        if dot > 0.9995:
+            result = start + (end - start) * t
+            return result / np.linalg.norm(result, axis=1, keepdims=True)
+        theta = np.arccos(dot)
+        weights = np.sin((1.0 - t) * theta), np.sin(t * theta)
+        return (weights[0] * start + weights[1] * end) / np.sin(theta)
+
+    def _simplify_linear(self, path: str, times, values, tolerance: float):
+        np = self.np
+        keep = np.zeros(len(times), dtype=bool)
+        keep[[0, -1]] = True
+        segments = [(0, len(times) - 1)]
+        while segments:
+            a, b = segments.pop()
+            if b - a < 2:
+                continue
+            error = self._error(
+                path, values[a + 1 : b], self._interpolate(path, times, values, a, b)
+            )
+            worst = int(error.argmax())
+            if error[worst] > tolerance:
+                split = a + 1 + worst
+                keep[split] = True
+                segments.extend(((a, split), (split, b)))
+        return np.flatnonzero(keep)
+
+    def _simplify_step(self, path: str, values, tolerance: float):
+        # Keys changing the held value by more than the tolerance, compared with the
+        # last kept key so that small steps can't add up.
+        np = self.np
+        indices = [0]
+        while True:
+            last = indices[-1]
+            changed = self._error(path, values[last + 1 : -1], values[last]) > tolerance
+            if not changed.any():
+                break
+            indices.append(last + 1 + int(changed.argmax()))
+        indices.append(len(values) - 1)
+        return np.array(indices)
+
+    def _append_accessor(self, data, with_bounds: bool) -> int:
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import Accessor
+
+        np = self.np
+        data = np.ascontiguousarray(data, dtype="<f4")
+        accessor = Accessor(
+            bufferView=self.glb.append_view(data.tobytes()),
+            byteOffset=0,
+            componentType=FLOAT,
+            count=len(data),
+            type=_TYPES[data.shape[1]],
+        )
+        if with_bounds:
+            accessor.min = [float(v) for v in data.min(axis=0)]
+            accessor.max = [float(v) for v in data.max(axis=0)]
+        self.gltf.accessors.append(accessor)
+        return len(self.gltf.accessors) - 1
+
+    def _write(self, sampler, times, values):
+        glb = self.glb
+        glb.release_accessor(sampler.input)
+        glb.release_accessor(sampler.output)
+
+        key = times.astype("<f4").tobytes()
+        if key not in self._inputs:
+            self._inputs[key] = self._append_accessor(times[:, None], True)
+        sampler.input = self._inputs[key]
+        # Back to the stored layout; morph weights are SCALARs
+        components = COMPONENT_COUNTS[self.gltf.accessors[sampler.output].type]
+        sampler.output = self._append_accessor(values.reshape(-1, components), False)
+
+    def _read(self, sampler, name: str):
+        # Returns (times, values) of a sampler, or None if it can't be reduced.
+        gltf = self.gltf
+        accessors = [gltf.accessors[sampler.input], gltf.accessors[sampler.output]]
+        interpolation = sampler.interpolation or "LINEAR"
+        if interpolation not in ("LINEAR", "STEP"):
+            self.report.skipped[name] = interpolation
+            return None
+        if any(
+            a.componentType != FLOAT or a.sparse is not None or a.bufferView is None
+            for a in accessors
+        ):
+            self.report.skipped[name] = "quantized or sparse accessors"
+            return None
+
+        times = self.glb.read_accessor(sampler.input)[:, 0]
+        values = self.glb.read_accessor(sampler.output)
+        if len(times) < 2 or len(values) % len(times):
+            return None
+        # Morph weights are stored target by target for each key
+        return times, values.reshape(len(times), -1)
+
+    def reduce_sampler(self, sampler, path: str, rest, name: str) -> bool:
+        # Returns False if the channel of the sampler can be removed.
+        np = self.np
+        data = self._read(sampler, name)
+        if data is None:
+            return True
+        times, values = data
+        tolerance = self.options.tolerance(path)
+
+        if self._error(path, values, values[0]).max() <= tolerance:
+            if (
+                rest is not None
+                and rest.shape == values[0].shape
+                and self._error(path, values, rest).max() <= tolerance
+            ):
+                return False
+            indices = np.array([0, len(times) - 1])
+            values = np.repeat(values[:1], 2, axis=0)
+        else:
+            if (sampler.interpolation or "LINEAR") == "STEP":
+                indices = self._simplify_step(path, values, tolerance)
+            else:
+                indices = self._simplify_linear(path, times, values, tolerance)
+            values = values[indices]
+
+        if len(indices) < len(times):
+            self._write(sampler, times[indices], values)
+        return True
+
+    def reduce_animation(self, animation_idx: int, animation):
+        users: Dict[int, int] = {}
+        for channel in animation.channels:
+            users[channel.sampler] = users.get(channel.sampler, 0) + 1
+
+        name = animation.name or str(animation_idx)
+        kept, removed = [], []
+        done: Set[int] = set()
+        for channel in animation.channels:
+            self.report.channels += 1
+            path = channel.target.path
+            if path not in ("translation", "rotation", "scale", "weights"):
+                kept.append(channel)
+                continue
+            if channel.sampler in done:
+                kept.append(channel)
+                continue
+            done.add(channel.sampler)
+
+            # Shared samplers are never removed
+            rest = None
+            if self.options.remove_rest_channels and users[channel.sampler] == 1:
+                rest = self._rest_value(channel.target.node, path)
+            sampler = animation.samplers[channel.sampler]
+            if self.reduce_sampler(sampler, path, rest, f"{name}/{path}"):
+                kept.append(channel)
+            else:
+                removed.append(channel)
+
+        if not kept and removed:
+            # An animation needs a channel; the first one stays as a constant.
+            channel = removed.pop(0)
+            self.reduce_sampler(
+                animation.samplers[channel.sampler],
+                channel.target.path,
+                None,
+                f"{name}/{channel.target.path}",
+            )
+            kept.append(channel)
+        self.report.removed_channels += len(removed)
+
+        for channel in removed:
+            sampler = animation.samplers[channel.sampler]
+            self.glb.release_accessor(sampler.input)
+            self.glb.release_accessor(sampler.output)
+        used = sorted({channel.sampler for channel in kept})
+        remap = {old: new for new, old in enumerate(used)}
+        animation.samplers = [animation.samplers[idx] for idx in used]
+        animation.channels = kept
+        for channel in kept:
+            channel.sampler = remap[channel.sampler]
+
+    def run(self):
+        self.report.original_keys, self.report.original_bytes = self._measure()
+        for animation_idx, animation in enumerate(self.gltf.animations):
+            self.reduce_animation(animation_idx, animation)
+        self.report.output_keys, self.report.output_bytes = self._measure()
+
+
+def reduce_gltf_keyframes(
+    glb: GlbFile, options: KeyframeReductionOptions
+) -> KeyframeReductionReport:
+    # Reduces the animation keys of `glb` in place.
+    reason = glb.skip_reason()
+    if reason is not None:
+        report = KeyframeReductionReport()
+        report.skipped["*"] = reason
+        return report
+
+    reducer = _Reducer(glb, options)
+    reducer.run()
+    return reducer.report
+
+
+def reduce_glb_keyframes(
+    src: str, dst: str, options: KeyframeReductionOptions
+) -> KeyframeReductionReport:
+    # `src` and `dst` may be the same file.
+    glb = GlbFile.load(src)
+    report = reduce_gltf_keyframes(glb, options)
+    glb.save(dst)
+    return report
@@ -0,0 +1,237 @@
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from gglabs_art_manager.manager.engine.glb import ARRAY_BUFFER, FLOAT, GlbFile
+
+# KHR_mesh_quantization post-pass for formatted GLBs.
+# Float vertex attributes are stored as normalized 8/16-bit integers where the spec
+# allows it without touching node or skin transforms: normals, tangents, texcoords
+# in [0, 1] and morph target deltas in [-1, 1] (meters). Base positions stay float,
+# since skinned meshes ignore the node transform a dequantization would need.
+
+KHR_MESH_QUANTIZATION = "KHR_mesh_quantization"
+
+# componentType
+_BYTE = 5120
+_UNSIGNED_BYTE = 5121
+_SHORT = 5122
+_UNSIGNED_SHORT = 5123
+
+__all__ = [
+    "KHR_MESH_QUANTIZATION",
+    "QuantizationOptions",
+    "QuantizationReport",
+    "quantize_gltf",
+    "quantize_glb",
+]
+
+
+@dataclass(frozen=True)
+class QuantizationOptions:
+    # Bits per attribute: 8, 16, or 0 to keep float32
+    normal_bits: int = 8
+    tangent_bits: int = 8
+    texcoord_bits: int = 16
+    morph_position_bits: int = 16
+    morph_normal_bits: int = 8
+    morph_tangent_bits: int = 8
+    # Morph position accessors above this error (meters) stay float
+    max_position_error: float = 1e-4
+
+
+@dataclass
+class QuantizationReport:
+    original_bytes: int = 0
+    output_bytes: int = 0
+    max_position_error: float = 0.0  # meters, of morph target positions
+    quantized: Dict[str, int] = field(default_factory=dict)  # attribute -> accessors
+    skipped: Dict[str, str] = field(default_factory=dict)  # attribute -> reason
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.output_bytes
+
+    def summary(self) -> str:
+        ratio = self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+        return (
+            f"{self.original_bytes / 1024:.1f}KB -> {self.output_bytes / 1024:.1f}KB"
+            f" (-{ratio * 100:.1f}%), max position error"
+            f" {self.max_position_error * 1000:.4f}mm"
+        )
+
+
+def _signed_dtype(bits: int) -> Tuple[int, str]:
+    return (_BYTE, "<i1") if bits == 8 else (_SHORT, "<i2")
+
+
+def _unsigned_dtype(bits: int) -> Tuple[int, str]:
+    return (_UNSIGNED_BYTE, "<u1") if bits == 8 else (_UNSIGNED_SHORT, "<u2")
+
+
+class _Quantizer:
+    def __init__(self, glb: GlbFile, options: QuantizationOptions):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        self.np = np
+        self.glb = glb
+        self.gltf = glb.gltf
+        self.options = options
+        self.report = QuantizationReport()
+        self._visited = set()  # accessors may be shared between primitives
+
+    def _append_view(self, data, is_attribute: bool) -> int:
+        # Vertex attribute elements must be 4-byte aligned; rows are padded.
+        np = self.np
+        row_bytes = data.shape[1] * data.dtype.itemsize
+        stride = (row_bytes + 3) // 4 * 4 if is_attribute else row_bytes
+        rows = np.zeros((data.shape[0], stride), dtype=np.uint8)
+        rows[:, :row_bytes] = np.ascontiguousarray(data).view(np.uint8)
+        return self.glb.append_view(
+            rows.tobytes(),
+            byte_stride=stride if is_attribute else None,
+            target=ARRAY_BUFFER if is_attribute else None,
+        )
+
+    def quantize(self, accessor_idx: int, attribute: str, bits: int, signed: bool):
+        # Returns the max absolute error, or None if the accessor is kept as is.
+        if not bits or accessor_idx in self._visited:
+            return None
+        self._visited.add(accessor_idx)
+
+        np = self.np
+        accessor = self.gltf.accessors[accessor_idx]
+        if accessor.componentType != FLOAT:
+            return None
+
+        parts = []  # (values, "base" | "sparse")
+        if accessor.bufferView is not None:
+            parts.append(
+                (
+                    self.glb.read(
+                        accessor.bufferView,
+                        accessor.byteOffset or 0,
+                        accessor.count,
+                        accessor,
+                    ),
+                    "base",
+                )
+            )
+        if accessor.sparse is not None:
+            values = accessor.sparse.values
+            parts.append(
+                (
+                    self.glb.read(
+                        values.bufferView,
+                        values.byteOffset or 0,
+                        accessor.sparse.count,
+                        accessor,
+                    ),
+                    "sparse",
+                )
+            )
+        if not parts:
+            return None
+
+        low = -1.0 if signed else 0.0
+        if any(v.size and (v.min() < low or v.max() > 1.0) for v, _ in parts):
+            self.report.skipped[attribute] = "out of the normalized range"
+            return None
+
+        component_type, dtype = (_signed_dtype if signed else _unsigned_dtype)(bits)
+        scale = float((1 << (bits - 1)) - 1 if signed else (1 << bits) - 1)
+        quantized = [(np.round(v * scale).astype(dtype), v, kind) for v, kind in parts]
+        error = max(
+            (float(np.abs(q / scale - v).max()) for q, v, _ in quantized if v.size),
+            default=0.0,
+        )
+        if attribute == "MORPH_POSITION":
+            # Positional error of a vertex, not of a component
+            error = max(
+                (
+                    float(np.linalg.norm(q / scale - v, axis=1).max())
+                    for q, v, _ in quantized
+                    if v.size
+                ),
+                default=0.0,
+            )
+            if error > self.options.max_position_error:
+                self.report.skipped[attribute] = f"error {error:.6f}m"
+                return None
+
+        for q, _, kind in quantized:
+            if kind == "base":
+                accessor.bufferView = self._append_view(q, is_attribute=True)
+                accessor.byteOffset = 0
+            else:
+                accessor.sparse.values.bufferView = self._append_view(
+                    q, is_attribute=False
+                )
+                accessor.sparse.values.byteOffset = 0
+
+        accessor.componentType = component_type
+        accessor.normalized = True
+        # min/max are in the stored (integer) values
+        if accessor.min:
+            accessor.min = [int(round(v * scale)) for v in accessor.min]
+        if accessor.max:
+            accessor.max = [int(round(v * scale)) for v in accessor.max]
+
+        self.report.quantized[attribute] = self.report.quantized.get(attribute, 0) + 1
+        return error
+
+    def run(self):
+        options = self.options
+        for mesh in self.gltf.meshes:
+            for primitive in mesh.primitives:
+                attributes = primitive.attributes
+                for name, bits, signed in [
+                    ("NORMAL", options.normal_bits, True),
+                    ("TANGENT", options.tangent_bits, True),
+                    ("TEXCOORD_0", options.texcoord_bits, False),
+                    ("TEXCOORD_1", options.texcoord_bits, False),
+                ]:
+                    accessor_idx = GlbFile.get_ref(attributes, name)
+                    if accessor_idx is not None:
+                        self.quantize(accessor_idx, name, bits, signed)
+
+                for target in primitive.targets or []:
+                    for name, bits in [
+                        ("POSITION", options.morph_position_bits),
+                        ("NORMAL", options.morph_normal_bits),
+                        ("TANGENT", options.morph_tangent_bits),
+                    ]:
+                        accessor_idx = GlbFile.get_ref(target, name)
+                        if accessor_idx is None:
+                            continue
+                        error = self.quantize(accessor_idx, f"MORPH_{name}", bits, True)
+                        if name == "POSITION" and error is not None:
+                            self.report.max_position_error = max(
+                                self.report.max_position_error, error
+                            )
+
+
+def quantize_gltf(glb: GlbFile, options: QuantizationOptions) -> QuantizationReport:
+    # Quantizes `glb` in place; sizes are filled in by the caller after saving.
+    reason = glb.skip_reason()
+    if reason is not None:
+        report = QuantizationReport()
+        report.skipped["*"] = reason
+        return report
+
+    quantizer = _Quantizer(glb, options)
+    quantizer.run()
+    if quantizer.report.quantized:
+        glb.use_extension(KHR_MESH_QUANTIZATION, required=True)
+    return quantizer.report
+
+
+def quantize_glb(
+    src: str, dst: str, options: QuantizationOptions
+) -> QuantizationReport:
+    # `src` and `dst` may be the same file.
+    glb = GlbFile.load(src)
+    report = quantize_gltf(glb, options)
+    report.original_bytes = glb.original_bytes
+    report.output_bytes = glb.save(dst)
+    return report
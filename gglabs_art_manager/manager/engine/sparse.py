@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+from gglabs_art_manager.manager.engine.glb import COMPONENT_COUNTS, FLOAT, GlbFile
+
+# Sparse morph target post-pass for formatted GLBs.
+# Facial shapekeys move a small region of the mesh, but Blender writes every target as
+# a dense delta accessor. A target is rewritten as a sparse accessor (zero-initialized,
+# with only the vertices moving more than the tolerance) when that is smaller; a target
+# that doesn't move anything has no data at all.
+# Runs before the quantization, which handles sparse values as well.
+
+_UNSIGNED_BYTE = 5121
+_UNSIGNED_SHORT = 5123
+_UNSIGNED_INT = 5125
+
+__all__ = [
+    "SparseMorphOptions",
+    "SparseMorphReport",
+    "sparsify_gltf_morphs",
+    "sparsify_glb_morphs",
+]
+
+
+@dataclass(frozen=True)
+class SparseMorphOptions:
+    # Deltas whose components all stay within the tolerance are considered zero
+    position_tolerance: float = 1e-5  # meters
+    normal_tolerance: float = 1e-3
+    tangent_tolerance: float = 1e-3
+
+
+@dataclass
+class SparseMorphReport:
+    targets: int = 0
+    sparse_targets: int = 0
+    # Of the morph target accessors
+    original_bytes: int = 0
+    output_bytes: int = 0
+    meshes: Dict[str, int] = field(default_factory=dict)  # mesh -> saved bytes
+    skipped: Dict[str, str] = field(default_factory=dict)  # mesh -> reason
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.output_bytes
+
+    def summary(self) -> str:
+        ratio = self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+        return (
+            f"{self.sparse_targets}/{self.targets} sparse accessors,"
+            f" {self.original_bytes / 1024:.1f}KB -> {self.output_bytes / 1024:.1f}KB"
+            f" (-{ratio * 100:.1f}%)"
+        )
+
+
+def _index_type(max_index: int):
+    if max_index <= 0xFF:
+        return _UNSIGNED_BYTE, "<u1"
+    if max_index <= 0xFFFF:
+        return _UNSIGNED_SHORT, "<u2"
+    return _UNSIGNED_INT, "<u4"
+
+
+class _Sparsifier:
+    def __init__(self, glb: GlbFile, options: SparseMorphOptions):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        self.np = np
+        self.glb = glb
+        self.gltf = glb.gltf
+        self.options = options
+        self.report = SparseMorphReport()
+        self._visited = set()  # accessors may be shared between primitives
+
+    def sparsify(self, accessor_idx: int, tolerance: float, mesh_name: str) -> int:
+        # Returns the bytes saved by the accessor.
+        # pylint: disable=import-outside-toplevel
+        from pygltflib import AccessorSparseIndices, AccessorSparseValues, Sparse
+
+        np = self.np
+        if accessor_idx in self._visited:
+            return 0
+        self._visited.add(accessor_idx)
+
+        accessor = self.gltf.accessors[accessor_idx]
+        if (
+            accessor.componentType != FLOAT
+            or accessor.sparse is not None
+            or accessor.bufferView is None
+        ):
+            self.report.skipped[mesh_name] = "quantized or sparse accessors"
+            return 0
+
+        self.report.targets += 1
+        values = self.glb.read_accessor(accessor_idx).astype("<f4")
+        dense_bytes = values.nbytes
+        indices = np.flatnonzero(np.abs(values).max(axis=1) > tolerance)
+        component_type, dtype = _index_type(accessor.count - 1)
+        index_bytes = len(indices) * np.dtype(dtype).itemsize
+        value_bytes = len(indices) * values.itemsize * COMPONENT_COUNTS[accessor.type]
+        # The values start 4-byte aligned after the indices
+        sparse_bytes = (index_bytes + 3) // 4 * 4 + value_bytes
+        self.report.original_bytes += dense_bytes
+        if sparse_bytes >= dense_bytes:
+            self.report.output_bytes += dense_bytes
+            return 0
+
+        moved = values[indices]
+        accessor.bufferView = None
+        accessor.byteOffset = None
+        accessor.sparse = None
+        if len(indices):
+            accessor.sparse = Sparse(
+                count=len(indices),
+                indices=AccessorSparseIndices(
+                    bufferView=self.glb.append_view(indices.astype(dtype).tobytes()),
+                    byteOffset=0,
+                    componentType=component_type,
+                ),
+                values=AccessorSparseValues(
+                    bufferView=self.glb.append_view(moved.tobytes()), byteOffset=0
+                ),
+            )
+        self.glb.modified = True
+        if accessor.min or accessor.max:
+            # Zeroed deltas and the untouched vertices are part of the range
+            bounds = np.vstack([moved, np.zeros((1, moved.shape[1]), "<f4")])
+            accessor.min = [float(v) for v in bounds.min(axis=0)]
+            accessor.max = [float(v) for v in bounds.max(axis=0)]
+
+        self.report.sparse_targets += 1
+        self.report.output_bytes += sparse_bytes
+        return dense_bytes - sparse_bytes
+
+    def run(self):
+        options = self.options
+        tolerances = {
+            "POSITION": options.position_tolerance,
+            "NORMAL": options.normal_tolerance,
+            "TANGENT": options.tangent_tolerance,
+        }
+        for mesh_idx, mesh in enumerate(self.gltf.meshes):
+            mesh_name = mesh.name or str(mesh_idx)
+            saved = 0
+            for primitive in mesh.primitives:
+                for target in primitive.targets or []:
+                    for name, tolerance in tolerances.items():
+                        accessor_idx = GlbFile.get_ref(target, name)
+                        if accessor_idx is not None:
+                            saved += self.sparsify(accessor_idx, tolerance, mesh_name)
+            if saved:
+                self.report.meshes[mesh_name] = (
+                    self.report.meshes.get(mesh_name, 0) + saved
+                )
+
+
+def sparsify_gltf_morphs(
+    glb: GlbFile, options: SparseMorphOptions
+) -> SparseMorphReport:
+    # Rewrites the morph targets of `glb` in place.
+    reason = glb.skip_reason()
+    if reason is not None:
+        report = SparseMorphReport()
+        report.skipped["*"] = reason
+        return report
+
+    sparsifier = _Sparsifier(glb, options)
+    sparsifier.run()
+    return sparsifier.report
+
+
+def sparsify_glb_morphs(
+    src: str, dst: str, options: SparseMorphOptions
+) -> SparseMorphReport:
+    # `src` and `dst` may be the same file.
+    glb = GlbFile.load(src)
+    report = sparsify_gltf_morphs(glb, options)
+    glb.save(dst)
+    return report
@@ -0,0 +1,497 @@
+import abc
+import hashlib
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from gglabs_art_manager.manager.engine.cache import FileCache, cache_key, cache_root
+from gglabs_art_manager.manager.engine.glb import GlbFile
+
+# Texture pass for formatted GLBs: embedded PNG/JPEG images are downscaled to a
+# maximum resolution and re-encoded with the first available local encoder of the
+# preferred formats (Pillow for WEBP/JPEG/PNG, `cwebp` for WEBP, `toktx` for KTX2).
+# Encoded images are kept in a `FileCache` keyed by the pixels and the settings, so
+# textures shared by many characters are encoded once.
+# WEBP/KTX2 images are added next to a downscaled PNG/JPEG, which stays the `source` of
+# the texture: viewers without the extension fall back to it. They are only used for
+# images that are downscaled and only when both together are smaller than the
+# original. Normal maps are only encoded losslessly.
+
+TEXTURE_WORKERS_ENV = "GAM_TEXTURE_WORKERS"
+TEXTURE_CACHE_MAX_BYTES_ENV = "GAM_TEXTURE_CACHE_MAX_BYTES"
+DEFAULT_TEXTURE_CACHE_MAX_BYTES = 1024**3
+
+# format -> (mimeType, extension name of the texture source)
+FORMATS: Dict[str, Tuple[str, Optional[str]]] = {
+    "PNG": ("image/png", None),
+    "JPEG": ("image/jpeg", None),
+    "WEBP": ("image/webp", "EXT_texture_webp"),
+    "KTX2": ("image/ktx2", "KHR_texture_basisu"),
+}
+
+__all__ = [
+    "TextureOptions",
+    "TextureReport",
+    "texture_cache",
+    "available_formats",
+    "encode_gltf_textures",
+    "encode_glb_textures",
+]
+
+
+@dataclass(frozen=True)
+class TextureOptions:
+    max_size: int = 2048  # of the longer side, in pixels
+    # In order of preference; images are only downscaled if none can be encoded.
+    formats: Tuple[str, ...] = ("WEBP", "JPEG")
+    quality: int = 90
+
+
+@dataclass
+class TextureReport:
+    images: int = 0
+    encoded: int = 0
+    cache_hits: int = 0
+    original_bytes: int = 0  # of the embedded images
+    output_bytes: int = 0
+    formats: Dict[str, int] = field(default_factory=dict)
+    skipped: Dict[str, str] = field(default_factory=dict)  # image -> reason
+
+    def summary(self) -> str:
+        change = self.output_bytes - self.original_bytes
+        ratio = change / self.original_bytes if self.original_bytes else 0.0
+        formats = ", ".join(f"{k} x{v}" for k, v in self.formats.items()) or "-"
+        return (
+            f"{self.encoded}/{self.images} images ({formats}, {self.cache_hits} cached),"
+            f" {self.original_bytes / 1024:.1f}KB -> {self.output_bytes / 1024:.1f}KB"
+            f" ({ratio * 100:+.1f}%)"
+        )
+
+
+@dataclass
+class _ImageInfo:
+    width: int
+    height: int
+    has_alpha: bool
+
+
+def _image_info(data: bytes) -> Optional[_ImageInfo]:
+    # Reads the header of a PNG/JPEG without decoding it.
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        width, height, _, color_type = struct.unpack(">IIBB", data[16:26])
+        return _ImageInfo(width, height, color_type in (4, 6) or b"tRNS" in data)
+
+    if data[:2] == b"\xff\xd8":
+        offset = 2
+        while offset + 9 < len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            (length,) = struct.unpack(">H", data[offset + 2 : offset + 4])
+            # SOF0..SOF15, except DHT/JPG/DAC
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[offset + 5 : offset + 9])
+                return _ImageInfo(width, height, False)
+            offset += 2 + length
+    return None
+
+
+def _target_size(info: _ImageInfo, max_size: int) -> Tuple[int, int]:
+    longer = max(info.width, info.height)
+    if longer <= max_size:
+        return info.width, info.height
+    scale = max_size / longer
+    return max(1, round(info.width * scale)), max(1, round(info.height * scale))
+
+
+def _has_pillow() -> bool:
+    try:
+        import PIL  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+class _Encoder(abc.ABC):
+    name = ""
+    format = ""
+    # Formats that may encode normal maps, which can't take lossy compression
+    lossless_formats: Tuple[str, ...] = ()
+
+    @classmethod
+    @abc.abstractmethod
+    def available(cls) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def encode(
+        self, data: bytes, size: Tuple[int, int], quality: int, lossless: bool
+    ) -> bytes:
+        pass
+
+
+class _PillowEncoder(_Encoder):
+    name = "pillow"
+    lossless_formats = ("PNG", "WEBP")
+
+    def __init__(self, fmt: str):
+        self.format = fmt
+
+    @classmethod
+    def available(cls) -> bool:
+        return _has_pillow()
+
+    def encode(
+        self, data: bytes, size: Tuple[int, int], quality: int, lossless: bool
+    ) -> bytes:
+        # pylint: disable=import-outside-toplevel
+        import io
+
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+            if image.size != size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+            if self.format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+            out = io.BytesIO()
+            if self.format == "PNG":
+                image.save(out, "PNG", optimize=True)
+            elif self.format == "WEBP" and lossless:
+                image.save(out, "WEBP", lossless=True, quality=100)
+            else:
+                image.save(out, self.format, quality=quality)
+            return out.getvalue()
+
+
+class _ToolEncoder(_Encoder):
+    # Command line encoders, fed through temporary files.
+    executable = ""
+    suffix = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which(cls.executable) is not None
+
+    @abc.abstractmethod
+    def command(
+        self, src: str, dst: str, size: Tuple[int, int], quality: int, lossless: bool
+    ) -> List[str]:
+        pass
+
+    def encode(
+        self, data: bytes, size: Tuple[int, int], quality: int, lossless: bool
+    ) -> bytes:
+        with tempfile.TemporaryDirectory(prefix="gam_texture_") as dirpath:
+            src = os.path.join(
+                dirpath, "src.png" if data[:4] == b"\x89PNG" else "src.jpg"
+            )
+            dst = os.path.join(dirpath, f"dst{self.suffix}")
+            with open(src, "wb") as f:
+                f.write(data)
+            subprocess.run(
+                self.command(src, dst, size, quality, lossless),
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+            with open(dst, "rb") as f:
+                return f.read()
+
+
+class _CwebpEncoder(_ToolEncoder):
+    name = "cwebp"
+    format = "WEBP"
+    executable = "cwebp"
+    suffix = ".webp"
+    lossless_formats = ("WEBP",)
+
+    def command(self, src, dst, size, quality, lossless):
+        return [
+            self.executable,
+            "-quiet",
+            *(["-lossless", "-exact"] if lossless else []),
+            "-q",
+            str(100 if lossless else quality),
+            "-resize",
+            str(size[0]),
+            str(size[1]),
+            src,
+            "-o",
+            dst,
+        ]
+
+
+class _ToktxEncoder(_ToolEncoder):
+    name = "toktx"
+    format = "KTX2"
+    executable = "toktx"
+    suffix = ".ktx2"
+
+    def command(self, src, dst, size, quality, lossless):
+        return [
+            self.executable,
+            "--t2",
+            "--encode",
+            "uastc",
+            "--uastc_quality",
+            str(min(4, quality // 25)),
+            "--zcmp",
+            "--resize",
+            f"{size[0]}x{size[1]}",
+            dst,
+            src,
+        ]
+
+
+def _encoders() -> Dict[str, _Encoder]:
+    # format -> encoder; Pillow first, then command line tools
+    encoders: Dict[str, _Encoder] = {}
+    if _PillowEncoder.available():
+        for fmt in ("PNG", "JPEG", "WEBP"):
+            encoders[fmt] = _PillowEncoder(fmt)
+    for cls in (_CwebpEncoder, _ToktxEncoder):
+        if cls.format not in encoders and cls.available():
+            encoders[cls.format] = cls()
+    return encoders
+
+
+def available_formats() -> List[str]:
+    return list(_encoders())
+
+
+def texture_cache() -> FileCache:
+    max_bytes = int(
+        os.environ.get(TEXTURE_CACHE_MAX_BYTES_ENV) or DEFAULT_TEXTURE_CACHE_MAX_BYTES
+    )
+    return FileCache(os.path.join(cache_root(), "texture"), max_bytes)
+
+
+def _pixel_hash(data: bytes) -> str:
+    # Same pixels, same hash, whatever the encoder of the source was.
+    # Without Pillow, the encoded bytes stand in for the pixels.
+    if _has_pillow():
+        # pylint: disable=import-outside-toplevel
+        import io
+
+        from PIL import Image
+
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                digest = hashlib.sha256(f"{image.mode}{image.size}".encode())
+                digest.update(image.tobytes())
+                return digest.hexdigest()
+        except OSError:
+            pass
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class _Job:
+    image_idx: int
+    data: bytes
+    info: _ImageInfo
+    encoder: _Encoder
+    size: Tuple[int, int]
+    lossless: bool
+    # Encodes the downscaled PNG/JPEG fallback of an extension format
+    fallback_encoder: Optional[_Encoder] = None
+
+
+def _encode(
+    data: bytes,
+    encoder: _Encoder,
+    size: Tuple[int, int],
+    lossless: bool,
+    options: TextureOptions,
+    cache: Optional[FileCache],
+) -> Tuple[bytes, bool]:
+    # (encoded bytes, cache hit)
+    suffix = f".{encoder.format.lower()}"
+    key = cache_key(
+        "texture",
+        _pixel_hash(data),
+        asdict(options),
+        encoder.name,
+        encoder.format,
+        size,
+        lossless,
+    )
+    if cache is not None:
+        path = cache.get(key, suffix)
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    return f.read(), True
+            except FileNotFoundError:  # evicted in between
+                pass
+
+    encoded = encoder.encode(data, size, options.quality, lossless)
+    if cache is not None:
+        cache.put_bytes(key, encoded, suffix)
+    return encoded, False
+
+
+def _run_job(
+    job: _Job, options: TextureOptions, cache: Optional[FileCache]
+) -> Tuple[bytes, Optional[bytes], bool]:
+    # (encoded bytes, fallback bytes, cache hit)
+    encoded, hit = _encode(
+        job.data, job.encoder, job.size, job.lossless, options, cache
+    )
+    fallback = None
+    if job.fallback_encoder is not None:
+        fallback, fallback_hit = _encode(
+            job.data, job.fallback_encoder, job.size, job.lossless, options, cache
+        )
+        hit = hit and fallback_hit
+    return encoded, fallback, hit
+
+
+def _normal_images(gltf) -> set:
+    # Images used as normal maps; they are only encoded losslessly.
+    textures = {
+        material.normalTexture.index
+        for material in gltf.materials
+        if material.normalTexture is not None
+    }
+    return {gltf.textures[idx].source for idx in textures if idx < len(gltf.textures)}
+
+
+def encode_gltf_textures(
+    glb: GlbFile, options: TextureOptions, cache: Optional[FileCache] = None
+) -> TextureReport:
+    # Re-encodes the embedded images of `glb` in place.
+    gltf = glb.gltf
+    report = TextureReport(images=len(gltf.images))
+    reason = glb.skip_reason()
+    if reason is not None:
+        report.skipped["*"] = reason
+        return report
+
+    # pylint: disable=import-outside-toplevel
+    from pygltflib import Image
+
+    encoders = _encoders()
+    normal_images = _normal_images(gltf)
+    jobs: List[_Job] = []
+    for idx, image in enumerate(gltf.images):
+        name = image.name or str(idx)
+        if image.bufferView is None:
+            report.skipped[name] = "not embedded"
+            continue
+
+        data = glb.view_bytes(image.bufferView)
+        info = _image_info(data)
+        if info is None:
+            report.skipped[name] = f"unsupported {image.mimeType}"
+            continue
+
+        size = _target_size(info, options.max_size)
+        resized = size != (info.width, info.height)
+        lossless = idx in normal_images
+        # The fallback keeps the format of the source
+        fallback_format = "PNG" if data[:4] == b"\x89PNG" or lossless else "JPEG"
+        candidates = [
+            fmt
+            for fmt in options.formats
+            if not (fmt == "JPEG" and (info.has_alpha or lossless))
+            # Next to the untouched source as fallback, an extension image only adds
+            # bytes
+            and (FORMATS[fmt][1] is None or (resized and fallback_format in encoders))
+        ]
+        # Downscaling alone needs a PNG encoder
+        if resized or lossless:
+            candidates.append("PNG")
+        encoder = next(
+            (
+                encoders[f]
+                for f in candidates
+                if f in encoders and (not lossless or f in encoders[f].lossless_formats)
+            ),
+            None,
+        )
+        if encoder is None:
+            report.skipped[name] = "no encoder" if candidates else "not smaller"
+            continue
+
+        fallback_encoder = None
+        if FORMATS[encoder.format][1] is not None:
+            fallback_encoder = encoders[fallback_format]
+        jobs.append(_Job(idx, data, info, encoder, size, lossless, fallback_encoder))
+
+    workers = int(os.environ.get(TEXTURE_WORKERS_ENV) or min(8, os.cpu_count() or 2))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [(job, pool.submit(_run_job, job, options, cache)) for job in jobs]
+
+    for job, future in futures:
+        image = gltf.images[job.image_idx]
+        name = image.name or str(job.image_idx)
+        try:
+            encoded, fallback, hit = future.result()
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            report.skipped[name] = f"{job.encoder.name} failed ({e})"
+            continue
+
+        resized = job.size != (job.info.width, job.info.height)
+        report.original_bytes += len(job.data)
+        fmt = job.encoder.format
+        mime_type, extension = FORMATS[fmt]
+        if fallback is not None and len(encoded) + len(fallback) >= len(job.data):
+            # The extension image doesn't pay for itself; the fallback alone is still
+            # downscaled.
+            encoded, fallback = fallback, None
+            fmt = job.fallback_encoder.format
+            mime_type, extension = FORMATS[fmt]
+        if not resized and len(encoded) >= len(job.data):
+            report.output_bytes += len(job.data)
+            report.skipped[name] = "not smaller"
+            continue
+
+        if extension is None:
+            image.bufferView = glb.append_view(encoded)
+            image.mimeType = mime_type
+            report.output_bytes += len(encoded)
+        else:
+            # A new image for the extension; the downscaled PNG/JPEG stays the
+            # texture source.
+            image.bufferView = glb.append_view(fallback)
+            image.mimeType = FORMATS[job.fallback_encoder.format][0]
+            gltf.images.append(
+                Image(
+                    name=image.name,
+                    bufferView=glb.append_view(encoded),
+                    mimeType=mime_type,
+                )
+            )
+            encoded_idx = len(gltf.images) - 1
+            for texture in gltf.textures:
+                if texture.source == job.image_idx:
+                    texture.extensions = {
+                        **(texture.extensions or {}),
+                        extension: {"source": encoded_idx},
+                    }
+            glb.use_extension(extension)
+            report.output_bytes += len(encoded) + len(fallback)
+
+        report.encoded += 1
+        report.cache_hits += int(hit)
+        report.formats[fmt] = report.formats.get(fmt, 0) + 1
+
+    return report
+
+
+def encode_glb_textures(
+    src: str, dst: str, options: TextureOptions, use_cache: bool = True
+) -> TextureReport:
+    # `src` and `dst` may be the same file.
+    glb = GlbFile.load(src)
+    report = encode_gltf_textures(glb, options, texture_cache() if use_cache else None)
+    glb.save(dst)
+    return report
@@ -0,0 +1,167 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Nested timing spans of an operator run ("trace"), summarized in the panel and
+# optionally written as a Chrome `trace_event` JSON file (chrome://tracing, Perfetto).
+# Spans outside of a trace are not recorded, so instrumented code costs next to nothing
+# when nobody is tracing.
+
+TRACE_DIR_ENV = "GAM_TRACE_DIR"
+
+__all__ = ["Span", "Trace", "Tracer"]
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    start: float  # `time.perf_counter()`
+    end: float = 0.0
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class Trace:
+    name: str
+    started_at: float  # `time.time()`
+    start: float
+    end: float = 0.0
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - self.start
+
+    def summary_lines(self, max_depth: int = 1) -> List[str]:
+        # Repeated spans (e.g. one per object) are merged by (parent, name).
+        totals: Dict[Tuple[int, str], List[float]] = {}
+        parents: List[int] = []
+        for idx, span in enumerate(self.spans):
+            del parents[span.depth :]
+            parents.append(idx)
+            if span.depth <= max_depth:
+                parent = parents[-2] if span.depth > 0 else -1
+                totals.setdefault((parent, span.name), []).append(span.elapsed)
+
+        lines = [f"{self.name} :: {self.elapsed * 1000:.1f}ms"]
+        for (parent, name), elapsed in totals.items():
+            depth = self.spans[parent].depth + 1 if parent >= 0 else 0
+            count = f" x{len(elapsed)}" if len(elapsed) > 1 else ""
+            indent = "    " * (depth + 1)
+            lines.append(f"{indent}{name}{count} :: {sum(elapsed) * 1000:.1f}ms")
+        return lines
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        # Complete ("X") events in microseconds
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                "name": self.name,
+                "cat": "gam",
+                "ph": "X",
+                "ts": 0.0,
+                "dur": self.elapsed * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+        ]
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "gam",
+                    "ph": "X",
+                    "ts": (span.start - self.start) * 1e6,
+                    "dur": span.elapsed * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {k: str(v) for k, v in span.args.items()},
+                }
+            )
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"name": self.name, "started_at": self.started_at},
+        }
+
+    def save(self, dirpath: str) -> str:
+        os.makedirs(dirpath, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        filepath = os.path.join(dirpath, f"{self.name}_{stamp}.trace.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return filepath
+
+
+class Tracer:
+    # Traces of the main thread only; blender operators and timers all run there.
+    def __init__(self, output_dirpath: Optional[str] = None):
+        self.output_dirpath = output_dirpath or os.environ.get(TRACE_DIR_ENV) or None
+        self.last_trace: Optional[Trace] = None
+        self.last_trace_filepath: Optional[str] = None
+        self._trace: Optional[Trace] = None
+        self._depth = 0
+
+    @property
+    def active(self) -> bool:
+        return self._trace is not None
+
+    def start_trace(self, name: str):
+        # A nested trace (e.g. an operator called by another one) joins the outer one.
+        if self._trace is None:
+            self._trace = Trace(name, time.time(), time.perf_counter())
+            self._depth = 0
+
+    def finish_trace(self, output_dirpath: Optional[str] = None) -> Optional[Trace]:
+        trace, self._trace = self._trace, None
+        if trace is None:
+            return None
+
+        trace.end = time.perf_counter()
+        self.last_trace = trace
+        self.last_trace_filepath = None
+
+        dirpath = output_dirpath or self.output_dirpath
+        if dirpath:
+            try:
+                self.last_trace_filepath = trace.save(dirpath)
+            except OSError:
+                pass
+
+        return trace
+
+    @contextlib.contextmanager
+    def trace(self, name: str, output_dirpath: Optional[str] = None) -> Iterator[None]:
+        is_outermost = self._trace is None
+        self.start_trace(name)
+        try:
+            yield
+        finally:
+            if is_outermost:
+                self.finish_trace(output_dirpath)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        trace = self._trace
+        if trace is None:
+            yield
+            return
+
+        span = Span(name, self._depth, time.perf_counter(), args=args)
+        trace.spans.append(span)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            span.end = time.perf_counter()
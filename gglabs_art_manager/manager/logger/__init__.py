@@ -1,7 +1,23 @@
-from blender_validator.model import StdoutLogger
+import os
+
+from gglabs_art_manager.manager.engine.trace import Tracer
+from gglabs_art_manager.manager.logger.buffered import (
+    BufferedLogger,
+    LogLevel,
+    LogRecord,
+)
 
-# TODO: Consider to make an independent logging module.
 # NOTE: python `logging` doesn't work with blender, AFAICS
-logger = StdoutLogger()
+# Console verbosity is set by `$GAM_LOG_LEVEL` (DEBUG, INFO, WARNING, ERROR).
+LOG_LEVEL_ENV = "GAM_LOG_LEVEL"
+
+logger = BufferedLogger(
+    level=LogLevel.__members__.get(
+        os.environ.get(LOG_LEVEL_ENV, "").upper(), LogLevel.INFO
+    )
+)
+
+# Timing spans of operator runs; see `manager.engine.trace`.
+tracer = Tracer()
 
-__all__ = ["logger"]
+__all__ = ["LogLevel", "LogRecord", "logger", "tracer"]
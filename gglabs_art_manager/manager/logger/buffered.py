@@ -0,0 +1,133 @@
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Deque, List, Optional, TextIO
+
+from blender_validator.model import StdoutLogger
+
+# Drop-in replacement of `StdoutLogger` (the `logger=` argument of `BlenderValidator`
+# and `GltfFormatter`). Records are kept in a bounded ring buffer for the panel, and
+# console output is written in batches from a background thread instead of one
+# synchronous write per line.
+
+__all__ = ["LogLevel", "LogRecord", "BufferedLogger"]
+
+
+class LogLevel(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
+@dataclass
+class LogRecord:
+    seq: int
+    created: float
+    level: LogLevel
+    message: str
+
+
+class BufferedLogger(StdoutLogger):
+    def __init__(
+        self,
+        capacity: int = 5000,
+        level: LogLevel = LogLevel.INFO,
+        flush_interval: float = 0.2,
+        stream: Optional[TextIO] = None,
+    ):
+        super().__init__()
+        self.level = level  # of the console output; every record is buffered
+        self.flush_interval = flush_interval
+        self.stream = stream
+
+        self.records: Deque[LogRecord] = deque(maxlen=capacity)
+        self._pending: Deque[str] = deque(maxlen=capacity)
+        self._dropped = 0
+        self._seq = 0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    @property
+    def seq(self) -> int:
+        # Increases with every record; lets viewers skip redraws.
+        return self._seq
+
+    def log(self, *args, level: LogLevel = LogLevel.INFO):
+        message = " ".join(str(arg) for arg in args)
+        with self._lock:
+            self._seq += 1
+            self.records.append(LogRecord(self._seq, time.time(), level, message))
+            if level >= self.level:
+                if len(self._pending) == self._pending.maxlen:
+                    self._dropped += 1
+                self._pending.append(message)
+
+        if level >= self.level:
+            self._ensure_flusher()
+            if level >= LogLevel.ERROR:
+                self._wakeup.set()
+
+    def debug(self, *args):
+        self.log(*args, level=LogLevel.DEBUG)
+
+    def info(self, *args):
+        self.log(*args, level=LogLevel.INFO)
+
+    def warning(self, *args):
+        self.log(*args, level=LogLevel.WARNING)
+
+    def error(self, *args):
+        self.log(*args, level=LogLevel.ERROR)
+
+    def tail(self, count: int, min_level: LogLevel = LogLevel.DEBUG) -> List[LogRecord]:
+        with self._lock:
+            records = [r for r in self.records if r.level >= min_level]
+        return records[-count:] if count > 0 else records
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self._seq += 1
+
+    def flush(self):
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+
+        if not lines and not dropped:
+            return
+
+        if dropped:
+            lines.insert(0, f"... {dropped} log lines dropped")
+        stream = self.stream or sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run_flusher, name="gam-log-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run_flusher(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
@@ -1,7 +1,25 @@
 from gglabs_art_manager.manager.model.project import Project
 from gglabs_art_manager.manager.model.tasktype_handler import (
+    ANIMATION_CLIP_MODES,
+    AnimationSplitGltfOptions,
+    TaskTypeDedupOptions,
     TaskTypeGltfOptions,
-    TaskTypeToTargetResourceType,
+    TaskTypeKeyframeReductionOptions,
+    TaskTypeQuantizationOptions,
+    TaskTypeSparseMorphOptions,
+    TaskTypeTextureOptions,
+    TaskTypeToTargetResourceTypeName,
 )
 
-__all__ = ["Project", "TaskTypeGltfOptions", "TaskTypeToTargetResourceType"]
+__all__ = [
+    "ANIMATION_CLIP_MODES",
+    "AnimationSplitGltfOptions",
+    "Project",
+    "TaskTypeDedupOptions",
+    "TaskTypeGltfOptions",
+    "TaskTypeKeyframeReductionOptions",
+    "TaskTypeQuantizationOptions",
+    "TaskTypeSparseMorphOptions",
+    "TaskTypeTextureOptions",
+    "TaskTypeToTargetResourceTypeName",
+]
@@ -1,7 +1,12 @@
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 
 from blender_validator.model import TaskType
-from gltf_formatter.model import TargetResourceType
+
+from gglabs_art_manager.manager.engine.dedup import DedupOptions
+from gglabs_art_manager.manager.engine.keyframe import KeyframeReductionOptions
+from gglabs_art_manager.manager.engine.quantize import QuantizationOptions
+from gglabs_art_manager.manager.engine.sparse import SparseMorphOptions
+from gglabs_art_manager.manager.engine.texture import TextureOptions
 
 # filepath
 # export_format
@@ -121,16 +126,88 @@ TaskTypeGltfOptions = {
     **{k.name: asdict(v) for k, v in _TaskTypeGltfOptions.items()},
 }
 
-_TaskTypeToTargetResourceType = {
-    TaskType.FACE_MODELING: TargetResourceType.FACE,
-    TaskType.FACE_RIGGING: TargetResourceType.FACE,
-    TaskType.BODY_MODELING: TargetResourceType.ANY,
-    TaskType.BODY_RIGGING: TargetResourceType.ANY,
-    TaskType.ANIMATING: TargetResourceType.ANIMATION,
-    TaskType.MASTERING: TargetResourceType.AVATAR,
+# Split ANIMATING export: a single export with every action (or NLA track) as its
+# own animation; the formatter writes the rig and meshes without animations, and an
+# animation-only clip per animation.
+ANIMATION_CLIP_MODES = ["ACTIONS", "NLA_TRACKS"]
+
+AnimationSplitGltfOptions = {
+    mode: asdict(
+        replace(_TaskTypeGltfOptions[TaskType.ANIMATING], export_animation_mode=mode)
+    )
+    for mode in ANIMATION_CLIP_MODES
+}
+
+# Names of `gltf_formatter.model.TargetResourceType`; `gltf_formatter` (and `pygltflib`)
+# is only imported by the formatter, not when the add-on is registered.
+_TaskTypeToTargetResourceTypeName = {
+    TaskType.FACE_MODELING: "FACE",
+    TaskType.FACE_RIGGING: "FACE",
+    TaskType.BODY_MODELING: "ANY",
+    TaskType.BODY_RIGGING: "ANY",
+    TaskType.ANIMATING: "ANIMATION",
+    TaskType.MASTERING: "AVATAR",
+}
+
+TaskTypeToTargetResourceTypeName = {
+    **_TaskTypeToTargetResourceTypeName,
+    **{k.name: v for k, v in _TaskTypeToTargetResourceTypeName.items()},
+}
+
+# KHR_mesh_quantization of the GLBs downloaded by the clients (faces and avatars)
+_TaskTypeQuantizationOptions = {
+    TaskType.FACE_MODELING: QuantizationOptions(),
+    TaskType.FACE_RIGGING: QuantizationOptions(),
+    TaskType.MASTERING: QuantizationOptions(),
+}
+
+TaskTypeQuantizationOptions = {
+    **_TaskTypeQuantizationOptions,
+    **{k.name: v for k, v in _TaskTypeQuantizationOptions.items()},
+}
+
+# Maximum texture resolution and encodings, by task type
+_TaskTypeTextureOptions = {
+    TaskType.FACE_MODELING: TextureOptions(max_size=1024),
+    TaskType.FACE_RIGGING: TextureOptions(max_size=1024),
+    TaskType.BODY_MODELING: TextureOptions(max_size=2048),
+    TaskType.BODY_RIGGING: TextureOptions(max_size=2048),
+    TaskType.ANIMATING: TextureOptions(max_size=1024),
+    TaskType.MASTERING: TextureOptions(max_size=2048),
 }
 
-TaskTypeToTargetResourceType = {
-    **_TaskTypeToTargetResourceType,
-    **{k.name: v for k, v in _TaskTypeToTargetResourceType.items()},
+TaskTypeTextureOptions = {
+    **_TaskTypeTextureOptions,
+    **{k.name: v for k, v in _TaskTypeTextureOptions.items()},
+}
+
+# Keyframe reduction of the force-sampled animations
+_TaskTypeKeyframeReductionOptions = {
+    TaskType.ANIMATING: KeyframeReductionOptions(),
+}
+
+TaskTypeKeyframeReductionOptions = {
+    **_TaskTypeKeyframeReductionOptions,
+    **{k.name: v for k, v in _TaskTypeKeyframeReductionOptions.items()},
+}
+
+# Sparse morph targets of the GLBs carrying the shapekeys
+_TaskTypeSparseMorphOptions = {
+    TaskType.FACE_MODELING: SparseMorphOptions(),
+    TaskType.FACE_RIGGING: SparseMorphOptions(),
+    TaskType.ANIMATING: SparseMorphOptions(),
+    TaskType.MASTERING: SparseMorphOptions(),
+}
+
+TaskTypeSparseMorphOptions = {
+    **_TaskTypeSparseMorphOptions,
+    **{k.name: v for k, v in _TaskTypeSparseMorphOptions.items()},
+}
+
+# Deduplication of the parts exported more than once (shared through `common`)
+_TaskTypeDedupOptions = {task: DedupOptions() for task in _TaskTypeTextureOptions}
+
+TaskTypeDedupOptions = {
+    **_TaskTypeDedupOptions,
+    **{k.name: v for k, v in _TaskTypeDedupOptions.items()},
 }
@@ -0,0 +1,119 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Wall-time measurements of the benchmark suite, saved as JSON per commit
+# (`build/benchmark/<commit>.json`) and compared against a baseline file.
+
+BENCHMARK_DIR = os.path.join("build", "benchmark")
+
+__all__ = ["Measurement", "BenchmarkRecorder", "git_revision"]
+
+
+@dataclass
+class Measurement:
+    name: str
+    times: List[float]  # seconds, one per round
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def min(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "min": self.min, "median": self.median}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class BenchmarkRecorder:
+    def __init__(self, rounds: int = 3, scale: str = "medium"):
+        self.rounds = rounds
+        self.scale = scale
+        self.measurements: Dict[str, Measurement] = {}
+
+    def measure(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        setup: Optional[Callable[[], Any]] = None,
+        rounds: Optional[int] = None,
+        **params,
+    ) -> Measurement:
+        # `setup` runs before every round and is not timed.
+        times = []
+        for _ in range(rounds or self.rounds):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+
+        measurement = Measurement(name, times, {"scale": self.scale, **params})
+        self.measurements[name] = measurement
+        return measurement
+
+    def to_dict(self) -> Dict[str, Any]:
+        import bpy  # pylint: disable=import-outside-toplevel
+
+        return {
+            "revision": git_revision(),
+            "created_at": time.time(),
+            "scale": self.scale,
+            "rounds": self.rounds,
+            "blender": bpy.app.version_string,
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "results": {k: v.to_dict() for k, v in self.measurements.items()},
+        }
+
+    def save(self, filepath: str):
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def compare(self, baseline_filepath: str, tolerance: float) -> List[str]:
+        # Lines of (median) times against the baseline; regressions are marked with "!".
+        with open(baseline_filepath, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        lines = [f"baseline {baseline.get('revision')} ({baseline_filepath})"]
+        for name, measurement in self.measurements.items():
+            base = baseline.get("results", {}).get(name)
+            if base is None:
+                lines.append(f"  {name}: {measurement.median * 1000:.1f}ms (new)")
+                continue
+
+            ratio = measurement.median / base["median"] if base["median"] else 1.0
+            mark = "!" if ratio > 1.0 + tolerance else " "
+            lines.append(
+                f"{mark} {name}: {measurement.median * 1000:.1f}ms"
+                f" / {base['median'] * 1000:.1f}ms ({(ratio - 1.0) * 100:+.1f}%)"
+            )
+        return lines
+
+    def regressions(self, baseline_filepath: str, tolerance: float) -> List[str]:
+        return [
+            line[2:].split(":", 1)[0]
+            for line in self.compare(baseline_filepath, tolerance)[1:]
+            if line.startswith("!")
+        ]
@@ -0,0 +1,143 @@
+# pylint: disable=redefined-outer-name
+
+import os
+
+import pytest
+
+from gglabs_art_manager.test.benchmark import (
+    BENCHMARK_DIR,
+    BenchmarkRecorder,
+    git_revision,
+)
+
+SAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "sample",
+)
+DEFAULT_CONFIG_FILEPATH = os.path.join(
+    SAMPLE_DIR, "configuration_validation_gglabs.yaml"
+)
+DEFAULT_BASELINE_FILEPATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("gam-benchmark")
+    group.addoption(
+        "--scale",
+        default="medium",
+        choices=["small", "medium", "large"],
+        help="size of the synthetic scenes",
+    )
+    group.addoption("--rounds", type=int, default=3, help="rounds per benchmark")
+    group.addoption(
+        "--config", default=DEFAULT_CONFIG_FILEPATH, help="validation config yaml"
+    )
+    group.addoption(
+        "--baseline",
+        default=DEFAULT_BASELINE_FILEPATH,
+        help="baseline json to compare with",
+    )
+    group.addoption(
+        "--save-baseline",
+        action="store_true",
+        help="save the results as the new baseline",
+    )
+    group.addoption(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="slowdown ratio reported as a regression",
+    )
+    group.addoption(
+        "--fail-on-regression",
+        action="store_true",
+        help="fail the session on regressions against the baseline",
+    )
+
+
+_recorder: BenchmarkRecorder = None
+
+
+@pytest.fixture(scope="session")
+def recorder(request) -> BenchmarkRecorder:
+    global _recorder  # pylint: disable=global-statement
+
+    _recorder = BenchmarkRecorder(
+        rounds=request.config.getoption("--rounds"),
+        scale=request.config.getoption("--scale"),
+    )
+    return _recorder
+
+
+@pytest.fixture(scope="session")
+def config_filepath(request) -> str:
+    return request.config.getoption("--config")
+
+
+@pytest.fixture(scope="session")
+def compiled_config(config_filepath):
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.manager.blender.config import load_config
+
+    return load_config(config_filepath)
+
+
+@pytest.fixture
+def scene_spec(request):
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.test.scene_generator import SCENE_SPECS
+
+    return SCENE_SPECS[request.config.getoption("--scale")]
+
+
+@pytest.fixture
+def scene(scene_spec, compiled_config):
+    # A freshly generated scene per test; not part of the timings
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.test.scene_generator import generate_scene
+
+    return generate_scene(scene_spec, compiled_config.constants)
+
+
+@pytest.fixture
+def glb_filepath(tmp_path) -> str:
+    # A freshly generated GLB per test, for the engine passes
+    # pylint: disable=import-outside-toplevel
+    from gglabs_art_manager.test.glb_generator import GlbSpec, generate_glb
+
+    return generate_glb(os.path.join(tmp_path, "face.glb"), GlbSpec())
+
+
+def pytest_sessionfinish(session, exitstatus):  # pylint: disable=unused-argument
+    if _recorder is None or not _recorder.measurements:
+        return
+
+    config = session.config
+    _recorder.save(os.path.join(BENCHMARK_DIR, f"{git_revision()}.json"))
+
+    baseline = config.getoption("--baseline")
+    if config.getoption("--save-baseline"):
+        _recorder.save(baseline)
+    elif os.path.isfile(baseline):
+        tolerance = config.getoption("--tolerance")
+        if config.getoption("--fail-on-regression") and _recorder.regressions(
+            baseline, tolerance
+        ):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _recorder is None or not _recorder.measurements:
+        return
+
+    terminalreporter.section("benchmark")
+    for name, measurement in _recorder.measurements.items():
+        terminalreporter.write_line(
+            f"{name}: median {measurement.median * 1000:.1f}ms,"
+            f" min {measurement.min * 1000:.1f}ms ({len(measurement.times)} rounds)"
+        )
+
+    baseline = config.getoption("--baseline")
+    if not config.getoption("--save-baseline") and os.path.isfile(baseline):
+        for line in _recorder.compare(baseline, config.getoption("--tolerance")):
+            terminalreporter.write_line(line)
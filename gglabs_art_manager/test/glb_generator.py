@@ -0,0 +1,360 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from pygltflib import (
+    GLTF2,
+    Accessor,
+    Animation,
+    AnimationChannel,
+    AnimationChannelTarget,
+    AnimationSampler,
+    Attributes,
+    Buffer,
+    BufferView,
+    Image,
+    Material,
+    Mesh,
+    Node,
+    NormalMaterialTexture,
+    PbrMetallicRoughness,
+    Primitive,
+    Scene,
+    Texture,
+    TextureInfo,
+)
+
+from gglabs_art_manager.manager.engine.glb import COMPONENT_COUNTS, GlbFile
+
+# A small synthetic GLB shaped like a formatted face export, for the `bpy`-free
+# engine passes:
+#
+#   Root
+#   ├── Face       (mesh with POSITION/NORMAL/TEXCOORD_0 and morph targets)
+#   ├── FaceCopy   (the same mesh, written again with its own buffer views)
+#   └── Head       (translated joint-like node)
+#
+# With a `texture_size`, both meshes use a material with an embedded PNG base color
+# (opaque, noisy) and normal map (smooth); the PNGs need Pillow.
+# Morph targets: "Blink" moves a few vertices (sparse), "Empty" moves nothing, "Puff"
+# moves every vertex (stays dense).
+# Animations, sampled once per frame like `export_force_sampling`:
+#   - "Walk": a linear Head translation, a constant rest rotation and Face weights
+#   - "Idle": a constant Head translation (its rest value) and a linear scale
+# `accessor_values`, `mesh_accessors` and `animation_channels` read a generated (or
+# post-processed) GLB back for the assertions.
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+FLOAT = 5126
+UNSIGNED_SHORT = 5123
+# Stored integer range of normalized component types
+_NORMALIZED_SCALES = {5120: 127.0, 5121: 255.0, 5122: 32767.0, 5123: 65535.0}
+
+MORPH_TARGET_NAMES = ["Blink", "Empty", "Puff"]
+BLINK_VERTICES = 10
+HEAD_TRANSLATION = [0.0, 1.0, 0.0]
+
+__all__ = [
+    "MORPH_TARGET_NAMES",
+    "BLINK_VERTICES",
+    "HEAD_TRANSLATION",
+    "GlbSpec",
+    "generate_glb",
+    "accessor_values",
+    "mesh_accessors",
+    "animation_channels",
+]
+
+
+@dataclass
+class GlbSpec:
+    grid: int = 12  # vertices per side
+    frames: int = 30
+    seed: int = 0
+    texture_size: int = 0  # of the square textures, none if 0
+
+
+class _Builder:
+    def __init__(self):
+        self.gltf = GLTF2()
+        self.blob = bytearray()
+
+    def view(self, data: np.ndarray, target: Optional[int] = None) -> int:
+        self.blob.extend(b"\0" * (-len(self.blob) % 4))
+        self.gltf.bufferViews.append(
+            BufferView(
+                buffer=0,
+                byteOffset=len(self.blob),
+                byteLength=data.nbytes,
+                target=target,
+            )
+        )
+        self.blob.extend(np.ascontiguousarray(data).tobytes())
+        return len(self.gltf.bufferViews) - 1
+
+    def accessor(
+        self,
+        data: np.ndarray,
+        type_: str,
+        target: Optional[int] = None,
+        bounds: bool = False,
+    ) -> int:
+        rows = data.reshape(len(data), -1)
+        self.gltf.accessors.append(
+            Accessor(
+                bufferView=self.view(data, target),
+                byteOffset=0,
+                componentType=UNSIGNED_SHORT if data.dtype == np.uint16 else FLOAT,
+                count=len(data),
+                type=type_,
+                min=[float(v) for v in rows.min(axis=0)] if bounds else None,
+                max=[float(v) for v in rows.max(axis=0)] if bounds else None,
+            )
+        )
+        return len(self.gltf.accessors) - 1
+
+    def image(self, pixels: np.ndarray, name: str) -> int:
+        # pylint: disable=import-outside-toplevel
+        import io
+
+        from PIL import Image as PILImage
+
+        out = io.BytesIO()
+        PILImage.fromarray(pixels).save(out, "PNG")
+        data = np.frombuffer(out.getvalue(), dtype=np.uint8)
+        self.gltf.images.append(
+            Image(name=name, bufferView=self.view(data), mimeType="image/png")
+        )
+        self.gltf.textures.append(Texture(source=len(self.gltf.images) - 1))
+        return len(self.gltf.textures) - 1
+
+    def finish(self, filepath: str):
+        self.blob.extend(b"\0" * (-len(self.blob) % 4))
+        self.gltf.buffers = [Buffer(byteLength=len(self.blob))]
+        self.gltf.set_binary_blob(bytes(self.blob))
+        self.gltf.save_binary(filepath)
+
+
+def _grid(spec: GlbSpec):
+    n = spec.grid
+    u, v = np.meshgrid(np.linspace(0.0, 1.0, n), np.linspace(0.0, 1.0, n))
+    uv = np.stack([u.ravel(), v.ravel()], axis=1).astype("<f4")
+    positions = np.stack(
+        [uv[:, 0] - 0.5, uv[:, 1] - 0.5, 0.1 * np.sin(uv[:, 0] * np.pi)], axis=1
+    ).astype("<f4")
+    normals = np.tile(np.array([0.0, 0.0, 1.0], "<f4"), (n * n, 1))
+    quads = [
+        (r * n + c, r * n + c + 1, (r + 1) * n + c, (r + 1) * n + c + 1)
+        for r in range(n - 1)
+        for c in range(n - 1)
+    ]
+    indices = np.array(
+        [i for a, b, c, d in quads for i in (a, b, c, b, d, c)], dtype=np.uint16
+    )
+    return positions, normals, uv, indices
+
+
+def _material(builder: _Builder, spec: GlbSpec) -> int:
+    rng = np.random.default_rng(spec.seed)
+    n = spec.texture_size
+    ramp = np.linspace(0, 255, n)
+    base_color = np.stack(np.broadcast_arrays(ramp, ramp[:, None], 128), axis=-1)
+    base_color = base_color + rng.normal(0.0, 24.0, (n, n, 3))
+    normal = np.stack(
+        np.broadcast_arrays(128 + 16 * np.sin(ramp / 40), 128, 255), axis=-1
+    )
+    builder.gltf.materials.append(
+        Material(
+            name="Skin",
+            pbrMetallicRoughness=PbrMetallicRoughness(
+                baseColorTexture=TextureInfo(
+                    index=builder.image(
+                        base_color.clip(0, 255).astype(np.uint8), "BaseColor"
+                    )
+                )
+            ),
+            normalTexture=NormalMaterialTexture(
+                index=builder.image(normal.astype(np.uint8), "Normal")
+            ),
+        )
+    )
+    return len(builder.gltf.materials) - 1
+
+
+def _mesh(builder: _Builder, spec: GlbSpec, name: str, material: Optional[int]) -> int:
+    rng = np.random.default_rng(spec.seed)
+    positions, normals, uv, indices = _grid(spec)
+    count = len(positions)
+
+    blink = np.zeros((count, 3), "<f4")
+    blink[:BLINK_VERTICES, 1] = -0.01
+    empty = np.zeros((count, 3), "<f4")
+    puff = rng.uniform(0.001, 0.01, (count, 3)).astype("<f4")
+
+    builder.gltf.meshes.append(
+        Mesh(
+            name=name,
+            weights=[0.0] * len(MORPH_TARGET_NAMES),
+            extras={"targetNames": list(MORPH_TARGET_NAMES)},
+            primitives=[
+                Primitive(
+                    attributes=Attributes(
+                        POSITION=builder.accessor(
+                            positions, "VEC3", ARRAY_BUFFER, bounds=True
+                        ),
+                        NORMAL=builder.accessor(normals, "VEC3", ARRAY_BUFFER),
+                        TEXCOORD_0=builder.accessor(uv, "VEC2", ARRAY_BUFFER),
+                    ),
+                    indices=builder.accessor(indices, "SCALAR", ELEMENT_ARRAY_BUFFER),
+                    material=material,
+                    targets=[
+                        {"POSITION": builder.accessor(d, "VEC3", bounds=True)}
+                        for d in (blink, empty, puff)
+                    ],
+                )
+            ],
+        )
+    )
+    return len(builder.gltf.meshes) - 1
+
+
+def _animation(builder: _Builder, name: str, times: int, channels) -> Animation:
+    # `channels`: (node, path, values)
+    animation = Animation(name=name)
+    for node, path, values in channels:
+        animation.samplers.append(
+            AnimationSampler(
+                input=times,
+                output=builder.accessor(
+                    values.astype("<f4"),
+                    "SCALAR" if path == "weights" else _vec(values),
+                ),
+                interpolation="LINEAR",
+            )
+        )
+        animation.channels.append(
+            AnimationChannel(
+                sampler=len(animation.samplers) - 1,
+                target=AnimationChannelTarget(node=node, path=path),
+            )
+        )
+    return animation
+
+
+def _vec(values: np.ndarray) -> str:
+    return f"VEC{values.shape[1]}"
+
+
+def generate_glb(filepath: str, spec: Optional[GlbSpec] = None) -> str:
+    spec = spec or GlbSpec()
+    builder = _Builder()
+    gltf = builder.gltf
+
+    material = _material(builder, spec) if spec.texture_size else None
+    face = _mesh(builder, spec, "Face", material)
+    face_copy = _mesh(builder, spec, "FaceCopy", material)
+    gltf.nodes = [
+        Node(name="Root", children=[1, 2, 3]),
+        Node(name="Face", mesh=face),
+        Node(name="FaceCopy", mesh=face_copy),
+        Node(name="Head", translation=list(HEAD_TRANSLATION), extras={"bone": True}),
+    ]
+    gltf.scenes = [Scene(name="Scene", nodes=[0])]
+    gltf.scene = 0
+
+    frames = spec.frames
+    t = np.linspace(0.0, 1.0, frames)
+    times = builder.accessor(
+        (np.arange(frames) / 30.0).astype("<f4"), "SCALAR", bounds=True
+    )
+    walk_translation = np.stack([t, np.ones(frames), np.zeros(frames)], axis=1)
+    rest_rotation = np.tile([0.0, 0.0, 0.0, 1.0], (frames, 1))
+    # A weight per target and key, flattened
+    weights = np.stack([np.sin(t * np.pi), np.zeros(frames), t], axis=1).ravel()
+    idle_translation = np.tile(HEAD_TRANSLATION, (frames, 1))
+    idle_scale = np.stack([1.0 + t, np.ones(frames), np.ones(frames)], axis=1)
+
+    gltf.animations = [
+        _animation(
+            builder,
+            "Walk",
+            times,
+            [
+                (3, "translation", walk_translation),
+                (3, "rotation", rest_rotation),
+                (1, "weights", weights),
+            ],
+        ),
+        _animation(
+            builder,
+            "Idle",
+            times,
+            [(3, "translation", idle_translation), (3, "scale", idle_scale)],
+        ),
+    ]
+
+    builder.finish(filepath)
+    return filepath
+
+
+def accessor_values(glb: GlbFile, accessor_idx: int):
+    # Decoded values of a dense or sparse, plain or normalized accessor
+    gltf = glb.gltf
+    accessor = gltf.accessors[accessor_idx]
+    components = COMPONENT_COUNTS[accessor.type]
+    if accessor.bufferView is not None:
+        data = glb.read_accessor(accessor_idx)
+    else:
+        data = np.zeros((accessor.count, components))
+
+    sparse = accessor.sparse
+    if sparse is not None:
+        index_view = gltf.bufferViews[sparse.indices.bufferView]
+        index_dtype = {5121: "<u1", 5123: "<u2", 5125: "<u4"}
+        indices = np.frombuffer(
+            glb.view_bytes(sparse.indices.bufferView),
+            dtype=index_dtype[sparse.indices.componentType],
+            count=sparse.count,
+            offset=sparse.indices.byteOffset or 0,
+        )
+        assert index_view.byteStride is None
+        value_dtype = {5120: "<i1", 5121: "<u1", 5122: "<i2", 5126: "<f4"}
+        data[indices] = np.frombuffer(
+            glb.view_bytes(sparse.values.bufferView),
+            dtype=value_dtype[accessor.componentType],
+            count=sparse.count * components,
+            offset=sparse.values.byteOffset or 0,
+        ).reshape(sparse.count, components)
+
+    if accessor.normalized:
+        data = data / _NORMALIZED_SCALES[accessor.componentType]
+    return data
+
+
+def mesh_accessors(glb: GlbFile, mesh_name: str):
+    # {"POSITION": idx, ..., "Blink": idx, ...} of the first primitive
+    mesh = next(m for m in glb.gltf.meshes if m.name == mesh_name)
+    primitive = mesh.primitives[0]
+    res = {
+        name: getattr(primitive.attributes, name)
+        for name in ("POSITION", "NORMAL", "TEXCOORD_0")
+    }
+    for name, target in zip(MORPH_TARGET_NAMES, primitive.targets):
+        res[name] = target["POSITION"]
+    return res
+
+
+def animation_channels(glb: GlbFile, animation_name: str):
+    # {(node name, path): (times, values)}
+    gltf = glb.gltf
+    animation = next(a for a in gltf.animations if a.name == animation_name)
+    res = {}
+    for channel in animation.channels:
+        sampler = animation.samplers[channel.sampler]
+        node = gltf.nodes[channel.target.node].name
+        res[(node, channel.target.path)] = (
+            accessor_values(glb, sampler.input)[:, 0],
+            accessor_values(glb, sampler.output),
+        )
+    return res
@@ -0,0 +1,195 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import bpy
+
+# Synthetic scenes shaped like the production files that
+# `sample/configuration_validation_*.yaml` describe:
+#
+#   Scene Collection
+#   └── Main
+#       ├── Common
+#       │   └── Armature   (armature objects, with actions)
+#       └── <category>      (one per `parts_categories`, meshes skinned to the armature)
+#
+# Meshes of the `shapekey_categories` get a shapekey per configured shapekey name
+# (the ~80 ARKit/viseme keys), optionally with a prefix for the rename benchmark.
+# Everything is built through `bpy.data`, so it works on the `bpy` module without a
+# window or GPU.
+
+MAIN_COLLECTION_NAME = "Main"
+COMMON_COLLECTION_NAME = "Common"
+ARMATURE_COLLECTION_NAME = "Armature"
+
+__all__ = ["SceneSpec", "SCENE_SPECS", "SyntheticScene", "generate_scene"]
+
+
+@dataclass
+class SceneSpec:
+    categories: int = 8  # first N of `parts_categories`
+    meshes_per_category: int = 2
+    vertices_per_mesh: int = 2500
+    shapekeys: Optional[int] = None  # first N of `shapekeys`, all if None
+    shapekey_prefix: str = ""
+    armatures: int = 1
+    actions: int = 2
+    action_frames: int = 60
+
+
+SCENE_SPECS: Dict[str, SceneSpec] = {
+    "small": SceneSpec(
+        categories=4, meshes_per_category=1, vertices_per_mesh=400, actions=1
+    ),
+    "medium": SceneSpec(),
+    "large": SceneSpec(
+        categories=26, meshes_per_category=4, vertices_per_mesh=10000, actions=8
+    ),
+}
+
+
+@dataclass
+class SyntheticScene:
+    spec: SceneSpec
+    main: bpy.types.Collection
+    categories: List[bpy.types.Collection] = field(default_factory=list)
+    meshes: List[bpy.types.Object] = field(default_factory=list)
+    shapekey_meshes: List[bpy.types.Object] = field(default_factory=list)
+    armatures: List[bpy.types.Object] = field(default_factory=list)
+    actions: List[bpy.types.Action] = field(default_factory=list)
+
+
+def reset_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def _grid_mesh(name: str, vertex_count: int) -> bpy.types.Mesh:
+    side = max(2, math.ceil(math.sqrt(vertex_count)))
+    step = 1.0 / (side - 1)
+    vertices = [(x * step, y * step, 0.0) for y in range(side) for x in range(side)]
+    faces = [
+        (y * side + x, y * side + x + 1, (y + 1) * side + x + 1, (y + 1) * side + x)
+        for y in range(side - 1)
+        for x in range(side - 1)
+    ]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(vertices, [], faces)
+    mesh.update()
+    return mesh
+
+
+def _add_shapekeys(obj: bpy.types.Object, names: List[str], prefix: str):
+    obj.shape_key_add(name="Basis", from_mix=False)
+    count = len(obj.data.vertices)
+    coords = [0.0] * (count * 3)
+    obj.data.vertices.foreach_get("co", coords)
+
+    for idx, name in enumerate(names):
+        key_block = obj.shape_key_add(name=f"{prefix}{name}", from_mix=False)
+        # Move a different slice of vertices per key, so that no key is empty.
+        moved = list(coords)
+        for v in range(idx % count, count, max(1, len(names))):
+            moved[v * 3 + 2] += 0.01
+        key_block.data.foreach_set("co", moved)
+
+
+def _add_armature(
+    name: str, bone_names: List[str], collection: bpy.types.Collection
+) -> bpy.types.Object:
+    armature = bpy.data.armatures.new(name)
+    obj = bpy.data.objects.new(name, armature)
+    collection.objects.link(obj)
+
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode="EDIT")
+    parent = None
+    for idx, bone_name in enumerate(bone_names):
+        bone = armature.edit_bones.new(bone_name)
+        bone.head = (0.0, 0.0, idx * 0.1)
+        bone.tail = (0.0, 0.0, idx * 0.1 + 0.1)
+        bone.parent = parent
+        parent = bone
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    return obj
+
+
+def _add_action(
+    name: str, armature: bpy.types.Object, bone_names: List[str], frames: int
+) -> bpy.types.Action:
+    action = bpy.data.actions.new(name)
+    action.use_fake_user = True
+    for bone_name in bone_names:
+        data_path = f'pose.bones["{bone_name}"].rotation_quaternion'
+        for axis in range(4):
+            fcurve = action.fcurves.new(data_path, index=axis, action_group=bone_name)
+            fcurve.keyframe_points.add(frames)
+            points = []
+            for frame in range(frames):
+                value = 1.0 if axis == 0 else 0.1 * math.sin(frame * 0.1 + axis)
+                points.extend((float(frame + 1), value))
+            fcurve.keyframe_points.foreach_set("co", points)
+            fcurve.update()
+
+    if armature.animation_data is None:
+        armature.animation_data_create()
+    if armature.animation_data.action is None:
+        armature.animation_data.action = action
+    return action
+
+
+def _skin(obj: bpy.types.Object, armature: bpy.types.Object, bone_name: str):
+    group = obj.vertex_groups.new(name=bone_name)
+    group.add(list(range(len(obj.data.vertices))), 1.0, "REPLACE")
+    modifier = obj.modifiers.new("Armature", "ARMATURE")
+    modifier.object = armature
+    obj.parent = armature
+
+
+def generate_scene(spec: SceneSpec, constants) -> SyntheticScene:
+    # `constants` is the result of `ConfigLoader.load` (`CompiledConfig.constants`).
+    reset_scene()
+    scene = bpy.context.scene
+
+    main = bpy.data.collections.new(MAIN_COLLECTION_NAME)
+    scene.collection.children.link(main)
+    common = bpy.data.collections.new(COMMON_COLLECTION_NAME)
+    main.children.link(common)
+    armature_collection = bpy.data.collections.new(ARMATURE_COLLECTION_NAME)
+    common.children.link(armature_collection)
+
+    result = SyntheticScene(spec=spec, main=main)
+    bone_names = list(constants.bones)
+    for idx in range(spec.armatures):
+        armature = _add_armature(f"Armature_{idx}", bone_names, armature_collection)
+        result.armatures.append(armature)
+        for action_idx in range(spec.actions):
+            result.actions.append(
+                _add_action(
+                    f"Action_{idx}_{action_idx}",
+                    armature,
+                    bone_names,
+                    spec.action_frames,
+                )
+            )
+
+    shapekey_names = list(constants.shapekeys)[: spec.shapekeys]
+    shapekey_categories = set(constants.shapekey_categories)
+    for category in list(constants.parts_categories)[: spec.categories]:
+        collection = bpy.data.collections.new(category)
+        main.children.link(collection)
+        result.categories.append(collection)
+
+        for idx in range(spec.meshes_per_category):
+            name = f"{category}_{idx}"
+            obj = bpy.data.objects.new(name, _grid_mesh(name, spec.vertices_per_mesh))
+            collection.objects.link(obj)
+            result.meshes.append(obj)
+
+            if result.armatures:
+                _skin(obj, result.armatures[idx % len(result.armatures)], bone_names[0])
+            if category in shapekey_categories and shapekey_names:
+                _add_shapekeys(obj, shapekey_names, spec.shapekey_prefix)
+                result.shapekey_meshes.append(obj)
+
+    return result
@@ -0,0 +1,233 @@
+import dataclasses
+import os
+
+import pytest
+
+# The benchmarks run on the `bpy` pip module (`bpy==4.3.0`, see requirements.txt);
+# without it (or the bundled validator), they are skipped.
+bpy = pytest.importorskip("bpy")
+pytest.importorskip("blender_validator")
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from blender_validator.exception import BlenderValidateError
+from blender_validator.utils import remove_prefix_from_shapekeys
+
+from gglabs_art_manager.manager.blender.config import clear_config_cache, load_config
+from gglabs_art_manager.manager.blender.pipeline import validate_blender
+from gglabs_art_manager.manager.blender.scene_index import SceneIndex
+from gglabs_art_manager.manager.blender.utils import control_visibilities_for_tasktype
+from gglabs_art_manager.manager.engine import (
+    dedup_glb,
+    format_glb,
+    quantize_glb,
+    reduce_glb_keyframes,
+    sparsify_glb_morphs,
+)
+from gglabs_art_manager.manager.model import (
+    TaskTypeDedupOptions,
+    TaskTypeGltfOptions,
+    TaskTypeKeyframeReductionOptions,
+    TaskTypeQuantizationOptions,
+    TaskTypeSparseMorphOptions,
+    TaskTypeToTargetResourceTypeName,
+)
+from gglabs_art_manager.test.scene_generator import generate_scene
+
+TASK_TYPES = ["FACE_RIGGING", "ANIMATING"]
+SHAPEKEY_PREFIX = "Face."
+
+
+def export_gltf(task_type: str, filepath: str):
+    bpy.ops.export_scene.gltf(
+        filepath=filepath,
+        export_format="GLB",
+        export_nla_strips_merged_animation_name="animation",
+        **TaskTypeGltfOptions[task_type],
+    )
+
+
+def test_config_load(recorder, config_filepath):
+    recorder.measure(
+        "config_load_cold",
+        lambda: load_config(config_filepath),
+        setup=clear_config_cache,
+    )
+    recorder.measure("config_load_cached", lambda: load_config(config_filepath))
+
+
+def test_scene_generator(scene, scene_spec, compiled_config):
+    shapekey_count = len(compiled_config.constants.shapekeys)
+    assert len(scene.categories) == scene_spec.categories
+    assert len(scene.meshes) == scene_spec.categories * scene_spec.meshes_per_category
+    assert len(scene.actions) == scene_spec.armatures * scene_spec.actions
+    for obj in scene.shapekey_meshes:
+        # Basis + one per configured shapekey
+        assert len(obj.data.shape_keys.key_blocks) == 1 + shapekey_count
+
+
+@pytest.mark.parametrize("task_type", TASK_TYPES)
+def test_validation(recorder, scene_spec, compiled_config, task_type):
+    def validate():
+        try:
+            validate_blender(task_type, compiled_config)
+        except BlenderValidateError:
+            pass  # timed all the same; fixes and failures are part of the cost
+
+    recorder.measure(
+        f"validation[{task_type}]",
+        validate,
+        setup=lambda: generate_scene(scene_spec, compiled_config.constants),
+        task_type=task_type,
+    )
+
+
+@pytest.mark.parametrize("task_type", TASK_TYPES)
+@pytest.mark.usefixtures("scene")
+def test_visibility(recorder, compiled_config, task_type):
+    recorder.measure(
+        f"visibility[{task_type}]",
+        lambda: control_visibilities_for_tasktype(
+            task_type, compiled_config.shapekey_category_keys, SceneIndex.build()
+        ),
+        task_type=task_type,
+    )
+
+
+def test_shapekey_rename(recorder, scene_spec, compiled_config):
+    spec = dataclasses.replace(scene_spec, shapekey_prefix=SHAPEKEY_PREFIX)
+    meshes = []
+
+    def setup():
+        meshes[:] = generate_scene(spec, compiled_config.constants).shapekey_meshes
+
+    def rename():
+        for obj in meshes:
+            remove_prefix_from_shapekeys(obj, SHAPEKEY_PREFIX)
+
+    recorder.measure("shapekey_rename", rename, setup=setup)
+    for obj in meshes:
+        assert not any(
+            kb.name.startswith(SHAPEKEY_PREFIX) for kb in obj.data.shape_keys.key_blocks
+        )
+
+
+@pytest.mark.parametrize("task_type", TASK_TYPES)
+@pytest.mark.usefixtures("scene")
+def test_gltf_export(recorder, tmp_path, task_type):
+    filepath = os.path.join(tmp_path, f"{task_type.lower()}.glb")
+    recorder.measure(
+        f"gltf_export[{task_type}]",
+        lambda: export_gltf(task_type, filepath),
+        task_type=task_type,
+    )
+    assert os.path.getsize(filepath) > 0
+
+
+@pytest.mark.parametrize("task_type", TASK_TYPES)
+@pytest.mark.usefixtures("scene")
+def test_format(recorder, tmp_path, task_type):
+    pytest.importorskip("gltf_formatter")
+
+    src = os.path.join(tmp_path, "src.glb")
+    dst = os.path.join(tmp_path, "dst.glb")
+    export_gltf(task_type, src)
+
+    results = []
+    recorder.measure(
+        f"format[{task_type}]",
+        lambda: results.append(
+            format_glb(TaskTypeToTargetResourceTypeName[task_type], src, dst)
+        ),
+        task_type=task_type,
+    )
+    # Timed either way; formatting rules may reject the synthetic scene.
+    assert all(r.output_filepath == dst for r in results)
+
+
+@pytest.mark.parametrize("task_type", ["FACE_RIGGING"])
+@pytest.mark.usefixtures("scene")
+def test_quantize(recorder, tmp_path, task_type):
+    pytest.importorskip("pygltflib")
+
+    src = os.path.join(tmp_path, "src.glb")
+    dst = os.path.join(tmp_path, "dst.glb")
+    export_gltf(task_type, src)
+
+    reports = []
+    recorder.measure(
+        f"quantize[{task_type}]",
+        lambda: reports.append(
+            quantize_glb(src, dst, TaskTypeQuantizationOptions[task_type])
+        ),
+        task_type=task_type,
+    )
+    report = reports[-1]
+    assert report.output_bytes <= report.original_bytes
+    assert (
+        report.max_position_error
+        <= TaskTypeQuantizationOptions[task_type].max_position_error
+    )
+
+
+@pytest.mark.parametrize("task_type", ["ANIMATING"])
+@pytest.mark.usefixtures("scene")
+def test_keyframe_reduction(recorder, tmp_path, task_type):
+    pytest.importorskip("pygltflib")
+
+    src = os.path.join(tmp_path, "src.glb")
+    dst = os.path.join(tmp_path, "dst.glb")
+    export_gltf(task_type, src)
+
+    reports = []
+    recorder.measure(
+        f"keyframe_reduction[{task_type}]",
+        lambda: reports.append(
+            reduce_glb_keyframes(src, dst, TaskTypeKeyframeReductionOptions[task_type])
+        ),
+        task_type=task_type,
+    )
+    report = reports[-1]
+    assert report.output_keys <= report.original_keys
+    assert report.output_bytes <= report.original_bytes
+
+
+@pytest.mark.parametrize("task_type", ["FACE_RIGGING"])
+@pytest.mark.usefixtures("scene")
+def test_sparse_morphs(recorder, tmp_path, task_type):
+    pytest.importorskip("pygltflib")
+
+    src = os.path.join(tmp_path, "src.glb")
+    dst = os.path.join(tmp_path, "dst.glb")
+    export_gltf(task_type, src)
+
+    reports = []
+    recorder.measure(
+        f"sparse_morphs[{task_type}]",
+        lambda: reports.append(
+            sparsify_glb_morphs(src, dst, TaskTypeSparseMorphOptions[task_type])
+        ),
+        task_type=task_type,
+    )
+    report = reports[-1]
+    # The synthetic shapekeys move a slice of the vertices each
+    assert report.sparse_targets > 0
+    assert report.output_bytes < report.original_bytes
+
+
+@pytest.mark.parametrize("task_type", TASK_TYPES)
+@pytest.mark.usefixtures("scene")
+def test_dedup(recorder, tmp_path, task_type):
+    pytest.importorskip("pygltflib")
+
+    src = os.path.join(tmp_path, "src.glb")
+    dst = os.path.join(tmp_path, "dst.glb")
+    export_gltf(task_type, src)
+
+    reports = []
+    recorder.measure(
+        f"dedup[{task_type}]",
+        lambda: reports.append(dedup_glb(src, dst, TaskTypeDedupOptions[task_type])),
+        task_type=task_type,
+    )
+    report = reports[-1]
+    assert report.output_bytes <= report.original_bytes
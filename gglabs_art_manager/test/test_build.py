@@ -0,0 +1,69 @@
+import dataclasses
+import os
+
+from gglabs_art_manager.batch.build import (
+    BuildState,
+    expected_output,
+    plan_build,
+    record_result,
+)
+from gglabs_art_manager.batch.model import BatchJob, BatchResult, JobStatus
+
+
+def write(filepath: str, data: bytes):
+    with open(filepath, "wb") as f:
+        f.write(data)
+
+
+def build(state: BuildState, job: BatchJob, libraries):
+    # Plans `job` and records a successful export of it
+    target = plan_build(state, [job])[0]
+    write(target.output, b"glb")
+    result = BatchResult(job, JobStatus.SUCCEEDED, target.output, libraries=libraries)
+    record_result(state, "BEERGANG", target, result)
+    return target
+
+
+def reasons(state: BuildState, jobs, force: bool = False):
+    return [target.reason for target in plan_build(state, jobs, force)]
+
+
+def test_plan_build(tmp_path):
+    blend = os.path.join(tmp_path, "face.blend")
+    library = os.path.join(tmp_path, "common.blend")
+    config = os.path.join(tmp_path, "config.yaml")
+    for filepath in (blend, library, config):
+        write(filepath, os.path.basename(filepath).encode())
+    job = BatchJob(blend, config, "FACE_RIGGING")
+
+    with BuildState(os.path.join(tmp_path, ".gam_build.sqlite")) as state:
+        target = build(state, job, [library])
+        assert target.reason == "new"
+        assert target.output == expected_output(job)
+        assert reasons(state, [job]) == [None]
+        assert reasons(state, [job], force=True) == ["forced"]
+
+        # A shared library rebuilds every blend file linking it
+        write(library, b"changed")
+        other_blend = os.path.join(tmp_path, "body.blend")
+        write(other_blend, b"body")
+        other_job = BatchJob(other_blend, config, "FACE_RIGGING")
+        build(state, other_job, [])
+        assert reasons(state, [job, other_job]) == [
+            "library changed :: common.blend",
+            None,
+        ]
+
+        build(state, job, [library])
+        write(config, b"changed")
+        assert reasons(state, [job, other_job]) == ["config changed :: config.yaml"] * 2
+
+        build(state, job, [library])
+        assert reasons(state, [dataclasses.replace(job, encode_textures=False)]) == [
+            "options changed"
+        ]
+        # `use_cache` doesn't change the output
+        assert reasons(state, [dataclasses.replace(job, use_cache=False)]) == [None]
+
+        os.remove(expected_output(job))
+        assert reasons(state, [job]) == ["output missing"]
@@ -0,0 +1,39 @@
+import os
+
+from gglabs_art_manager.manager.engine import FileCache, cache_key
+
+
+def test_file_cache(tmp_path):
+    cache = FileCache(os.path.join(tmp_path, "cache"), max_bytes=250)
+    src = os.path.join(tmp_path, "src.bin")
+    dst = os.path.join(tmp_path, "dst.bin")
+
+    assert cache_key("a", 1) == cache_key("a", 1)
+    assert cache_key("a", 1) != cache_key(1, "a")
+    keys = [cache_key("entry", idx) for idx in range(3)]
+
+    assert cache.get(keys[0]) is None
+    assert not cache.fetch(keys[0], dst)
+    for idx, key in enumerate(keys[:2]):
+        with open(src, "wb") as f:
+            f.write(bytes([idx]) * 100)
+        path = cache.put(key, src, ".bin")
+        os.utime(path, (idx, idx))  # keys[0] is the least recently used
+
+    assert cache.fetch(keys[1], dst, ".bin")
+    with open(dst, "rb") as f:
+        assert f.read() == b"\x01" * 100
+
+    # A hit makes the entry the most recently used
+    assert cache.get(keys[0], ".bin") is not None
+    with open(src, "wb") as f:
+        f.write(b"\x02" * 100)
+    cache.put(keys[2], src, ".bin")
+    assert cache.size() <= 250
+    assert cache.get(keys[1], ".bin") is None
+    assert cache.get(keys[0], ".bin") is not None
+    assert not cache.fetch(keys[1], dst, ".bin")
+
+    assert cache.put_bytes(keys[1], b"x", ".bin") == cache.get(keys[1], ".bin")
+    cache.clear()
+    assert not cache.entries()
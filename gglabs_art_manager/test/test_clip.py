@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+# Runs on a synthetic GLB (see glb_generator.py) with numpy and pygltflib only.
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygltflib")
+
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.manager.engine import split_animation_clips
+from gglabs_art_manager.manager.engine.clip import remove_animations
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.test.glb_generator import MORPH_TARGET_NAMES, animation_channels
+
+
+def test_split_animation_clips(glb_filepath, tmp_path):
+    output_dirpath = os.path.join(tmp_path, "clips")
+    os.makedirs(output_dirpath)
+    stale = os.path.join(output_dirpath, "Removed.glb")
+    with open(stale, "wb") as f:
+        f.write(b"")
+
+    filepaths = split_animation_clips(glb_filepath, output_dirpath)
+
+    assert [os.path.basename(p) for p in filepaths] == ["Walk.glb", "Idle.glb"]
+    assert not os.path.exists(stale)
+
+    src = GlbFile.load(glb_filepath)
+    for filepath in filepaths:
+        clip = GlbFile.load(filepath)
+        (animation,) = clip.gltf.animations
+        assert [n.name for n in clip.gltf.nodes] == [n.name for n in src.gltf.nodes]
+        for key, (times, data) in animation_channels(clip, animation.name).items():
+            src_times, src_data = animation_channels(src, animation.name)[key]
+            np.testing.assert_array_equal(times, src_times)
+            np.testing.assert_array_equal(data, src_data)
+
+    # Animated weights bind to a stub mesh with the same morph targets
+    walk = GlbFile.load(filepaths[0])
+    nodes = {node.name: node for node in walk.gltf.nodes}
+    mesh = walk.gltf.meshes[nodes["Face"].mesh]
+    assert len(mesh.primitives[0].targets) == len(MORPH_TARGET_NAMES)
+    assert mesh.extras["targetNames"] == MORPH_TARGET_NAMES
+    assert nodes["FaceCopy"].mesh is None
+    assert not GlbFile.load(filepaths[1]).gltf.meshes
+
+
+def test_remove_animations(glb_filepath, tmp_path):
+    # The rig file of a split export: the same meshes, without the animation data
+    src = GlbFile.load(glb_filepath)
+    glb = GlbFile.load(glb_filepath)
+    remove_animations(glb)
+    dst = os.path.join(tmp_path, "rig.glb")
+    assert glb.save(dst) < os.path.getsize(glb_filepath)
+
+    rig = GlbFile.load(dst)
+    assert not rig.gltf.animations
+    assert [m.name for m in rig.gltf.meshes] == [m.name for m in src.gltf.meshes]
+    np.testing.assert_array_equal(
+        rig.read_accessor(rig.gltf.meshes[0].primitives[0].attributes.POSITION),
+        src.read_accessor(src.gltf.meshes[0].primitives[0].attributes.POSITION),
+    )
@@ -0,0 +1,53 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# `load_config` itself only wraps the validator's `ConfigLoader`, with a stand-in
+# `load` here; the `manager.blender` package around it imports `bpy`.
+pytest.importorskip("bpy")
+pytest.importorskip("blender_validator")
+
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.manager.blender import config
+from gglabs_art_manager.manager.blender.config import clear_config_cache, load_config
+
+
+def test_load_config(tmp_path, monkeypatch):
+    filepath = os.path.join(tmp_path, "config.yaml")
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("shapekeys: []\n")
+
+    loaded = []
+
+    def load(path):
+        loaded.append(path)
+        return SimpleNamespace(
+            shapekey_categories=["Eye"],
+            custom_shapekey_categories=[],
+            parts_categories=["Hair"],
+            shapekeys=["Blink"],
+        )
+
+    monkeypatch.setattr(config.ConfigLoader, "load", load)
+    clear_config_cache()
+
+    compiled = load_config(filepath)
+    assert loaded == [filepath]
+    assert compiled.shapekey_keys and compiled.parts_category_keys
+    assert load_config(filepath) is compiled
+
+    # Touched but unchanged: hashed again, not parsed again
+    st = os.stat(filepath)
+    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_config(filepath) is compiled
+    assert len(loaded) == 1
+
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("shapekeys: [Blink]\n")
+    assert load_config(filepath) is not compiled
+    assert len(loaded) == 2
+
+    clear_config_cache()
+    load_config(filepath)
+    assert len(loaded) == 3
@@ -0,0 +1,74 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from gglabs_art_manager.batch import daemon
+from gglabs_art_manager.batch.model import BatchJob, BatchResult, JobStatus
+from gglabs_art_manager.batch.runner import TOKEN_HEADER, run_job_on_daemon
+from gglabs_art_manager.manager.engine.cache import CACHE_DIR_ENV
+
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class _Workers:
+    # Stands in for `WarmWorkers`; the endpoint is what is tested here
+    workers = 1
+
+    def __init__(self):
+        self.jobs = []
+
+    def run(self, job: BatchJob) -> BatchResult:
+        self.jobs.append(job)
+        return BatchResult(job, JobStatus.SUCCEEDED)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    server = daemon._DaemonServer(
+        ("127.0.0.1", 0), _Workers(), "secret", allow_remote=False
+    )
+    daemon._write_token(server.server_port, "secret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, headers) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    body = json.dumps(BatchJob("a.blend", "config.yaml", "FACE_RIGGING").to_dict())
+    conn.request("POST", "/jobs", body, headers)
+    status = conn.getresponse().status
+    conn.close()
+    return status
+
+
+def test_daemon_endpoint(server):
+    json_type = {"Content-Type": "application/json"}
+    assert post(server, json_type) == 403
+    assert post(server, {**json_type, TOKEN_HEADER: "wrong"}) == 403
+    # A CORS "simple" request from a web page
+    assert post(server, {"Content-Type": "text/plain", TOKEN_HEADER: "secret"}) == 415
+    # DNS rebinding
+    headers = {**json_type, TOKEN_HEADER: "secret", "Host": "evil.example:8765"}
+    assert post(server, headers) == 403
+    assert not server.workers.jobs
+
+    assert post(server, {**json_type, TOKEN_HEADER: "secret"}) == 200
+    # Clients of the same user read the token file
+    url = f"http://127.0.0.1:{server.server_port}"
+    job = BatchJob("b.blend", "config.yaml", "FACE_RIGGING")
+    assert run_job_on_daemon(url, job).ok
+    assert [j.blend_filepath for j in server.workers.jobs] == ["a.blend", "b.blend"]
+
+
+def test_check_host():
+    for host in ("127.0.0.1", "localhost", "::1"):
+        daemon.check_host(host)
+    with pytest.raises(ValueError):
+        daemon.check_host("0.0.0.0")
+    daemon.check_host("0.0.0.0", allow_remote=True)
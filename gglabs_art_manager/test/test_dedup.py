@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+# Runs on a synthetic GLB (see glb_generator.py) with numpy and pygltflib only.
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygltflib")
+
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.manager.engine import (
+    DedupOptions,
+    KeyframeReductionOptions,
+    QuantizationOptions,
+    SparseMorphOptions,
+    dedup_glb,
+)
+from gglabs_art_manager.manager.engine.dedup import dedup_gltf
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.manager.engine.keyframe import reduce_gltf_keyframes
+from gglabs_art_manager.manager.engine.quantize import quantize_gltf
+from gglabs_art_manager.manager.engine.sparse import sparsify_gltf_morphs
+from gglabs_art_manager.test.glb_generator import accessor_values, mesh_accessors
+
+
+def test_dedup(glb_filepath, tmp_path):
+    dst = os.path.join(tmp_path, "dedup.glb")
+    report = dedup_glb(glb_filepath, dst, DedupOptions())
+
+    assert report.merged["meshes"] == 1
+    assert report.merged["buffer views"] > 0
+    assert report.output_bytes < report.original_bytes
+    assert os.path.getsize(dst) < os.path.getsize(glb_filepath)
+
+    src, glb = GlbFile.load(glb_filepath), GlbFile.load(dst)
+    nodes = {node.name: node for node in glb.gltf.nodes}
+    assert len(glb.gltf.meshes) == 1
+    assert nodes["Face"].mesh == nodes["FaceCopy"].mesh == 0
+
+    accessors = mesh_accessors(glb, "Face")
+    for name, accessor_idx in mesh_accessors(src, "FaceCopy").items():
+        np.testing.assert_array_equal(
+            accessor_values(glb, accessors[name]), accessor_values(src, accessor_idx)
+        )
+
+
+def test_postprocess_passes(glb_filepath, tmp_path):
+    # Every pass on a single load, in the order of the formatter
+    dst = os.path.join(tmp_path, "postprocessed.glb")
+    glb = GlbFile.load(glb_filepath)
+    reduce_gltf_keyframes(glb, KeyframeReductionOptions())
+    sparsify_gltf_morphs(glb, SparseMorphOptions())
+    quantize_gltf(glb, QuantizationOptions())
+    dedup_gltf(glb, DedupOptions())
+    size = glb.save(dst)
+
+    assert size < os.path.getsize(glb_filepath) / 2
+    src, glb = GlbFile.load(glb_filepath), GlbFile.load(dst)
+    # Every buffer view is referenced and within the binary chunk
+    assert glb.used_views() == set(range(len(glb.gltf.bufferViews)))
+    for view in glb.gltf.bufferViews:
+        assert view.byteOffset % 4 == 0
+        assert view.byteOffset + view.byteLength <= glb.byte_length
+    np.testing.assert_allclose(
+        accessor_values(glb, mesh_accessors(glb, "Face")["Blink"]),
+        accessor_values(src, mesh_accessors(src, "Face")["Blink"]),
+        atol=QuantizationOptions().max_position_error,
+    )
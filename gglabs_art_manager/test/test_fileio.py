@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from gglabs_art_manager.manager.engine import atomic_output, fileio, scratch_dir
+from gglabs_art_manager.manager.engine.fileio import SCRATCH_DIR_ENV, ram_scratch_root
+
+
+def test_atomic_output(tmp_path):
+    filepath = os.path.join(tmp_path, "out.glb")
+    with open(filepath, "wb") as f:
+        f.write(b"old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_output(filepath) as part_filepath:
+            with open(part_filepath, "wb") as f:
+                f.write(b"half")
+            raise RuntimeError("export failed")
+    with open(filepath, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(tmp_path) == ["out.glb"]
+
+    with atomic_output(filepath) as part_filepath:
+        assert os.path.dirname(part_filepath) == str(tmp_path)
+        with open(part_filepath, "wb") as f:
+            f.write(b"new")
+    with open(filepath, "rb") as f:
+        assert f.read() == b"new"
+    assert os.listdir(tmp_path) == ["out.glb"]
+
+
+def test_scratch_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(SCRATCH_DIR_ENV, str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with scratch_dir() as dirpath:
+            assert os.path.dirname(dirpath) == str(tmp_path)
+            with open(os.path.join(dirpath, "temp.glb"), "wb") as f:
+                f.write(b"temp")
+            raise RuntimeError("export failed")
+    assert not os.path.exists(dirpath)
+
+
+def test_ram_scratch_root(tmp_path, monkeypatch):
+    ram_dirpath = os.path.join(tmp_path, "shm")
+    os.makedirs(ram_dirpath)
+    monkeypatch.delenv(SCRATCH_DIR_ENV, raising=False)
+    monkeypatch.setattr(fileio, "RAM_DISK_DIRS", [ram_dirpath])
+
+    def disk_usage(free: int):
+        return lambda path: SimpleNamespace(total=free, used=0, free=free)
+
+    # A 64MB RAM disk can't take a 100MB GLB
+    monkeypatch.setattr(shutil, "disk_usage", disk_usage(64 * 1024**2))
+    assert ram_scratch_root(100 * 1024**2) == tempfile.gettempdir()
+
+    monkeypatch.setattr(shutil, "disk_usage", disk_usage(8 * 1024**3))
+    assert ram_scratch_root(100 * 1024**2) == ram_dirpath
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+# Runs on a synthetic GLB (see glb_generator.py) with numpy and pygltflib only.
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygltflib")
+
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.manager.engine import (
+    KeyframeReductionOptions,
+    reduce_glb_keyframes,
+)
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.test.glb_generator import (
+    HEAD_TRANSLATION,
+    MORPH_TARGET_NAMES,
+    animation_channels,
+)
+
+
+def test_keyframe_reduction(glb_filepath, tmp_path):
+    dst = os.path.join(tmp_path, "reduced.glb")
+    options = KeyframeReductionOptions()
+    report = reduce_glb_keyframes(glb_filepath, dst, options)
+
+    assert report.channels == 5
+    assert report.removed_channels == 2
+    assert report.output_keys < report.original_keys
+    assert report.saved_bytes > 0
+
+    src, glb = GlbFile.load(glb_filepath), GlbFile.load(dst)
+    walk, idle = animation_channels(glb, "Walk"), animation_channels(glb, "Idle")
+    # Constant channels matching the rest pose are gone
+    assert ("Head", "rotation") not in walk
+    assert ("Head", "translation") not in idle
+    # Linear curves keep their end points
+    times, translation = walk[("Head", "translation")]
+    assert len(times) == 2
+    np.testing.assert_allclose(translation, [HEAD_TRANSLATION, [1.0, 1.0, 0.0]])
+
+    # Every original frame is within the tolerance
+    src_times, src_weights = animation_channels(src, "Walk")[("Face", "weights")]
+    times, weights = walk[("Face", "weights")]
+    targets = len(MORPH_TARGET_NAMES)
+    src_weights = src_weights.reshape(-1, targets)
+    weights = weights.reshape(-1, targets)
+    assert len(times) < len(src_times)
+    for target in range(targets):
+        np.testing.assert_allclose(
+            np.interp(src_times, times, weights[:, target]),
+            src_weights[:, target],
+            atol=options.weight_tolerance,
+        )
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+# Runs on a synthetic GLB (see glb_generator.py) with numpy and pygltflib only.
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygltflib")
+
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.manager.engine import QuantizationOptions, quantize_glb
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.manager.engine.quantize import KHR_MESH_QUANTIZATION
+from gglabs_art_manager.test.glb_generator import accessor_values, mesh_accessors
+
+
+def test_quantization(glb_filepath, tmp_path):
+    dst = os.path.join(tmp_path, "quantized.glb")
+    options = QuantizationOptions()
+    report = quantize_glb(glb_filepath, dst, options)
+
+    assert report.quantized == {"NORMAL": 2, "TEXCOORD_0": 2, "MORPH_POSITION": 6}
+    assert report.max_position_error <= options.max_position_error
+    assert report.output_bytes < report.original_bytes
+
+    src, glb = GlbFile.load(glb_filepath), GlbFile.load(dst)
+    assert KHR_MESH_QUANTIZATION in glb.gltf.extensionsRequired
+    accessors = mesh_accessors(glb, "Face")
+    normal = glb.gltf.accessors[accessors["NORMAL"]]
+    assert normal.componentType == 5120 and normal.normalized
+    # Vertex attribute elements stay 4-byte aligned
+    assert glb.gltf.bufferViews[normal.bufferView].byteStride % 4 == 0
+
+    tolerances = {"NORMAL": 1 / 127, "TEXCOORD_0": 1 / 65535}
+    for name, accessor_idx in mesh_accessors(src, "Face").items():
+        tolerance = tolerances.get(name, options.max_position_error)
+        np.testing.assert_allclose(
+            accessor_values(glb, accessors[name]),
+            accessor_values(src, accessor_idx),
+            atol=tolerance,
+        )
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+# Runs on a synthetic GLB (see glb_generator.py) with numpy and pygltflib only.
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygltflib")
+
+# pylint: disable=wrong-import-position
+from gglabs_art_manager.manager.engine import (
+    QuantizationOptions,
+    SparseMorphOptions,
+    quantize_glb,
+    sparsify_glb_morphs,
+)
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.test.glb_generator import (
+    BLINK_VERTICES,
+    MORPH_TARGET_NAMES,
+    accessor_values,
+    mesh_accessors,
+)
+
+
+def test_sparse_morphs(glb_filepath, tmp_path):
+    dst = os.path.join(tmp_path, "sparse.glb")
+    report = sparsify_glb_morphs(glb_filepath, dst, SparseMorphOptions())
+
+    # Blink and Empty of both meshes; Puff moves every vertex
+    assert report.targets == 6
+    assert report.sparse_targets == 4
+    assert report.saved_bytes > 0
+    assert os.path.getsize(dst) < os.path.getsize(glb_filepath)
+
+    src, glb = GlbFile.load(glb_filepath), GlbFile.load(dst)
+    accessors = mesh_accessors(glb, "Face")
+    blink = glb.gltf.accessors[accessors["Blink"]]
+    assert blink.bufferView is None and blink.sparse.count == BLINK_VERTICES
+    empty = glb.gltf.accessors[accessors["Empty"]]
+    assert empty.bufferView is None and empty.sparse is None
+    assert glb.gltf.accessors[accessors["Puff"]].sparse is None
+
+    for name, accessor_idx in mesh_accessors(src, "Face").items():
+        np.testing.assert_array_equal(
+            accessor_values(glb, accessors[name]), accessor_values(src, accessor_idx)
+        )
+
+
+def test_quantization_of_sparse_morphs(glb_filepath, tmp_path):
+    sparse = os.path.join(tmp_path, "sparse.glb")
+    dst = os.path.join(tmp_path, "quantized.glb")
+    sparsify_glb_morphs(glb_filepath, sparse, SparseMorphOptions())
+    options = QuantizationOptions()
+    report = quantize_glb(sparse, dst, options)
+
+    # Empty targets have no values left to quantize
+    assert report.quantized["MORPH_POSITION"] == 4
+    src, glb = GlbFile.load(glb_filepath), GlbFile.load(dst)
+    accessors = mesh_accessors(glb, "Face")
+    blink = glb.gltf.accessors[accessors["Blink"]]
+    assert blink.sparse is not None and blink.componentType == 5122
+    for name in MORPH_TARGET_NAMES:
+        np.testing.assert_allclose(
+            accessor_values(glb, accessors[name]),
+            accessor_values(src, mesh_accessors(src, "Face")[name]),
+            atol=options.max_position_error,
+        )
@@ -0,0 +1,96 @@
+import io
+import os
+
+import pytest
+
+# Runs on a synthetic GLB (see glb_generator.py) with numpy, pygltflib and Pillow only.
+pytest.importorskip("numpy")
+pytest.importorskip("pygltflib")
+pytest.importorskip("PIL")
+
+# pylint: disable=wrong-import-position,redefined-outer-name
+from PIL import Image, features
+
+from gglabs_art_manager.manager.engine import TextureOptions, encode_glb_textures
+from gglabs_art_manager.manager.engine.glb import GlbFile
+from gglabs_art_manager.test.glb_generator import GlbSpec, generate_glb
+
+TEXTURE_SIZE = 512
+
+
+@pytest.fixture
+def textured_glb_filepath(tmp_path) -> str:
+    return generate_glb(
+        os.path.join(tmp_path, "face.glb"), GlbSpec(texture_size=TEXTURE_SIZE)
+    )
+
+
+def textures(glb: GlbFile):
+    # {image name: texture} of the material
+    gltf = glb.gltf
+    material = gltf.materials[0]
+    texture_infos = [
+        material.pbrMetallicRoughness.baseColorTexture,
+        material.normalTexture,
+    ]
+    return {
+        gltf.images[gltf.textures[info.index].source].name: gltf.textures[info.index]
+        for info in texture_infos
+    }
+
+
+def decoded(glb: GlbFile, image_idx: int) -> Image.Image:
+    return Image.open(io.BytesIO(glb.view_bytes(glb.gltf.images[image_idx].bufferView)))
+
+
+def test_texture_encoding(textured_glb_filepath, tmp_path):
+    # Nothing to downscale: the base color becomes a JPEG, since a WEBP next to the
+    # untouched PNG fallback would only add bytes.
+    dst = os.path.join(tmp_path, "encoded.glb")
+    report = encode_glb_textures(
+        textured_glb_filepath, dst, TextureOptions(), use_cache=False
+    )
+
+    assert report.formats["JPEG"] == 1 and "WEBP" not in report.formats
+    assert report.output_bytes < report.original_bytes
+    assert os.path.getsize(dst) < os.path.getsize(textured_glb_filepath)
+    assert "(-" in report.summary() and "--" not in report.summary()
+
+    glb = GlbFile.load(dst)
+    assert not glb.gltf.extensionsUsed
+    base_color = textures(glb)["BaseColor"]
+    assert base_color.extensions in (None, {})
+    assert glb.gltf.images[base_color.source].mimeType == "image/jpeg"
+    # Normal maps are never encoded lossy
+    normal = textures(glb)["Normal"]
+    assert glb.gltf.images[normal.source].mimeType == "image/png"
+
+
+@pytest.mark.skipif(not features.check("webp"), reason="Pillow without WEBP")
+def test_texture_webp_fallback(textured_glb_filepath, tmp_path):
+    dst = os.path.join(tmp_path, "encoded.glb")
+    options = TextureOptions(max_size=TEXTURE_SIZE // 4)
+    report = encode_glb_textures(textured_glb_filepath, dst, options, use_cache=False)
+
+    assert report.formats["WEBP"] == 1
+    assert report.output_bytes < report.original_bytes
+    assert os.path.getsize(dst) < os.path.getsize(textured_glb_filepath)
+
+    glb = GlbFile.load(dst)
+    assert glb.gltf.extensionsUsed == ["EXT_texture_webp"]
+    assert not glb.gltf.extensionsRequired
+    base_color = textures(glb)["BaseColor"]
+    webp_idx = base_color.extensions["EXT_texture_webp"]["source"]
+    assert glb.gltf.images[webp_idx].mimeType == "image/webp"
+    assert decoded(glb, webp_idx).format == "WEBP"
+    # The PNG fallback stays the source, downscaled as well
+    assert glb.gltf.images[base_color.source].mimeType == "image/png"
+    fallback = decoded(glb, base_color.source)
+    assert fallback.format == "PNG" and fallback.size == (options.max_size,) * 2
+
+    # Every image is referenced and at most `max_size`
+    sources = {texture.source for texture in glb.gltf.textures}
+    sources.add(webp_idx)
+    assert sources == set(range(len(glb.gltf.images)))
+    for image_idx in sources:
+        assert max(decoded(glb, image_idx).size) <= options.max_size